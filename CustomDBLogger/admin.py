@@ -6,7 +6,7 @@ import logging
 from django.contrib import admin
 from django.utils.html import format_html
 
-from .models import StatusLog
+from .models import RequestMetric, StatusLog
 
 DJANGO_DB_LOGGER_ADMIN_LIST_PER_PAGE = 10
 
@@ -16,6 +16,8 @@ class StatusLogAdmin(admin.ModelAdmin):
     list_filter = ('level', 'custom_category')
     search_fields = ('msg', 'trace')
     list_per_page = DJANGO_DB_LOGGER_ADMIN_LIST_PER_PAGE
+    # Skip the unfiltered COUNT(*) of the whole log table on every changelist page
+    show_full_result_count = False
 
     def colored_msg(self, instance):
         if instance.level in [logging.NOTSET, logging.INFO]:
@@ -35,4 +37,14 @@ class StatusLogAdmin(admin.ModelAdmin):
     create_datetime_format.short_description = 'Created at'
 
 
-admin.site.register(StatusLog, StatusLogAdmin)
\ No newline at end of file
+admin.site.register(StatusLog, StatusLogAdmin)
+
+
+class RequestMetricAdmin(admin.ModelAdmin):
+    list_display = ('view_name', 'method', 'status_code', 'query_count', 'db_time', 'template_time', 'pdf_time',
+                    'total_time', 'create_datetime')
+    list_filter = ('view_name',)
+    show_full_result_count = False
+
+
+admin.site.register(RequestMetric, RequestMetricAdmin)
@@ -1,6 +1,11 @@
 # CustomDBLogger/db_log_handler.py
 
+import atexit
 import logging
+import os
+import queue
+import threading
+import time
 
 db_default_formatter = logging.Formatter()
 
@@ -9,6 +14,9 @@ class DatabaseLogHandler(logging.Handler):
     def emit(self, record):
         from .models import StatusLog
 
+        StatusLog.objects.create(**self.get_status_log_kwargs(record))
+
+    def get_status_log_kwargs(self, record):
         trace = None
 
         if record.exc_info:
@@ -31,8 +39,7 @@ class DatabaseLogHandler(logging.Handler):
             'trace': trace,
             'custom_category': custom_category
         }
-
-        StatusLog.objects.create(**kwargs)
+        return kwargs
 
     def format(self, record):
         if self.formatter:
@@ -51,3 +58,140 @@ class DatabaseLogHandler(logging.Handler):
             return fmt.formatMessage(record)
         else:
             return fmt.format(record)
+
+
+class BatchingDatabaseLogHandler(DatabaseLogHandler):
+    """
+    Non blocking variant of DatabaseLogHandler.
+
+    emit() only formats the record and puts it on a bounded in memory queue, a
+    background writer thread saves the queued records with bulk_create once
+    batch_size records are waiting or flush_interval seconds have passed, and
+    on process exit. The writer uses its own database connection so log rows
+    never join, or wait on, the caller's transaction.
+
+    When the queue is full new records are dropped rather than blocking the
+    caller, the number dropped is recorded as a warning with the next batch.
+    """
+
+    def __init__(self, batch_size=100, flush_interval=2.0, queue_size=10000, level=logging.NOTSET):
+        super().__init__(level)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._pid = None
+        self._queue = None
+        self._writer = None
+        self._start_lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _ensure_writer(self):
+        # Started on first use, and again in a forked child, as threads do not survive a fork
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self.dropped = 0
+            self._writer = threading.Thread(target=self._write_batches, name='db-log-writer', daemon=True)
+            self._writer.start()
+            self._pid = os.getpid()
+
+    def emit(self, record):
+        try:
+            self._ensure_writer()
+            self._queue.put_nowait((self._get_database_name(), self.get_status_log_kwargs(record)))
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    @staticmethod
+    def _get_database_name():
+        from django.db import connections
+
+        return connections['default'].settings_dict['NAME']
+
+    def _next_batch(self):
+        """
+        Wait for a record then gather records until batch_size are waiting or flush_interval has passed, returns
+        the batch and whether the writer has been asked to stop
+        """
+        batch = []
+        item = self._queue.get()
+        deadline = time.monotonic() + self.flush_interval
+        while item is not None:
+            batch.append(item)
+            remaining = deadline - time.monotonic()
+            if len(batch) >= self.batch_size or remaining <= 0:
+                return batch, False
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _write_batches(self):
+        from django.db import connection
+
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            self._save(batch)
+            # Release the writer's connection between batches rather than hold one open for the process lifetime
+            connection.close()
+
+    def _save(self, batch):
+        from .models import StatusLog
+
+        # Records are only written to the database they were logged against, e.g. not once a test database is gone
+        database_name = self._get_database_name()
+        batch = [kwargs for logged_database_name, kwargs in batch if logged_database_name == database_name]
+
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            batch.append({
+                'logger_name': __name__,
+                'level': logging.WARNING,
+                'msg': f'{dropped} log records were dropped as the database log queue was full',
+                'trace': None,
+                'custom_category': 'Logging',
+            })
+        if not batch:
+            return
+        try:
+            StatusLog.objects.bulk_create([StatusLog(**kwargs) for kwargs in batch])
+        except Exception as e:
+            # Logging must never take the writer thread down, report to stderr and carry on
+            logging.lastResort.handle(logging.makeLogRecord({
+                'msg': f'Could not save {len(batch)} log records: {e}', 'levelno': logging.ERROR,
+            }))
+
+    def flush(self):
+        """
+        Save the queued records now. Used at exit and by tests, emit never waits on the database.
+        """
+        if self._pid != os.getpid():
+            return
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                batch.append(item)
+        self._save(batch)
+
+    def close(self):
+        if self._pid == os.getpid() and self._writer.is_alive():
+            try:
+                self._queue.put(None, timeout=self.flush_interval)
+            except queue.Full:
+                pass
+            self._writer.join(timeout=max(self.flush_interval * 2, 5))
+            self.flush()
+            self._pid = None
+        super().close()
@@ -0,0 +1,36 @@
+# CustomDBLogger/management/commands/purge_status_logs.py
+
+from django.core.management.base import BaseCommand
+
+from CustomDBLogger.services.status_log_service import StatusLogService
+
+
+class Command(BaseCommand):
+    """
+    Delete StatusLog records that are older than their retention period, set by the STATUS_LOG_RETENTION policies.
+    Intended to be run daily from cron.
+    Usage: python3 manage.py purge_status_logs [--dry-run] [--batch-size 5000]
+    """
+    help = 'Delete StatusLog records past their retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the number of expired records without deleting them',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of records deleted per statement',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            expired = StatusLogService.count_expired()
+            self.stdout.write(self.style.SUCCESS(f'{expired} StatusLog records are past their retention period'))
+            return
+
+        deleted = StatusLogService.purge_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired StatusLog records'))
@@ -0,0 +1,49 @@
+# CustomDBLogger/management/commands/request_metrics_report.py
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from CustomDBLogger.services.request_metrics_service import RequestMetricsService
+
+
+class Command(BaseCommand):
+    """
+    Report the p50 and p95 response time and query count of each view from the metrics recorded by the
+    RequestMetricsMiddleware, and optionally delete old metrics.
+    Usage: python3 manage.py request_metrics_report [--days 7] [--purge-days 30]
+    """
+    help = 'Report per view p50 and p95 response times and query counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=7,
+            help='Number of days of metrics to report on',
+        )
+        parser.add_argument(
+            '--purge-days',
+            type=int,
+            help='Delete the metrics older than this number of days',
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        RequestMetricsService.flush()
+
+        if options['purge_days'] is not None:
+            deleted = RequestMetricsService.purge(now - timedelta(days=options['purge_days']))
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} request metrics'))
+
+        summary = RequestMetricsService.get_view_summary(now - timedelta(days=options['days']))
+        self.stdout.write(
+            f'{"View":<50} {"Requests":>8} {"p50 ms":>8} {"p95 ms":>8} {"p50 q":>6} {"p95 q":>6} {"max q":>6}'
+        )
+        for row in summary:
+            self.stdout.write(
+                f'{row["view_name"]:<50} {row["requests"]:>8} {row["p50_time"]:>8.0f} {row["p95_time"]:>8.0f} '
+                f'{row["p50_queries"]:>6.0f} {row["p95_queries"]:>6.0f} {row["max_queries"]:>6}'
+            )
+        self.stdout.write(self.style.SUCCESS(f'{len(summary)} views requested in the last {options["days"]} days'))
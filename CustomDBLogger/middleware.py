@@ -0,0 +1,31 @@
+# CustomDBLogger/middleware.py
+
+from django.core.exceptions import MiddlewareNotUsed
+
+from CustomDBLogger.services.request_metrics_service import RequestMetricsService
+
+
+class RequestMetricsMiddleware:
+    """
+    Records the SQL queries, database time, template render time and WeasyPrint time of each request against the
+    name of the view that handled it, see RequestMetricsService. Only installed when REQUEST_METRICS_ENABLED is set.
+    """
+
+    def __init__(self, get_response):
+        if not RequestMetricsService.is_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token, metrics = RequestMetricsService.start_request()
+        try:
+            with RequestMetricsService.instrument(metrics):
+                response = self.get_response(request)
+            metrics.finish()
+        finally:
+            RequestMetricsService.end_request(token)
+
+        RequestMetricsService.record(request, response, metrics)
+        if RequestMetricsService.show_server_timing(request):
+            response['Server-Timing'] = RequestMetricsService.get_server_timing(metrics)
+        return response
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.14 on 2026-10-18 23:11
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The indexes are built concurrently so an existing large log table is not locked against writes
+    atomic = False
+
+    dependencies = [
+        ('CustomDBLogger', '0002_statuslog_custom_category'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='statuslog',
+            index=models.Index(fields=['create_datetime', 'id'], name='CustomDBLog_create__ee2c3b_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='statuslog',
+            index=models.Index(fields=['custom_category', 'create_datetime'], name='CustomDBLog_custom__729198_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='statuslog',
+            index=models.Index(fields=['level', 'create_datetime'], name='CustomDBLog_level_326fe9_idx'),
+        ),
+    ]
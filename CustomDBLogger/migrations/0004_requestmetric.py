@@ -0,0 +1,33 @@
+# Generated by Django 4.2.14 on 2026-10-18 23:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('CustomDBLogger', '0003_statuslog_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view_name', models.CharField(max_length=200)),
+                ('method', models.CharField(max_length=10)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('query_count', models.PositiveIntegerField()),
+                ('db_time', models.FloatField()),
+                ('template_time', models.FloatField()),
+                ('pdf_time', models.FloatField()),
+                ('total_time', models.FloatField()),
+                ('create_datetime', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Created at')),
+            ],
+            options={
+                'ordering': ('-create_datetime',),
+                'indexes': [models.Index(fields=['view_name', 'create_datetime'], name='CustomDBLog_view_na_35a5c8_idx'), models.Index(fields=['create_datetime'], name='CustomDBLog_create__31c3dc_idx')],
+            },
+        ),
+    ]
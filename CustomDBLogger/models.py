@@ -2,6 +2,7 @@
 
 import logging
 from django.db import models
+from django.utils import timezone
 from six import python_2_unicode_compatible
 from django.utils.translation import gettext_lazy as _
 
@@ -30,3 +31,33 @@ class StatusLog(models.Model):
     class Meta:
         ordering = ('-create_datetime',)
         verbose_name_plural = verbose_name = 'Logging'
+        indexes = [
+            models.Index(fields=['create_datetime', 'id']),
+            models.Index(fields=['custom_category', 'create_datetime']),
+            models.Index(fields=['level', 'create_datetime']),
+        ]
+
+
+class RequestMetric(models.Model):
+    """
+    The queries and timings of one request recorded by the RequestMetricsMiddleware, times in milliseconds
+    """
+    view_name = models.CharField(max_length=200)
+    method = models.CharField(max_length=10)
+    status_code = models.PositiveSmallIntegerField()
+    query_count = models.PositiveIntegerField()
+    db_time = models.FloatField()
+    template_time = models.FloatField()
+    pdf_time = models.FloatField()
+    total_time = models.FloatField()
+    create_datetime = models.DateTimeField(default=timezone.now, verbose_name='Created at')
+
+    def __str__(self):
+        return f'{self.view_name} {self.total_time:.0f}ms {self.query_count} queries'
+
+    class Meta:
+        ordering = ('-create_datetime',)
+        indexes = [
+            models.Index(fields=['view_name', 'create_datetime']),
+            models.Index(fields=['create_datetime']),
+        ]
@@ -0,0 +1,55 @@
+# CustomDBLogger/request_metrics.py
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+# The RequestMetrics of the request being handled, set by the RequestMetricsMiddleware
+_request_metrics = ContextVar('request_metrics', default=None)
+
+
+@dataclass
+class RequestMetrics:
+    """
+    The SQL queries and the database, template render, WeasyPrint and total time of one request, times in
+    milliseconds. Queries run while a template is rendered or a PDF is laid out are counted in db_time as well.
+
+    Kept free of Django model imports so the PDF renderer can time itself without loading the apps.
+    """
+    query_count: int = 0
+    db_time: float = 0.0
+    template_time: float = 0.0
+    pdf_time: float = 0.0
+    total_time: float = 0.0
+    started_at: float = field(default_factory=time.perf_counter)
+    active_timers: set = field(default_factory=set)
+
+    def finish(self):
+        self.total_time = (time.perf_counter() - self.started_at) * 1000
+
+
+def get_request_metrics():
+    return _request_metrics.get()
+
+
+@contextmanager
+def timed(name):
+    """
+    Add the time spent in the block to the <name>_time of the current request. Outside a request recorded by the
+    RequestMetricsMiddleware, such as in a management command or a PDF worker process, nothing is recorded. A block
+    nested in another timed block of the same name, e.g. a template rendered by a template tag, is counted once.
+    """
+    metrics = _request_metrics.get()
+    if metrics is None or name in metrics.active_timers:
+        yield
+        return
+
+    metrics.active_timers.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.active_timers.discard(name)
+        attribute = f'{name}_time'
+        setattr(metrics, attribute, getattr(metrics, attribute) + (time.perf_counter() - start) * 1000)
@@ -0,0 +1,203 @@
+# CustomDBLogger/services/request_metrics_service.py
+
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.models import Aggregate, Count, FloatField, Max
+
+from CustomDBLogger.models import RequestMetric
+from CustomDBLogger.request_metrics import RequestMetrics, _request_metrics
+
+db_logger = logging.getLogger('db')
+
+
+class Percentile(Aggregate):
+    """
+    PostgreSQL percentile_cont, the continuous percentile of the expression at a fraction between 0 and 1
+    """
+    function = 'PERCENTILE_CONT'
+    name = 'Percentile'
+    template = '%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = FloatField()
+
+    def __init__(self, expression, fraction, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+class RequestMetricsService:
+    """
+    Service class for the per request metrics recorded by the RequestMetricsMiddleware.
+
+    Provides:
+        - Counting and timing of the SQL queries of a request through a database execute wrapper
+        - Per view query budgets, a request that runs more queries than its view's budget is logged as a warning
+        - A Server-Timing header of the request's database, template, PDF and total time
+        - Buffered saving of RequestMetric rows, one insert for a batch of requests
+        - Per view p50 and p95 summaries of the recorded requests
+
+    Each process keeps up to REQUEST_METRICS_BATCH_SIZE requests in memory and saves them together, or sooner when
+    the oldest has waited REQUEST_METRICS_FLUSH_INTERVAL seconds, so recording adds no query to most requests. The
+    requests still buffered when a process stops are not saved.
+    """
+
+    UNRESOLVED_VIEW = '<unresolved>'
+
+    _buffer = []
+    _buffered_since = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def is_enabled():
+        return getattr(settings, 'REQUEST_METRICS_ENABLED', False)
+
+    @staticmethod
+    def get_query_budget(view_name):
+        budgets = getattr(settings, 'REQUEST_METRICS_QUERY_BUDGETS', {})
+        return budgets.get(view_name, getattr(settings, 'REQUEST_METRICS_DEFAULT_QUERY_BUDGET', 100))
+
+    @staticmethod
+    def get_batch_size():
+        return getattr(settings, 'REQUEST_METRICS_BATCH_SIZE', 50)
+
+    @staticmethod
+    def get_flush_interval():
+        return getattr(settings, 'REQUEST_METRICS_FLUSH_INTERVAL', 60)
+
+    @staticmethod
+    def start_request():
+        """
+        Start recording a request, returns the token to pass to end_request and the request's RequestMetrics
+        """
+        metrics = RequestMetrics()
+        return _request_metrics.set(metrics), metrics
+
+    @staticmethod
+    def end_request(token):
+        _request_metrics.reset(token)
+
+    @staticmethod
+    @contextmanager
+    def instrument(metrics):
+        """
+        Count and time the queries run on every database connection within the block
+        """
+        def execute_wrapper(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                metrics.query_count += 1
+                metrics.db_time += (time.perf_counter() - start) * 1000
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(execute_wrapper))
+            yield
+
+    @classmethod
+    def get_view_name(cls, request):
+        resolver_match = getattr(request, 'resolver_match', None)
+        return resolver_match.view_name if resolver_match else cls.UNRESOLVED_VIEW
+
+    @staticmethod
+    def show_server_timing(request):
+        """
+        The Server-Timing header is sent to staff, and to everyone when REQUEST_METRICS_SERVER_TIMING is set
+        """
+        if getattr(settings, 'REQUEST_METRICS_SERVER_TIMING', False):
+            return True
+        user = getattr(request, 'user', None)
+        return bool(user and user.is_staff)
+
+    @staticmethod
+    def get_server_timing(metrics):
+        return ', '.join([
+            f'db;dur={metrics.db_time:.1f};desc="{metrics.query_count} queries"',
+            f'template;dur={metrics.template_time:.1f}',
+            f'pdf;dur={metrics.pdf_time:.1f}',
+            f'total;dur={metrics.total_time:.1f}',
+        ])
+
+    @classmethod
+    def record(cls, request, response, metrics):
+        """
+        Check the request against its view's query budget and buffer its RequestMetric, saving the buffer when it
+        is due
+        """
+        view_name = cls.get_view_name(request)
+        budget = cls.get_query_budget(view_name)
+        if metrics.query_count > budget:
+            db_logger.warning(
+                f'{view_name} ran {metrics.query_count} queries for {request.method} {request.path}, '
+                f'over its budget of {budget}',
+                extra={'custom_category': 'Query Budget'}
+            )
+
+        request_metric = RequestMetric(
+            view_name=view_name[:200],
+            method=request.method[:10],
+            status_code=response.status_code,
+            query_count=metrics.query_count,
+            db_time=metrics.db_time,
+            template_time=metrics.template_time,
+            pdf_time=metrics.pdf_time,
+            total_time=metrics.total_time,
+        )
+        with cls._lock:
+            if not cls._buffer:
+                cls._buffered_since = time.monotonic()
+            cls._buffer.append(request_metric)
+            due = (
+                len(cls._buffer) >= cls.get_batch_size()
+                or time.monotonic() - cls._buffered_since >= cls.get_flush_interval()
+            )
+        if due:
+            cls.flush()
+
+    @classmethod
+    def flush(cls):
+        """
+        Save the buffered RequestMetric rows with a single insert, returns the number saved
+        """
+        with cls._lock:
+            request_metrics, cls._buffer = cls._buffer, []
+        if not request_metrics:
+            return 0
+        try:
+            RequestMetric.objects.bulk_create(request_metrics)
+        except DatabaseError as e:
+            db_logger.error(f'{len(request_metrics)} request metrics could not be saved: {e}',
+                            extra={'custom_category': 'Request Metrics'})
+            return 0
+        return len(request_metrics)
+
+    @staticmethod
+    def get_view_summary(since):
+        """
+        Returns the number of requests and the p50 and p95 total time and query count of each view recorded since
+        the given datetime, slowest p95 first
+        """
+        return list(
+            RequestMetric.objects.filter(create_datetime__gte=since)
+            .values('view_name')
+            .annotate(
+                requests=Count('id'),
+                p50_time=Percentile('total_time', 0.5),
+                p95_time=Percentile('total_time', 0.95),
+                p50_queries=Percentile('query_count', 0.5),
+                p95_queries=Percentile('query_count', 0.95),
+                max_queries=Max('query_count'),
+            )
+            .order_by('-p95_time', 'view_name')
+        )
+
+    @staticmethod
+    def purge(before):
+        """
+        Delete the metrics recorded before the given datetime, returns the number deleted
+        """
+        return RequestMetric.objects.filter(create_datetime__lt=before).delete()[0]
@@ -0,0 +1,112 @@
+# CustomDBLogger/services/status_log_service.py
+
+import logging
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from CustomDBLogger.models import StatusLog
+
+
+class StatusLogService:
+    """
+    Service class for the StatusLog table.
+
+    Provides:
+        - Time based retention with per category and per level policies
+        - Keyset pagination for the log browser
+
+    Retention is configured with STATUS_LOG_RETENTION, e.g.
+        {'default_days': 180, 'categories': {'Payments': 730}, 'levels': {'ERROR': 365}}
+    A record is kept for the longest period of the policies that apply to it.
+    """
+
+    @staticmethod
+    def get_retention_policy():
+        policy = getattr(settings, 'STATUS_LOG_RETENTION', {})
+        levels = {
+            logging.getLevelName(level) if isinstance(level, str) else level: days
+            for level, days in policy.get('levels', {}).items()
+        }
+        return policy.get('default_days', 180), policy.get('categories', {}), levels
+
+    @classmethod
+    def get_retention_days(cls, custom_category, level):
+        default_days, categories, levels = cls.get_retention_policy()
+        policy_days = [
+            days for days in (categories.get(custom_category), levels.get(level)) if days is not None
+        ]
+        return max(policy_days) if policy_days else default_days
+
+    @classmethod
+    def get_expired_filters(cls, now=None):
+        """
+        Returns one filter per category and level combination in the table, each matches the records of that
+        combination that are past their retention period
+        """
+        now = now or timezone.now()
+        combinations = StatusLog.objects.order_by().values_list('custom_category', 'level').distinct()
+        # custom_category=None filters with IS NULL
+        return [
+            Q(
+                custom_category=custom_category,
+                level=level,
+                create_datetime__lt=now - timedelta(days=cls.get_retention_days(custom_category, level)),
+            )
+            for custom_category, level in combinations
+        ]
+
+    @classmethod
+    def count_expired(cls, now=None):
+        return sum(StatusLog.objects.filter(expired).count() for expired in cls.get_expired_filters(now))
+
+    @classmethod
+    def purge_expired(cls, batch_size=5000, now=None):
+        """
+        Delete the expired records in batches of batch_size so the table is never locked for long, returns the
+        number deleted
+        """
+        deleted = 0
+        for expired in cls.get_expired_filters(now):
+            while True:
+                batch_ids = list(
+                    StatusLog.objects.filter(expired).order_by().values_list('id', flat=True)[:batch_size]
+                )
+                if not batch_ids:
+                    break
+                deleted += StatusLog.objects.filter(id__in=batch_ids).delete()[0]
+        return deleted
+
+    @staticmethod
+    def get_page(filters=None, before=None, before_id=None, page_size=50):
+        """
+        Returns a page of log records, newest first, and the cursor of the next page. Pages are read with a
+        (create_datetime, id) keyset rather than an OFFSET, so a page deep in the log costs the same as the first.
+        """
+        queryset = StatusLog.objects.filter(**(filters or {})).order_by('-create_datetime', '-id')
+        if before and before_id:
+            queryset = queryset.filter(
+                Q(create_datetime__lt=before) | Q(create_datetime=before, id__lt=before_id)
+            )
+        records = list(queryset[:page_size + 1])
+
+        next_cursor = None
+        if len(records) > page_size:
+            records = records[:page_size]
+            next_cursor = {
+                'before': records[-1].create_datetime.isoformat(),
+                'before_id': records[-1].id,
+            }
+        return records, next_cursor
+
+    @staticmethod
+    def parse_cursor(before, before_id):
+        """
+        Returns the cursor from the browser's GET parameters, or (None, None) when absent or invalid
+        """
+        try:
+            return datetime.fromisoformat(before), int(before_id)
+        except (TypeError, ValueError):
+            return None, None
@@ -0,0 +1,28 @@
+# CustomDBLogger/template_backend.py
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from CustomDBLogger.request_metrics import timed
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timed('template'):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, with the render time of each template added to the template_time of the request
+    recorded by the RequestMetricsMiddleware. Templates included by a template are part of its render time.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
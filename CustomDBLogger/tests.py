@@ -1 +1,191 @@
-from django.test import TestCase
+import logging
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.template import engines
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .db_log_handler import BatchingDatabaseLogHandler
+from .middleware import RequestMetricsMiddleware
+from .models import RequestMetric, StatusLog
+from .request_metrics import timed
+from .services.request_metrics_service import RequestMetricsService
+from .services.status_log_service import StatusLogService
+
+
+class BatchingDatabaseLogHandlerTest(TransactionTestCase):
+    def setUp(self):
+        self.handler = BatchingDatabaseLogHandler(batch_size=10, flush_interval=0.1)
+        self.logger = logging.getLogger('test_batching_db_log')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.handler.close()
+
+    def test_emit_does_not_query_the_database(self):
+        with self.assertNumQueries(0):
+            for index in range(25):
+                self.logger.info(f'Record {index}', extra={'custom_category': 'Test'})
+
+    def test_records_saved_on_close(self):
+        for index in range(25):
+            self.logger.info(f'Record {index}', extra={'custom_category': 'Test'})
+        try:
+            raise ValueError('Bad value')
+        except ValueError:
+            self.logger.exception('Failed')
+
+        self.handler.close()
+
+        self.assertEqual(StatusLog.objects.filter(custom_category='Test').count(), 25)
+        failed = StatusLog.objects.get(msg='Failed')
+        self.assertEqual(failed.level, logging.ERROR)
+        self.assertIn('ValueError: Bad value', failed.trace)
+
+
+@override_settings(STATUS_LOG_RETENTION={
+    'default_days': 30,
+    'categories': {'Payments': 365},
+    'levels': {'ERROR': 90},
+})
+class StatusLogServiceTest(TestCase):
+    def create_status_log(self, days_old, level=logging.INFO, custom_category=None):
+        status_log = StatusLog.objects.create(
+            logger_name='db', level=level, msg=f'{days_old} days old', custom_category=custom_category
+        )
+        StatusLog.objects.filter(id=status_log.id).update(
+            create_datetime=timezone.now() - timedelta(days=days_old)
+        )
+        return status_log
+
+    def test_retention_days_uses_longest_policy(self):
+        self.assertEqual(StatusLogService.get_retention_days(None, logging.INFO), 30)
+        self.assertEqual(StatusLogService.get_retention_days('Email', logging.ERROR), 90)
+        self.assertEqual(StatusLogService.get_retention_days('Payments', logging.ERROR), 365)
+
+    def test_purge_expired(self):
+        expired = [
+            self.create_status_log(40),
+            self.create_status_log(40, custom_category='Email'),
+            self.create_status_log(100, level=logging.ERROR),
+        ]
+        kept = [
+            self.create_status_log(10),
+            self.create_status_log(40, level=logging.ERROR),
+            self.create_status_log(200, level=logging.ERROR, custom_category='Payments'),
+        ]
+
+        self.assertEqual(StatusLogService.count_expired(), 3)
+        self.assertEqual(StatusLogService.purge_expired(batch_size=1), 3)
+
+        self.assertFalse(StatusLog.objects.filter(id__in=[status_log.id for status_log in expired]).exists())
+        self.assertEqual(StatusLog.objects.count(), len(kept))
+
+    def test_keyset_pages(self):
+        for days_old in range(5):
+            self.create_status_log(days_old)
+
+        first_page, cursor = StatusLogService.get_page(page_size=2)
+        self.assertEqual([status_log.msg for status_log in first_page], ['0 days old', '1 days old'])
+
+        before, before_id = StatusLogService.parse_cursor(cursor['before'], cursor['before_id'])
+        second_page, cursor = StatusLogService.get_page(before=before, before_id=before_id, page_size=2)
+        self.assertEqual([status_log.msg for status_log in second_page], ['2 days old', '3 days old'])
+
+        before, before_id = StatusLogService.parse_cursor(cursor['before'], cursor['before_id'])
+        last_page, cursor = StatusLogService.get_page(before=before, before_id=before_id, page_size=2)
+        self.assertEqual([status_log.msg for status_log in last_page], ['4 days old'])
+        self.assertIsNone(cursor)
+
+
+@override_settings(
+    REQUEST_METRICS_ENABLED=True,
+    REQUEST_METRICS_SERVER_TIMING=False,
+    REQUEST_METRICS_BATCH_SIZE=1,
+    REQUEST_METRICS_DEFAULT_QUERY_BUDGET=2,
+    REQUEST_METRICS_QUERY_BUDGETS={'test:busy': 10},
+)
+class RequestMetricsMiddlewareTest(TestCase):
+    def setUp(self):
+        RequestMetricsService.flush()
+
+    def get(self, view_name, query_count, user=None):
+        def view(request):
+            request.resolver_match = SimpleNamespace(view_name=view_name)
+            for _ in range(query_count):
+                list(StatusLog.objects.all())
+            with timed('pdf'):
+                html = engines['django'].from_string('{% for n in numbers %}{{ n }}{% endfor %}').render(
+                    {'numbers': range(3)}
+                )
+            return HttpResponse(html)
+
+        request = RequestFactory().get('/metrics-test/')
+        request.user = user or AnonymousUser()
+        return RequestMetricsMiddleware(view)(request)
+
+    def test_request_is_recorded(self):
+        response = self.get('test:view', 2)
+
+        request_metric = RequestMetric.objects.get()
+        self.assertEqual(request_metric.view_name, 'test:view')
+        self.assertEqual(request_metric.method, 'GET')
+        self.assertEqual(request_metric.status_code, 200)
+        self.assertEqual(request_metric.query_count, 2)
+        self.assertGreater(request_metric.template_time, 0)
+        self.assertGreaterEqual(request_metric.pdf_time, request_metric.template_time)
+        self.assertGreaterEqual(request_metric.total_time, request_metric.pdf_time)
+        self.assertNotIn('Server-Timing', response)
+
+    def test_server_timing_header_for_staff(self):
+        response = self.get('test:view', 1, user=SimpleNamespace(is_staff=True))
+
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+        self.assertIn('total;dur=', response['Server-Timing'])
+
+    def test_query_budget_warning(self):
+        with self.assertLogs('db', level='WARNING') as logs:
+            self.get('test:view', 3)
+            self.get('test:busy', 3)
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(logs.records[0].custom_category, 'Query Budget')
+        self.assertIn('test:view ran 3 queries', logs.output[0])
+
+    @override_settings(REQUEST_METRICS_BATCH_SIZE=3)
+    def test_metrics_are_saved_in_batches(self):
+        self.get('test:view', 0)
+        self.get('test:view', 0)
+        self.assertFalse(RequestMetric.objects.exists())
+
+        with self.assertNumQueries(1):
+            self.get('test:view', 0)
+        self.assertEqual(RequestMetric.objects.count(), 3)
+
+    def test_view_summary(self):
+        for total_time in range(1, 101):
+            RequestMetric.objects.create(
+                view_name='test:view', method='GET', status_code=200, query_count=total_time % 10,
+                db_time=0, template_time=0, pdf_time=0, total_time=total_time,
+            )
+        RequestMetric.objects.create(
+            view_name='test:old', method='GET', status_code=200, query_count=1, db_time=0, template_time=0,
+            pdf_time=0, total_time=1, create_datetime=timezone.now() - timedelta(days=30),
+        )
+
+        summary = RequestMetricsService.get_view_summary(timezone.now() - timedelta(days=7))
+
+        self.assertEqual(len(summary), 1)
+        self.assertEqual(summary[0]['view_name'], 'test:view')
+        self.assertEqual(summary[0]['requests'], 100)
+        self.assertAlmostEqual(summary[0]['p50_time'], 50.5)
+        self.assertAlmostEqual(summary[0]['p95_time'], 95.05)
+        self.assertEqual(summary[0]['max_queries'], 9)
+        self.assertEqual(RequestMetricsService.purge(timezone.now() - timedelta(days=7)), 1)
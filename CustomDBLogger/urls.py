@@ -0,0 +1,13 @@
+# CustomDBLogger/urls.py
+
+from django.urls import path
+
+from CustomDBLogger.views import (
+    status_log_listview,
+)
+
+app_name = 'logs'  # This is the namespace, so you can reverse urls with logs:*
+
+urlpatterns = [
+    path('logs/', status_log_listview, name='status-log-list'),
+]
@@ -1,3 +1,52 @@
-from django.shortcuts import render
+# CustomDBLogger/views.py
 
-# Create your views here.
+from urllib.parse import urlencode
+
+from django.contrib.auth.decorators import login_required, permission_required
+from django.template.response import TemplateResponse
+
+from .models import LOG_LEVELS
+from .services.status_log_service import StatusLogService
+
+
+def parse_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@login_required
+@permission_required('CustomDBLogger.view_statuslog', raise_exception=True)
+def status_log_listview(request):
+    """
+    Browse the StatusLog records newest first, filtered by level and category. Pages are keyset paginated on
+    (create_datetime, id) so older pages stay fast however large the table grows.
+    """
+    level = parse_int(request.GET.get('level'))
+    category = request.GET.get('category', '').strip()
+
+    filters = {}
+    if level is not None:
+        filters['level'] = level
+    if category:
+        filters['custom_category'] = category
+
+    before, before_id = StatusLogService.parse_cursor(request.GET.get('before'), request.GET.get('before_id'))
+    status_logs, next_cursor = StatusLogService.get_page(filters, before, before_id)
+
+    next_page_query = None
+    if next_cursor:
+        next_page_query = urlencode({
+            **({'level': level} if level is not None else {}),
+            **({'category': category} if category else {}),
+            **next_cursor,
+        })
+
+    return TemplateResponse(request, 'status_log_list.html', {
+        'status_logs': status_logs,
+        'log_levels': LOG_LEVELS,
+        'selected_level': level,
+        'selected_category': category,
+        'next_page_query': next_page_query,
+    })
@@ -76,12 +76,14 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'CustomDBLogger.middleware.RequestMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django_htmx.middleware.HtmxMiddleware',
+    'fairs.middleware.FairContextMiddleware',
 
     # Add the account middleware:
     "allauth.account.middleware.AccountMiddleware",
@@ -92,7 +94,8 @@ ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'CustomDBLogger.template_backend.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -122,6 +125,40 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Local memory by default, set CACHE_URL (e.g. redis://127.0.0.1:6379/1) to share the cache between workers
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Seconds that dashboard counters are served from the cache between invalidations
+DASHBOARD_METRICS_CACHE_TIMEOUT = env.int('DASHBOARD_METRICS_CACHE_TIMEOUT', default=300)
+
+# Seconds between checks of the clock for the current fair year window
+FAIR_YEAR_CACHE_TIMEOUT = env.int('FAIR_YEAR_CACHE_TIMEOUT', default=60)
+
+# Seconds that the current fair and its events are served from the cache between invalidations
+FAIR_CONTEXT_CACHE_TIMEOUT = env.int('FAIR_CONTEXT_CACHE_TIMEOUT', default=60)
+
+# Per request query counts and timings recorded by the RequestMetricsMiddleware, off unless enabled
+REQUEST_METRICS_ENABLED = env.bool('REQUEST_METRICS_ENABLED', default=False)
+# Send the Server-Timing header to every user rather than only to staff
+REQUEST_METRICS_SERVER_TIMING = env.bool('REQUEST_METRICS_SERVER_TIMING', default=False)
+# Requests buffered by each process before their metrics are saved, and the longest a request waits to be saved
+REQUEST_METRICS_BATCH_SIZE = env.int('REQUEST_METRICS_BATCH_SIZE', default=50)
+REQUEST_METRICS_FLUSH_INTERVAL = env.int('REQUEST_METRICS_FLUSH_INTERVAL', default=60)
+# Queries a request may run before a Query Budget warning is logged, by view name with a default for other views
+REQUEST_METRICS_DEFAULT_QUERY_BUDGET = env.int('REQUEST_METRICS_DEFAULT_QUERY_BUDGET', default=100)
+REQUEST_METRICS_QUERY_BUDGETS = {}
+
+# Mailouts are queued on the Email outbox and sent by the process_email_outbox worker
+EMAIL_OUTBOX_BATCH_SIZE = env.int('EMAIL_OUTBOX_BATCH_SIZE', default=50)
+EMAIL_OUTBOX_RATE_LIMIT = env.float('EMAIL_OUTBOX_RATE_LIMIT', default=10)
+EMAIL_OUTBOX_MAX_ATTEMPTS = env.int('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5)
+EMAIL_OUTBOX_RETRY_DELAY = env.int('EMAIL_OUTBOX_RETRY_DELAY', default=60)
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
@@ -177,6 +214,18 @@ FIXTURE_DIRS = [BASE_DIR / 'fixtures']
 MEDIA_ROOT = BASE_DIR / 'media'
 MEDIA_URL = '/media/'
 
+# PDF reports are rendered by the process_pdf_jobs worker when the queue is enabled, otherwise within the request
+PDF_JOB_QUEUE_ENABLED = env.bool('PDF_JOB_QUEUE_ENABLED', default=False)
+PDF_JOB_WORKERS = env.int('PDF_JOB_WORKERS', default=2)
+PDF_JOB_MAX_ATTEMPTS = env.int('PDF_JOB_MAX_ATTEMPTS', default=3)
+PDF_JOB_RETENTION_DAYS = env.int('PDF_JOB_RETENTION_DAYS', default=7)
+
+# Size in bytes of the rendered invoice and passpack cache under MEDIA_ROOT/pdf_cache
+PDF_CACHE_MAX_SIZE = env.int('PDF_CACHE_MAX_SIZE', default=200 * 1024 * 1024)
+
+# Strategy used by the automatic site allocation, greedy or optimal
+SITE_ALLOCATION_STRATEGY = env('SITE_ALLOCATION_STRATEGY', default='greedy')
+
 # allauth settings
 
 ACCOUNT_ADAPTER = 'accounts.adapter.AccountAdapter'
@@ -220,6 +269,18 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
 
+# Days StatusLog records are kept by the purge_status_logs command, the longest applicable policy wins
+STATUS_LOG_RETENTION = {
+    'default_days': env.int('STATUS_LOG_RETENTION_DAYS', default=180),
+    'categories': {
+        'Payments': 730,
+        'Stripe Payment': 730,
+    },
+    'levels': {
+        'ERROR': 365,
+    },
+}
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -234,8 +295,11 @@ LOGGING = {
     'handlers': {
         'db_log': {
             'level': 'DEBUG',
-            'class': 'CustomDBLogger.db_log_handler.DatabaseLogHandler',
-            'formatter': 'verbose'
+            'class': 'CustomDBLogger.db_log_handler.BatchingDatabaseLogHandler',
+            'formatter': 'verbose',
+            'batch_size': env.int('DB_LOG_BATCH_SIZE', default=100),
+            'flush_interval': env.float('DB_LOG_FLUSH_INTERVAL', default=2.0),
+            'queue_size': env.int('DB_LOG_QUEUE_SIZE', default=10000),
         },
         'console': {
             'class': 'logging.StreamHandler',
@@ -32,6 +32,7 @@ urlpatterns = [
     path('', include('accounts.urls')),
     path('accounts/', include('allauth.urls')),
     path('emails/', include('emails.urls')),
+    path('', include('CustomDBLogger.urls')),
     path('', include('faq.urls')),
     path('', include('notices.urls')),
     path('foodlicence/', include(('foodlicence.urls', "foodlicence"), namespace="foodlicence")),
@@ -3,20 +3,27 @@
 from django.contrib import admin
 from django.template.defaultfilters import linebreaksbr
 from .models import Email
+from .services.email_outbox_service import EmailOutboxService
 
 
 class EmailAdmin(admin.ModelAdmin):
-    list_display = ["stallholder", "recipient", "from_email", "subject", "body","date_sent", "ok"]
-    list_filter = ["date_sent", "ok"]
+    list_display = ["stallholder", "recipient", "from_email", "subject", "body","date_sent", "ok", "email_status",
+                    "attempts"]
+    list_filter = ["date_sent", "ok", "email_status"]
     readonly_fields = [
         "recipient",
         "subject",
         "body",
         "date_sent",
         "ok",
+        "email_status",
+        "attempts",
+        "last_attempted",
+        "last_error",
     ]
+    actions = ["retry_failed_emails"]
     search_fields = ["subject", "body", "recipient" ]
-    exclude = ["body"]
+    exclude = ["body", "html_body"]
 
     def has_delete_permission(self, *args, **kwargs):
         return False
@@ -29,5 +36,10 @@ class EmailAdmin(admin.ModelAdmin):
 
     body_formatted.short_description = "body"
 
+    @admin.action(description="Queue the selected failed emails to be sent again")
+    def retry_failed_emails(self, request, queryset):
+        count = EmailOutboxService.retry_failed_emails(queryset)
+        self.message_user(request, f"{count} emails queued to be sent again")
+
 
 admin.site.register(Email, EmailAdmin)
\ No newline at end of file
@@ -8,17 +8,16 @@ import logging
 
 from accounts.models import CustomUser
 from config import settings
-from django.core.mail import EmailMultiAlternatives, BadHeaderError
+from django.core.mail import BadHeaderError
 from smtplib import SMTPException
 from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.utils import timezone
 from collections import defaultdict
 
 from .models import  Email
+from .services.email_outbox_service import EmailOutboxService
 
-from fairs.models import (
-    Fair
-)
+from fairs.services.fair_context_service import FairContextService
 from registration.models import (
     StallRegistration,
     CommentType
@@ -29,85 +28,81 @@ db_logger = logging.getLogger('db')
 
 def bulk_registration_emails(status, subject_type, body):
     """
-    Function to send a single email to each stallholder who has the stall registration
+    Function to queue a single email to each stallholder who has the stall registration
     status passed in to the function.
+    The emails are added to the outbox with one bulk insert and sent by the process_email_outbox
+    worker, progress can be followed on the email history dashboard.
     """
     # Query for stall registrations with the given status
-    stall_registrations_qs = StallRegistration.registrationcurrentallmgr.filter(booking_status=status)
-    current_fair = Fair.currentfairmgr.all().last()
-
-    if stall_registrations_qs.exists():
-        # Create a dictionary to store all site allocations by stallholder
-        stallholder_dict = defaultdict(list)
-
-        for stall_registration in stall_registrations_qs:
-            stallholder_dict[stall_registration.stallholder].append(stall_registration)
-
-        # Send a single email per stallholder
-        for stallholder, registrations in stallholder_dict.items():
-            try:
-                # Retrieve the CommentType instance for the given subject_type
-                subject_type_instance = CommentType.objects.get(type_name=subject_type)
-
-                # Create email instance
-                email = Email.objects.create(
-                    subject_type=subject_type_instance,
-                    fair=current_fair,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    stallholder=stallholder,
-                    recipient=stallholder.email,
-                    subject=f'Martinborough Fair {current_fair.fair_year} - {subject_type}',
-                    body=body,
-                )
-
-            except CommentType.DoesNotExist:
-                db_logger.error(f"CommentType with name '{subject_type}' does not exist.",
-                    extra={'custom_category': 'Email'})
-                continue
-
-            except Exception as e:
-                db_logger.error(f"Failed to save email to database (create): {e}",
-                                extra={'custom_category': 'Email'})
-                continue
-
-            context = {
-                'subject': f'Martinborough Fair {current_fair.fair_year} - {subject_type}',
-                'body': body,
-            }
-
-            html_content = render_to_string("email/base_email.html", context)
-            text_content = strip_tags(html_content)
-
-            # Send the email
-            mail = EmailMultiAlternatives(
-                subject=strip_tags(subject_type),
-                from_email=settings.EMAIL_HOST_USER,
-                to=[stallholder.email],
-            )
-            mail.attach_alternative(html_content, "text/html")
-            try:
-                mail.send(fail_silently=False)
-                # Update the `ok` field after successful send
-                email.ok = True
-                email.save(update_fields=['ok'])
-            except BadHeaderError:
-                db_logger.error(f'Invalid header found on {stallholder.email}',
-                                extra={'custom_category': 'Email'})
-            except SMTPException as e:
-                db_logger.error(f'There was an error sending an email: {e}',
-                                extra={'custom_category': 'Email'})
-    else:
+    stall_registrations = StallRegistration.registrationcurrentallmgr.filter(
+        booking_status=status
+    ).select_related('stallholder')
+    current_fair = FairContextService.get_current_fair()
+
+    # Create a dictionary to store all site allocations by stallholder
+    stallholder_dict = defaultdict(list)
+
+    for stall_registration in stall_registrations:
+        stallholder_dict[stall_registration.stallholder].append(stall_registration)
+
+    if not stallholder_dict:
         db_logger.error(f'No stall registrations found for the given status: {subject_type}',
                         extra={'custom_category': 'Email'})
+        return
+
+    try:
+        # Retrieve the CommentType instance for the given subject_type
+        subject_type_instance = CommentType.objects.get(type_name=subject_type)
+    except CommentType.DoesNotExist:
+        db_logger.error(f"CommentType with name '{subject_type}' does not exist.",
+            extra={'custom_category': 'Email'})
+        return
+
+    subject = f'Martinborough Fair {current_fair.fair_year} - {subject_type}'
+
+    context = {
+        'subject': subject,
+        'body': body,
+    }
+
+    # Every stallholder receives the same content so the template is rendered once
+    html_content = render_to_string("email/base_email.html", context)
+
+    # Queue the email instances, one per stallholder
+    try:
+        EmailOutboxService.enqueue([
+            Email(
+                subject_type=subject_type_instance,
+                fair=current_fair,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                stallholder=stallholder,
+                recipient=stallholder.email,
+                subject=subject,
+                body=body,
+                html_body=html_content,
+            )
+            for stallholder in stallholder_dict
+        ])
+    except Exception as e:
+        db_logger.error(f"Failed to save email to database (bulk create): {e}",
+                        extra={'custom_category': 'Email'})
 
 
 def single_registration_email(stallholder_id, subject_type, recipient, subject, body):
     '''
     Function to send an email to a single stallholder.
     Called from the convener_stall_registration_detail_view
+    An email that cannot be sent is left on the outbox for the process_email_outbox worker to retry.
     '''
     stallholder = CustomUser.objects.get(id=stallholder_id)
-    current_fair = Fair.currentfairmgr.all().last()
+    current_fair = FairContextService.get_current_fair()
+
+    context = {
+        'subject': subject,
+        'body': body
+    }
+
+    html_content = render_to_string("email/base_email.html", context)
 
     try:
         email = Email.objects.create(
@@ -118,36 +113,29 @@ def single_registration_email(stallholder_id, subject_type, recipient, subject,
             recipient=recipient,
             subject=subject,
             body=body,
+            html_body=html_content,
+            email_status=Email.SENDING,
+            attempts=1,
+            last_attempted=timezone.now(),
         )
     except Exception as e:
         db_logger.error(f'Failed to save email to database (create) {e}',
                         extra={'custom_category': 'Email'}
                         )
 
-    context = {
-        'subject': subject,
-        'body': body
-    }
-
-    html_content = render_to_string("email/base_email.html", context)
-    text_content = strip_tags(html_content)
-    mail = EmailMultiAlternatives(
-        subject=strip_tags(subject),
-        from_email=settings.EMAIL_HOST_USER,
-        to=[recipient],
-    )
-    mail.attach_alternative(html_content, "text/html")
+    mail = EmailOutboxService.build_message(email)
     try:
         mail.send(fail_silently=False)
         # Update the `ok` field after successful send
-        email.ok = True
-        email.save(update_fields=['ok'])
-    except BadHeaderError:
+        EmailOutboxService.mark_sent(email)
+    except BadHeaderError as e:
         db_logger.error(f'Invalid header found on {stallholder.email}',
                         extra={'custom_category': 'Email'}
                         )
+        EmailOutboxService.mark_failed(email, e, retry=False)
     except SMTPException as e:
         db_logger.error(f'There was an error sending an email. {e}',
                         extra={'custom_category': 'Email'}
                         )
+        EmailOutboxService.mark_failed(email, e)
 
@@ -0,0 +1,91 @@
+# emails/management/commands/process_email_outbox.py
+
+import time
+
+from django.conf import settings
+from django.core.mail import BadHeaderError, get_connection
+from django.core.management.base import BaseCommand
+
+from emails.services.email_outbox_service import EmailOutboxService
+
+
+class Command(BaseCommand):
+    """
+    Worker that drains the Email outbox. Due emails are claimed in batches, sent over one mail connection per batch
+    at no more than the rate limit and failures are retried with exponential backoff. Several workers can run at once.
+    Usage: python3 manage.py process_email_outbox [--batch-size 50] [--rate-limit 10] [--once]
+    """
+    help = 'Send the queued emails in the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 50),
+            help='Number of emails claimed and sent over one connection',
+        )
+        parser.add_argument(
+            '--rate-limit',
+            type=float,
+            default=getattr(settings, 'EMAIL_OUTBOX_RATE_LIMIT', 10),
+            help='Maximum emails sent per second by this worker',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5,
+            help='Seconds to wait between polls of an empty outbox',
+        )
+        parser.add_argument(
+            '--stall-timeout',
+            type=int,
+            default=300,
+            help='Seconds after which a Sending email is treated as abandoned and queued again',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no emails are due rather than polling',
+        )
+
+    def handle(self, *args, **options):
+        send_interval = 1 / options['rate_limit'] if options['rate_limit'] > 0 else 0
+
+        while True:
+            requeued = EmailOutboxService.requeue_stalled_emails(options['stall_timeout'])
+            if requeued:
+                self.stdout.write(self.style.WARNING(f'Requeued {requeued} stalled emails'))
+
+            emails = EmailOutboxService.claim_emails(options['batch_size'])
+            if not emails:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            sent_count = 0
+            try:
+                connection = get_connection(fail_silently=False)
+                connection.open()
+            except Exception as e:
+                for email in emails:
+                    EmailOutboxService.mark_failed(email, e)
+                self.stdout.write(self.style.ERROR(f'Could not open a mail connection: {e}'))
+                continue
+
+            try:
+                for email in emails:
+                    started = time.monotonic()
+                    try:
+                        connection.send_messages([EmailOutboxService.build_message(email, connection)])
+                        EmailOutboxService.mark_sent(email)
+                        sent_count += 1
+                    except BadHeaderError as e:
+                        EmailOutboxService.mark_failed(email, e, retry=False)
+                    except Exception as e:
+                        EmailOutboxService.mark_failed(email, e)
+                    time.sleep(max(send_interval - (time.monotonic() - started), 0))
+            finally:
+                connection.close()
+
+            self.stdout.write(self.style.SUCCESS(f'Sent {sent_count} of {len(emails)} emails'))
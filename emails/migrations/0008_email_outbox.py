@@ -0,0 +1,58 @@
+# Generated by Django 4.2.14 on 2026-10-18 23:07
+
+from django.db import migrations, models
+import django_fsm
+
+
+def set_existing_email_status(apps, schema_editor):
+    """
+    Emails created before the outbox were sent inline, record them as Sent or Failed so the worker never resends them
+    """
+    Email = apps.get_model('emails', 'Email')
+    Email.objects.filter(ok=True).update(email_status='Sent')
+    Email.objects.filter(ok=False).update(email_status='Failed')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emails', '0007_email_subject_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='email',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='attempts'),
+        ),
+        migrations.AddField(
+            model_name='email',
+            name='email_status',
+            field=django_fsm.FSMField(choices=[('Queued', 'Queued'), ('Sending', 'Sending'), ('Sent', 'Sent'), ('Failed', 'Failed')], default='Queued', max_length=50, verbose_name='Email State'),
+        ),
+        migrations.AddField(
+            model_name='email',
+            name='html_body',
+            field=models.TextField(blank=True, null=True, verbose_name='html body'),
+        ),
+        migrations.AddField(
+            model_name='email',
+            name='last_attempted',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='last attempted'),
+        ),
+        migrations.AddField(
+            model_name='email',
+            name='last_error',
+            field=models.TextField(blank=True, null=True, verbose_name='last error'),
+        ),
+        migrations.AddField(
+            model_name='email',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='next attempt at'),
+        ),
+        migrations.AddIndex(
+            model_name='email',
+            index=models.Index(fields=['email_status', 'next_attempt_at'], name='emails_emai_email_s_95c0be_idx'),
+        ),
+        migrations.RunPython(set_existing_email_status, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,12 @@
-import datetime
 from django.db import models
 from django.conf import settings  # new
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from django_fsm import FSMField, transition
 from fairs.models import (
     Fair
 )
+from fairs.services.fair_year_service import FairYearService
 from registration.models import (
     CommentType
 )
@@ -16,16 +18,38 @@ class EmailHistoryCurrentManager(models.Manager):
     """
 
     def get_queryset(self):
-        current_year = datetime.datetime.now().year
-        next_year = current_year + 1
         return super().get_queryset().filter(
-            fair__fair_year__in=[current_year, next_year],
+            fair__fair_year__in=FairYearService.get_current_years(),
             fair__is_activated = True
         )
 
+class EmailOutboxManager(models.Manager):
+    """
+    Description: Queued emails that are due to be sent by the outbox worker, oldest first
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(
+            models.Q(next_attempt_at__isnull=True) | models.Q(next_attempt_at__lte=timezone.now()),
+            email_status=Email.QUEUED,
+        ).order_by('id')
+
+
 class Email(models.Model):
 
-    """Model to store outgoing email information"""
+    """Model to store outgoing email information, queued emails form the outbox drained by process_email_outbox"""
+
+    QUEUED = 'Queued'
+    SENDING = 'Sending'
+    SENT = 'Sent'
+    FAILED = 'Failed'
+
+    EMAIL_STATUS_CHOICES = [
+        (QUEUED, _('Queued')),
+        (SENDING, _('Sending')),
+        (SENT, _('Sent')),
+        (FAILED, _('Failed')),
+    ]
 
     stallholder = models.ForeignKey(
         settings.AUTH_USER_MODEL,  # new
@@ -50,11 +74,23 @@ class Email(models.Model):
     recipient = models.TextField(_("recipient"))
     subject = models.TextField(_("subject"))
     body = models.TextField(_("body"))
+    html_body = models.TextField(_("html body"), blank=True, null=True)
     ok = models.BooleanField(_("ok"), default=False, db_index=True)
+    email_status = FSMField(
+        default=QUEUED,
+        verbose_name='Email State',
+        choices=EMAIL_STATUS_CHOICES,
+        protected=False,
+    )
+    attempts = models.PositiveSmallIntegerField(_("attempts"), default=0)
+    next_attempt_at = models.DateTimeField(_("next attempt at"), blank=True, null=True)
+    last_attempted = models.DateTimeField(_("last attempted"), blank=True, null=True)
+    last_error = models.TextField(_("last error"), blank=True, null=True)
     date_sent = models.DateTimeField(_("date sent"), auto_now_add=True, db_index=True)
 
     objects = models.Manager()
     emailhistorycurrentmgr = EmailHistoryCurrentManager()
+    outboxmgr = EmailOutboxManager()
 
     def __str__(self):
         return "{s.recipient}: {s.subject}".format(s=self)
@@ -63,3 +99,27 @@ class Email(models.Model):
         verbose_name = _("email")
         verbose_name_plural = _("emails")
         ordering = ("-date_sent",)
+        indexes = [
+            models.Index(fields=['email_status', 'next_attempt_at']),
+        ]
+
+    @transition(field=email_status, source=["Queued"], target="Sending")
+    def to_email_status_sending(self):
+        self.attempts += 1
+        self.last_attempted = timezone.now()
+
+    @transition(field=email_status, source=["Sending"], target="Sent")
+    def to_email_status_sent(self):
+        self.ok = True
+        self.last_error = None
+
+    @transition(field=email_status, source=["Sending"], target="Failed")
+    def to_email_status_failed(self):
+        pass
+
+    @transition(field=email_status, source=["Sending", "Failed"], target="Queued")
+    def to_email_status_queued(self):
+        """
+            Returns an email to the outbox for another attempt.
+        """
+        pass
@@ -0,0 +1,120 @@
+# emails/services/email_outbox_service.py
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from emails.models import Email
+
+db_logger = logging.getLogger('db')
+
+
+class EmailOutboxService:
+    """
+    Service class for the Email outbox.
+
+    Provides:
+        - Queuing of mailouts as Email rows in a single insert
+        - Claiming of due emails for a worker, skipping rows locked by another worker
+        - Recording of send results with retry and exponential backoff
+
+    Mailouts are committed to the outbox with the request and sent by the
+    process_email_outbox worker, so an interrupted request cannot leave a
+    mailout half sent and progress is visible in the email history.
+    """
+
+    @staticmethod
+    def get_max_attempts():
+        return getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+
+    @staticmethod
+    def get_retry_delay(attempts):
+        """
+        Seconds to wait before the next attempt, doubling with each failed attempt
+        """
+        return getattr(settings, 'EMAIL_OUTBOX_RETRY_DELAY', 60) * 2 ** max(attempts - 1, 0)
+
+    @staticmethod
+    def enqueue(emails):
+        """
+        Add unsaved Email instances to the outbox, returns the saved emails
+        """
+        for email in emails:
+            email.email_status = Email.QUEUED
+        return Email.objects.bulk_create(emails)
+
+    @staticmethod
+    def claim_emails(limit):
+        """
+        Move up to limit due emails to Sending. Rows locked by another worker are skipped so several workers can
+        drain the outbox at once without sending an email twice.
+        """
+        with transaction.atomic():
+            emails = list(Email.outboxmgr.select_for_update(skip_locked=True)[:limit])
+            for email in emails:
+                email.to_email_status_sending()
+            Email.objects.bulk_update(emails, ['email_status', 'attempts', 'last_attempted'])
+        return emails
+
+    @staticmethod
+    def build_message(email, connection=None):
+        mail = EmailMultiAlternatives(
+            subject=strip_tags(email.subject),
+            body=email.body if not email.html_body else strip_tags(email.html_body),
+            from_email=settings.EMAIL_HOST_USER,
+            to=[email.recipient],
+            connection=connection,
+        )
+        if email.html_body:
+            mail.attach_alternative(email.html_body, "text/html")
+        return mail
+
+    @staticmethod
+    def mark_sent(email):
+        email.to_email_status_sent()
+        email.save(update_fields=['email_status', 'ok', 'last_error'])
+
+    @classmethod
+    def mark_failed(cls, email, error, retry=True):
+        """
+        Record a send failure, the email is queued again with backoff until it has used EMAIL_OUTBOX_MAX_ATTEMPTS.
+        Errors that another attempt cannot fix, such as an invalid header, are recorded with retry False.
+        """
+        email.last_error = str(error)
+        if retry and email.attempts < cls.get_max_attempts():
+            email.to_email_status_queued()
+            email.next_attempt_at = timezone.now() + timedelta(seconds=cls.get_retry_delay(email.attempts))
+        else:
+            email.to_email_status_failed()
+            db_logger.error(f'Email to {email.recipient} failed after {email.attempts} attempts: {error}',
+                            extra={'custom_category': 'Email'})
+        email.save(update_fields=['email_status', 'last_error', 'next_attempt_at'])
+
+    @classmethod
+    def requeue_stalled_emails(cls, timeout):
+        """
+        Return emails left Sending for longer than timeout seconds, e.g. by a killed worker, to the outbox
+        """
+        stalled = Email.objects.filter(
+            email_status=Email.SENDING,
+            last_attempted__lt=timezone.now() - timedelta(seconds=timeout),
+        )
+        for email in stalled:
+            cls.mark_failed(email, f'Send did not complete within {timeout} seconds')
+        return len(stalled)
+
+    @staticmethod
+    def retry_failed_emails(queryset):
+        """
+        Put failed emails back on the outbox with a fresh set of attempts, returns the number queued
+        """
+        return queryset.filter(email_status=Email.FAILED).update(
+            email_status=Email.QUEUED,
+            attempts=0,
+            next_attempt_at=None,
+        )
@@ -1,3 +1,114 @@
-from django.test import TestCase
+from datetime import datetime
+from io import StringIO
+from smtplib import SMTPException
 
-# Create your tests here.
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+
+from accounts.models import CustomUser
+from emails.backend import bulk_registration_emails
+from emails.models import Email
+from emails.services.email_outbox_service import EmailOutboxService
+from fairs.models import Fair
+from fairs.services.fair_context_service import FairContextService
+from registration.models import CommentType, StallRegistration
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise SMTPException('Connection refused')
+
+
+@override_settings(EMAIL_OUTBOX_RATE_LIMIT=0)
+class BulkRegistrationEmailsTest(TestCase):
+    def setUp(self):
+        self.fair = Fair.objects.create(
+            fair_name='Email Test Fair',
+            fair_year=str(datetime.now().year),
+            fair_description='Test fair',
+            is_activated=True,
+        )
+        self.comment_type = CommentType.objects.create(type_name='Booking Status')
+
+    def create_booked_registrations(self, start, count):
+        for index in range(start, start + count):
+            stallholder = CustomUser.objects.create(
+                username=f'stallholder{index}@example.com',
+                email=f'stallholder{index}@example.com',
+            )
+            StallRegistration.objects.create(
+                fair=self.fair,
+                stallholder=stallholder,
+                stall_manager_name='Manager',
+                stall_description='Stall',
+                products_on_site='Products',
+                total_charge=0,
+                booking_status='Booked',
+            )
+
+    def send_booking_emails(self):
+        # Each run resolves the current fair afresh so the counts compare like with like
+        FairContextService.invalidate()
+        with CaptureQueriesContext(connection) as queries:
+            bulk_registration_emails('Booked', 'Booking Status', 'Your stall is booked')
+        return len(queries)
+
+    def test_one_email_per_stallholder_queued(self):
+        self.create_booked_registrations(1, 3)
+
+        self.send_booking_emails()
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Email.outboxmgr.count(), 3)
+
+    def test_outbox_worker_sends_and_marks_ok(self):
+        self.create_booked_registrations(1, 3)
+        self.send_booking_emails()
+
+        call_command('process_email_outbox', '--once', stdout=StringIO())
+
+        self.assertEqual(Email.objects.filter(email_status=Email.SENT).count(), 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(Email.objects.filter(ok=True, subject_type=self.comment_type).count(), 3)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['stallholder1@example.com', 'stallholder2@example.com', 'stallholder3@example.com'],
+        )
+
+    @override_settings(
+        EMAIL_BACKEND='emails.tests.FailingEmailBackend', EMAIL_OUTBOX_MAX_ATTEMPTS=2, EMAIL_OUTBOX_RETRY_DELAY=0
+    )
+    def test_failed_sends_are_retried_then_failed(self):
+        self.create_booked_registrations(1, 1)
+        self.send_booking_emails()
+
+        email = EmailOutboxService.claim_emails(10)[0]
+        EmailOutboxService.mark_failed(email, SMTPException('Connection refused'))
+        email.refresh_from_db()
+        self.assertEqual(email.email_status, Email.QUEUED)
+        self.assertEqual(email.attempts, 1)
+
+        call_command('process_email_outbox', '--once', stdout=StringIO())
+        email.refresh_from_db()
+        self.assertEqual(email.email_status, Email.FAILED)
+        self.assertEqual(email.attempts, 2)
+        self.assertFalse(email.ok)
+
+    def test_queries_do_not_grow_with_recipients(self):
+        self.create_booked_registrations(1, 1)
+        single_recipient_queries = self.send_booking_emails()
+
+        self.create_booked_registrations(2, 5)
+        self.assertEqual(self.send_booking_emails(), single_recipient_queries)
+
+    def test_unknown_subject_type_sends_nothing(self):
+        self.create_booked_registrations(1, 2)
+
+        bulk_registration_emails('Booked', 'No Such Type', 'Body')
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(Email.objects.exists())
@@ -12,11 +12,9 @@ from .models import (
 from .forms import (
     EmailHistoryFilterForm
 )
-from fairs.models import (
-    Fair
-)
+from fairs.services.fair_context_service import FairContextService
 
-from django.db.models import Count
+from django.db.models import Count, Q
 
 from emails.services.email_history_service import EmailHistoryService
 
@@ -53,6 +51,14 @@ def email_history_dashboard_view(request):
     # Total email count
     total_count = email_histories.count()
 
+    # Outbox progress counts
+    status_counts = email_histories.aggregate(
+        queued_counts=Count('id', filter=Q(email_status=Email.QUEUED)),
+        sending_counts=Count('id', filter=Q(email_status=Email.SENDING)),
+        sent_counts=Count('id', filter=Q(email_status=Email.SENT)),
+        failed_counts=Count('id', filter=Q(email_status=Email.FAILED)),
+    )
+
     # Prepare data with percentages
     subject_stats = []
     for subject in subject_counts:
@@ -71,6 +77,7 @@ def email_history_dashboard_view(request):
         'email_histories': email_histories,
         'subject_stats': subject_stats,
         'total_count': total_count,
+        **status_counts,
     })
 
 
@@ -92,7 +99,7 @@ def email_history_listview(request):
     """
 
     filterform = EmailHistoryFilterForm(request.GET or None)
-    current_fair = Fair.currentfairmgr.last()
+    current_fair = FairContextService.get_current_fair()
     cards_per_page = 5
 
     template_name = (
@@ -6,6 +6,7 @@ from .models import (
     Event,
     Site,
     SiteHistory,
+    SiteTenure,
     Location,
     Zone,
     ZoneMap,
@@ -18,6 +19,6 @@ from .models import (
 )
 
 # Register your models here.
-myModels = [Fair, Event, Site, SiteHistory, Location, Zone, ZoneMap, EventSite, SiteAllocation, InventoryItem, InventoryItemFair, PowerBox, EventPower]
+myModels = [Fair, Event, Site, SiteHistory, SiteTenure, Location, Zone, ZoneMap, EventSite, SiteAllocation, InventoryItem, InventoryItemFair, PowerBox, EventPower]
 # iterable list
 admin.site.register(myModels)
@@ -688,7 +688,7 @@ class EventSiteListFilterForm(Form):
     """
 
     event = ModelChoiceField(
-        queryset=Event.currenteventfiltermgr.all(),
+        queryset=Event.objects.none(),
         empty_label='Show All',
         label='Event',
         required=False,
@@ -736,6 +736,11 @@ class EventSiteListFilterForm(Form):
     )
     form_purpose = forms.CharField(widget=forms.HiddenInput(), initial='filter')
 
+    def __init__(self, *args, **kwargs):
+        super(EventSiteListFilterForm, self).__init__(*args, **kwargs)
+        # Set per form so the events follow the current fair year rather than the year the module was imported
+        self.fields['event'].queryset = Event.currenteventfiltermgr.all()
+
     class Meta:
         fields = [
             'event',
@@ -826,7 +831,7 @@ class DashboardSiteFilterForm(Form):
     """
 
     event = ModelChoiceField(
-        queryset=Event.currenteventfiltermgr.all(),
+        queryset=Event.objects.none(),
         empty_label='Show All',
         label='Events',
         required=False,
@@ -847,6 +852,10 @@ class DashboardSiteFilterForm(Form):
         widget=Select(attrs={'class': 'form-control'})
     )
 
+    def __init__(self, *args, **kwargs):
+        super(DashboardSiteFilterForm, self).__init__(*args, **kwargs)
+        self.fields['event'].queryset = Event.currenteventfiltermgr.all()
+
     class Meta:
         model = EventSite
         fields = ['event', 'site']
@@ -1133,7 +1142,7 @@ class SiteAllocationListFilterForm(Form):
     """
 
     event = ModelChoiceField(
-        queryset=Event.currenteventfiltermgr.all(),
+        queryset=Event.objects.none(),
         empty_label='Show All',
         label='Event',
         required=False,
@@ -1170,6 +1179,10 @@ class SiteAllocationListFilterForm(Form):
     )
     form_purpose = forms.CharField(widget=forms.HiddenInput(), initial='filter')
 
+    def __init__(self, *args, **kwargs):
+        super(SiteAllocationListFilterForm, self).__init__(*args, **kwargs)
+        self.fields['event'].queryset = Event.currenteventfiltermgr.all()
+
     class Meta:
         fields = [
             'event',
@@ -1184,7 +1197,7 @@ class SiteAllocationFilterForm(Form):
     """
 
     event = ModelChoiceField(
-        queryset=Event.currenteventfiltermgr.all(),
+        queryset=Event.objects.none(),
         empty_label='Show All',
         label='Event',
         required=False,
@@ -1225,6 +1238,10 @@ class SiteAllocationFilterForm(Form):
 
     form_purpose = forms.CharField(widget=forms.HiddenInput(), initial='filter')
 
+    def __init__(self, *args, **kwargs):
+        super(SiteAllocationFilterForm, self).__init__(*args, **kwargs)
+        self.fields['event'].queryset = Event.currenteventfiltermgr.all()
+
     class Meta:
         fields = [
             'event',
@@ -1416,7 +1433,7 @@ class SiteHistoryUpdateFilterForm(Form):
 class SiteAllocationFilerForm(Form):
 
     event = ModelChoiceField(
-        queryset=Event.currenteventfiltermgr.all(),
+        queryset=Event.objects.none(),
         empty_label='Show All',
         label='Event',
         required=False,
@@ -1465,6 +1482,10 @@ class SiteAllocationFilerForm(Form):
         })
     )
 
+    def __init__(self, *args, **kwargs):
+        super(SiteAllocationFilerForm, self).__init__(*args, **kwargs)
+        self.fields['event'].queryset = Event.currenteventfiltermgr.all()
+
     class Meta:
         fields = [
             'zone',
@@ -1476,7 +1497,7 @@ class SiteAllocationFilerForm(Form):
 class PowerboxFilterForm(Form):
 
     event = ModelChoiceField(
-        queryset=Event.currenteventfiltermgr.all(),
+        queryset=Event.objects.none(),
         empty_label='Show All',
         label='Event',
         required=False,
@@ -1503,6 +1524,10 @@ class PowerboxFilterForm(Form):
 
     form_purpose = forms.CharField(widget=forms.HiddenInput(), initial='filter')
 
+    def __init__(self, *args, **kwargs):
+        super(PowerboxFilterForm, self).__init__(*args, **kwargs)
+        self.fields['event'].queryset = Event.currenteventfiltermgr.all()
+
     class Meta:
         fields = [
             'event',
@@ -0,0 +1,38 @@
+# fairs/management/commands/fix_site_history.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from fairs.models import InventoryItem
+from utils.stallholder_history_tools import SITE_HISTORY_FIXUPS, run_site_history_fixup
+
+
+class Command(BaseCommand):
+    """
+    Run a data repair over the full SiteHistory. Each fix-up updates only the rows that need changing with a single
+    UPDATE, use --dry-run to see how many rows would change first.
+    Usage: python3 manage.py fix_site_history <site_size|is_half_size> [--dry-run]
+    """
+    help = 'Run a bulk data repair of the stallholder site history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'fixup',
+            choices=sorted(SITE_HISTORY_FIXUPS),
+            help='; '.join(f'{name}: {fixup.description}' for name, fixup in sorted(SITE_HISTORY_FIXUPS.items())),
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count the rows that would be updated without changing them',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            count = run_site_history_fixup(options['fixup'], dry_run=options['dry_run'])
+        except InventoryItem.DoesNotExist as e:
+            raise CommandError(str(e))
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'{count} site history records would be updated'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Updated {count} site history records'))
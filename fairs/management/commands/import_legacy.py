@@ -0,0 +1,44 @@
+# fairs/management/commands/import_legacy.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.services.legacy_import_service import LEGACY_IMPORTS, LegacyImportService
+
+
+class Command(BaseCommand):
+    """
+    Load a CSV extract of the legacy system, users and sites before site history. Rows already loaded are skipped so
+    an extract can be loaded again after fixing the rows written to the reject file.
+    Usage: python3 manage.py import_legacy <users|sites|site_history> <path> [--rejects PATH] [--chunk-size 1000]
+    """
+    help = 'Load a CSV extract of legacy users, sites or site history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(LEGACY_IMPORTS), help='Kind of legacy extract')
+        parser.add_argument('path', help='Path of the CSV extract')
+        parser.add_argument(
+            '--rejects',
+            help='Path of the CSV file the rejected rows are written to, defaults to <path>.rejects.csv',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of rows loaded per query',
+        )
+
+    def handle(self, *args, **options):
+        rejects_path = options['rejects'] or f"{options['path']}.rejects.csv"
+        try:
+            summary = LegacyImportService.run(
+                options['kind'], options['path'], rejects_path, chunk_size=options['chunk_size']
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {summary['read']} rows: {summary['created']} created, {summary['existing']} already present, "
+            f"{summary['rejected']} rejected"
+        ))
+        if summary['rejected']:
+            self.stdout.write(self.style.WARNING(f'Rejected rows were written to {rejects_path}'))
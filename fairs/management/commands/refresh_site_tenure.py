@@ -0,0 +1,18 @@
+# fairs/management/commands/refresh_site_tenure.py
+
+from django.core.management.base import BaseCommand
+
+from fairs.services.site_tenure_service import SiteTenureService
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the SiteTenure summary from the full SiteHistory. The summary is refreshed when the site history is
+    populated, run this after the history is changed by other means such as Django Admin or a legacy import.
+    Usage: python3 manage.py refresh_site_tenure
+    """
+    help = 'Rebuild the SiteTenure summary of the stallholder site history'
+
+    def handle(self, *args, **options):
+        count = SiteTenureService.refresh()
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {count} site tenure records'))
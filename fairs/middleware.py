@@ -0,0 +1,23 @@
+# fairs/middleware.py
+
+from django.utils.functional import SimpleLazyObject
+
+from fairs.services.fair_context_service import FairContextService
+
+
+class FairContextMiddleware:
+    """
+    Resolves the current fair and events at most once per request. The FairContext is available to views as
+    request.fair_context, and FairContextService.get() returns the same context for the rest of the request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = FairContextService.start_request()
+        request.fair_context = SimpleLazyObject(FairContextService.get)
+        try:
+            return self.get_response(request)
+        finally:
+            FairContextService.end_request(token)
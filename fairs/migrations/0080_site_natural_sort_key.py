@@ -0,0 +1,52 @@
+# Generated by Django 4.2.14 on 2026-10-18 23:18
+
+import re
+
+from django.db import migrations, models
+
+
+SITE_NAME_PATTERN = re.compile(r'^([A-Za-z]*)([0-9]*)(.*)$')
+
+
+def backfill_site_sort_key(apps, schema_editor):
+    """
+    Split the existing site names into the site_prefix, site_number and site_suffix sort key
+    """
+    Site = apps.get_model('fairs', 'Site')
+    sites = list(Site.objects.only('id', 'site_name'))
+    for site in sites:
+        prefix, number, suffix = SITE_NAME_PATTERN.match(site.site_name).groups()
+        site.site_prefix = prefix
+        site.site_number = int(number) if number else None
+        site.site_suffix = suffix
+    Site.objects.bulk_update(sites, ['site_prefix', 'site_number', 'site_suffix'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fairs', '0079_alter_zonemap_map_pdf_alter_zonemap_year'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='site',
+            name='site_number',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='site',
+            name='site_prefix',
+            field=models.CharField(blank=True, default='', editable=False, max_length=40),
+        ),
+        migrations.AddField(
+            model_name='site',
+            name='site_suffix',
+            field=models.CharField(blank=True, default='', editable=False, max_length=40),
+        ),
+        migrations.RunPython(backfill_site_sort_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='site',
+            index=models.Index(fields=['site_prefix', 'site_number', 'site_suffix'], name='fairs_site_site_pr_bcbea4_idx'),
+        ),
+    ]
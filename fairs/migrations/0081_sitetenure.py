@@ -0,0 +1,68 @@
+# Generated by Django 4.2.14 on 2026-10-18 23:41
+
+from collections import defaultdict
+
+from django.conf import settings
+import django.contrib.postgres.fields
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_site_tenure(apps, schema_editor):
+    """
+    Build the SiteTenure summary from the existing SiteHistory
+    """
+    SiteHistory = apps.get_model('fairs', 'SiteHistory')
+    SiteTenure = apps.get_model('fairs', 'SiteTenure')
+    rows = (
+        SiteHistory.objects
+        .order_by()
+        .values('site_id', 'stallholder_id')
+        .annotate(years=ArrayAgg('year', distinct=True, ordering='year'))
+    )
+    tenures = [
+        SiteTenure(
+            site_id=row['site_id'],
+            stallholder_id=row['stallholder_id'],
+            years=row['years'],
+            years_held=len(row['years']),
+            first_year=row['years'][0],
+            last_year=row['years'][-1],
+        )
+        for row in rows
+    ]
+    latest_years = defaultdict(str)
+    for tenure in tenures:
+        latest_years[tenure.site_id] = max(latest_years[tenure.site_id], tenure.last_year)
+    for tenure in tenures:
+        tenure.is_latest_holder = tenure.last_year == latest_years[tenure.site_id]
+    SiteTenure.objects.bulk_create(tenures, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('fairs', '0080_site_natural_sort_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteTenure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('years', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=4), default=list, size=None)),
+                ('years_held', models.PositiveSmallIntegerField(default=0)),
+                ('first_year', models.CharField(max_length=4)),
+                ('last_year', models.CharField(max_length=4)),
+                ('is_latest_holder', models.BooleanField(default=False)),
+                ('site', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='site_tenures', to='fairs.site', verbose_name='site')),
+                ('stallholder', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='site_tenures', to=settings.AUTH_USER_MODEL, verbose_name='stallholder')),
+            ],
+            options={
+                'unique_together': {('site', 'stallholder')},
+            },
+        ),
+        migrations.RunPython(populate_site_tenure, migrations.RunPython.noop),
+    ]
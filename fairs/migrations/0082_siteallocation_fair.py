@@ -0,0 +1,39 @@
+# Generated by Django 4.2.14 on 2026-10-18 11:05
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def populate_siteallocation_fair(apps, schema_editor):
+    """
+    Set the fair of every SiteAllocation from its event site with a single update
+    """
+    EventSite = apps.get_model('fairs', 'EventSite')
+    SiteAllocation = apps.get_model('fairs', 'SiteAllocation')
+    SiteAllocation.objects.update(
+        fair_id=Subquery(EventSite.objects.filter(id=OuterRef('event_site_id')).values('event__fair_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fairs", "0081_sitetenure"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="siteallocation",
+            name="fair",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="site_allocations",
+                to="fairs.fair",
+            ),
+        ),
+        migrations.RunPython(populate_siteallocation_fair, migrations.RunPython.noop),
+    ]
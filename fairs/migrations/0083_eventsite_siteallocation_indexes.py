@@ -0,0 +1,25 @@
+# Generated by Django 4.2.14 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fairs', '0082_siteallocation_fair'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eventsite',
+            index=models.Index(fields=['event', 'site_status'], name='eventsite_event_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='siteallocation',
+            index=models.Index(
+                condition=models.Q(('on_hold', False), ('stall_registration__isnull', True)),
+                fields=['fair', 'stallholder'],
+                name='siteallocation_unreg_idx',
+            ),
+        ),
+    ]
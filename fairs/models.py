@@ -1,7 +1,8 @@
 # fairs/model.py
+import re
 from datetime import datetime
-from django.db.models import Q, Case, F, When, DateField, IntegerField
-from django.db.models.functions import Cast, Substr
+from django.db.models import Q, Case, F, When, DateField
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
 from django.urls import reverse
 from accounts.models import CustomUser
@@ -10,14 +11,8 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 
 from django.utils.functional import cached_property
 from fairs.querysets.event import EventQuerySet
-
-from django.db.models import Func, Value, CharField
-
-
-# Global Variables
-current_year = datetime.now().year
-next_year = current_year + 1
-four_years_past = current_year - 4
+from fairs.querysets.site_history import SiteHistoryQuerySet
+from fairs.services.fair_year_service import FairYearService
 
 
 # Create your models here.
@@ -93,7 +88,7 @@ class CurrentFairManager(models.Manager):
     Fair.currentfairmgr.all()
     """
     def get_queryset(self):
-        return super().get_queryset().filter(fair_year__in=[current_year, next_year], is_activated=True).order_by('fair_year')
+        return super().get_queryset().filter(fair_year__in=FairYearService.get_current_years(), is_activated=True).order_by('fair_year')
 
 
 class Fair(models.Model):
@@ -221,31 +216,31 @@ class CurrentInventoryItemFairManager(models.Manager):
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(fair__fair_year__in=[current_year, next_year], fair__is_activated=True)
+        return super().get_queryset().filter(fair__fair_year__in=FairYearService.get_current_years(), fair__is_activated=True)
 
     def full_size_site_price(self):
-        return super().get_queryset().get(fair__fair_year__in=[current_year, next_year], fair__is_activated=True,
+        return super().get_queryset().get(fair__fair_year__in=FairYearService.get_current_years(), fair__is_activated=True,
                                           inventory_item__item_name='Full Size Fair Site').price
 
 
     def half_size_site_price(self):
-        return super().get_queryset().get(fair__fair_year__in=[current_year, next_year], fair__is_activated=True,
+        return super().get_queryset().get(fair__fair_year__in=FairYearService.get_current_years(), fair__is_activated=True,
                                           inventory_item__item_name='Half Size Fair Site').price
 
     def trestle_table_price(self):
-        return super().get_queryset().get(fair__fair_year__in=[current_year, next_year], fair__is_activated=True,
+        return super().get_queryset().get(fair__fair_year__in=FairYearService.get_current_years(), fair__is_activated=True,
                                           inventory_item__item_name='Trestle Table').price
 
     def power_point_price(self):
-        return super().get_queryset().get(fair__fair_year__in=[current_year, next_year], fair__is_activated=True,
+        return super().get_queryset().get(fair__fair_year__in=FairYearService.get_current_years(), fair__is_activated=True,
                                           inventory_item__item_name='Power Point').price
 
     def health_safety_food_licence_price(self):
-        return super().get_queryset().get(fair__fair_year__in=[current_year, next_year], fair__is_activated=True,
+        return super().get_queryset().get(fair__fair_year__in=FairYearService.get_current_years(), fair__is_activated=True,
                                           inventory_item__item_name='Health & Safety Food Licence').price
 
     def food_licence_price(self):
-        return super().get_queryset().get(fair__fair_year__in=[current_year, next_year], fair__is_activated=True,
+        return super().get_queryset().get(fair__fair_year__in=FairYearService.get_current_years(), fair__is_activated=True,
                                           inventory_item__item_name='Foodstall Licence').price
 
 
@@ -407,12 +402,36 @@ class Site(models.Model):
         null=True
     )
     site_note = models.TextField(null=True, blank=True, default=None)
+    # Natural sort key of site_name, e.g. SDE123a is SDE, 123, a. Maintained on save
+    site_prefix = models.CharField(max_length=40, blank=True, default='', editable=False)
+    site_number = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    site_suffix = models.CharField(max_length=40, blank=True, default='', editable=False)
+
+    SITE_NAME_PATTERN = re.compile(r'^([A-Za-z]*)([0-9]*)(.*)$')
 
     def __str__(self):
         return self.site_name
 
     class Meta:
         verbose_name_plural = "Sites"
+        indexes = [
+            models.Index(fields=['site_prefix', 'site_number', 'site_suffix']),
+        ]
+
+    @classmethod
+    def split_site_name(cls, site_name):
+        """
+        Split a site name such as SD12, SDE12, SD12a or SDE123a into its prefix, number and suffix
+        """
+        prefix, number, suffix = cls.SITE_NAME_PATTERN.match(site_name).groups()
+        return prefix, int(number) if number else None, suffix
+
+    def save(self, *args, **kwargs):
+        self.site_prefix, self.site_number, self.site_suffix = self.split_site_name(self.site_name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'site_name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'site_prefix', 'site_number', 'site_suffix'}
+        super().save(*args, **kwargs)
 
     def get_absolute_url(self):
         return reverse('fairs:site-detail', args=[self.id])
@@ -420,7 +439,7 @@ class Site(models.Model):
 
 class CurrentEventFilterManager(models.Manager):
     def get_queryset(self):
-        return super().get_queryset().filter(fair__fair_year__in=[current_year, next_year],
+        return super().get_queryset().filter(fair__fair_year__in=FairYearService.get_current_years(),
                                              fair__is_activated=True)
 
     def annotate_event_sequence(self):
@@ -509,27 +528,27 @@ class Event(models.Model):
 
 class EventSiteCurrentManager(models.Manager):
     def get_queryset(self):
-        return super().get_queryset().filter(event__fair__fair_year__in=[current_year, next_year],
+        return super().get_queryset().filter(event__fair__fair_year__in=FairYearService.get_current_years(),
                                              event__fair__is_activated=True)
 
 
 class SiteAvailableManager(models.Manager):
     def get_queryset(self):
-        return super().get_queryset().filter(site_status=1, event__fair__fair_year__in=[current_year, next_year],
+        return super().get_queryset().filter(site_status=1, event__fair__fair_year__in=FairYearService.get_current_years(),
                                              event__fair__is_activated=True)
 
 
 class SiteAvailableFirstEventManager(models.Manager):
     def get_queryset(self):
         return super().get_queryset().filter(site_status=1, event__event_sequence=1,
-                                             event__fair__fair_year__in=[current_year, next_year],
+                                             event__fair__fair_year__in=FairYearService.get_current_years(),
                                              event__fair__is_activated=True)
 
 
 class SiteAvailableSecondEventManager(models.Manager):
     def get_queryset(self):
         return super().get_queryset().filter(site_status=1, event__event_sequence=2,
-                                             event__fair__fair_year__in=[current_year, next_year],
+                                             event__fair__fair_year__in=FairYearService.get_current_years(),
                                              event__fair__is_activated=True)
 
 
@@ -605,6 +624,10 @@ class EventSite(models.Model):
 
     class Meta:
         unique_together = ('event', 'site')
+        indexes = [
+            # The available and allocated sites of an event
+            models.Index(fields=['event', 'site_status'], name='eventsite_event_status_idx'),
+        ]
 
     def __str__(self):
         return str(self.event) + " - " + str(self.site)
@@ -612,7 +635,7 @@ class EventSite(models.Model):
 
 class EventPowerCurrentManager(models.Manager):
     def get_queryset(self):
-        return super().get_queryset().filter(event__fair__fair_year__in=[current_year, next_year],
+        return super().get_queryset().filter(event__fair__fair_year__in=FairYearService.get_current_years(),
                                              event__fair__is_activated=True)
 
 
@@ -645,50 +668,26 @@ class EventPower(models.Model):
         unique_together = ('event', 'power_box')
 
 
-class RegexpReplace(Func):
-    function = "REGEXP_REPLACE"
-    output_field = CharField()
-
-
 class FourYearHistoryManager(models.Manager):
     """
     Manager that returns all the site history for the past four years of stallholder who are currently active
     SiteHistory.fouryearhistorymgr.all()
-    Note it handles site names in the following format SD12, SDE12, SD12a, SDE123a
+    Sorted by the site natural sort key so SD12, SDE12, SD12a and SDE123a order correctly
     """
 
     def get_queryset(self):
+        fair_years = FairYearService.get()
         return (
             super()
             .get_queryset()
             .filter(
-                year__lte=current_year,
-                year__gte=four_years_past,
-            )
-            .annotate(
-                site_prefix=RegexpReplace(
-                    F("site__site_name"),
-                    Value(r"^([A-Za-z]+).*"),
-                    Value(r"\1"),
-                ),
-                site_number=Cast(
-                    RegexpReplace(
-                        F("site__site_name"),
-                        Value(r"^[A-Za-z]+([0-9]+).*"),
-                        Value(r"\1"),
-                    ),
-                    IntegerField(),
-                ),
-                site_suffix=RegexpReplace(
-                    F("site__site_name"),
-                    Value(r"^[A-Za-z]+[0-9]+([A-Za-z]*)$"),
-                    Value(r"\1"),
-                ),
+                year__lte=fair_years.current_year,
+                year__gte=fair_years.four_years_past,
             )
             .order_by(
-                "site_prefix",
-                "site_number",
-                "site_suffix",
+                "site__site_prefix",
+                "site__site_number",
+                "site__site_suffix",
                 "year",
             )
         )
@@ -700,17 +699,18 @@ class CurrentFairSiteHistoryManager(models.Manager):
     """
 
     def get_queryset(self):
+        # Imported here as the service imports the fairs models
+        from fairs.services.fair_context_service import FairContextService
+
         # Prevent breaking if no current fair exists
-        current_fair = Fair.currentfairmgr.first()
-        current_fair_year = current_fair.fair_year if current_fair else current_year
+        current_fair = FairContextService.get().first_fair
+        current_fair_year = current_fair.fair_year if current_fair else FairYearService.get_current_year()
 
         return (
             super().get_queryset()
             .filter(year=current_fair_year)
-            # Annotate for natural alphanumeric sorting
-            .annotate(site_prefix=Substr('site__site_name', 1, 2))
-            .annotate(site_number=Cast(Substr('site__site_name', 3), output_field=IntegerField()))
-            .order_by('site_prefix', 'site_number')
+            # Natural alphanumeric sorting
+            .order_by('site__site_prefix', 'site__site_number', 'site__site_suffix')
         )
 
 
@@ -746,6 +746,7 @@ class SiteHistory(models.Model):
     number_events = models.IntegerField(default=0)
     history_note = models.TextField(null=True, blank=True, default=None)
     objects = models.Manager()
+    histories = SiteHistoryQuerySet.as_manager()
     fouryearhistorymgr = FourYearHistoryManager()
     currentsitehistorymgr = CurrentFairSiteHistoryManager()
 
@@ -753,10 +754,45 @@ class SiteHistory(models.Model):
         unique_together = ('stallholder', 'site', 'year')
 
 
+class SiteTenure(models.Model):
+    """
+    Description: A summary of SiteHistory with one row per site and stallholder, the years the stallholder held the
+    site and whether they were its most recent holder. Maintained by the SiteTenureService when the site history is
+    populated so site allocation and the allocation audit do not aggregate the full history on every run.
+    """
+    site = models.ForeignKey(
+        Site,
+        on_delete=models.CASCADE,
+        verbose_name='site',
+        related_name='site_tenures'
+    )
+    stallholder = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        verbose_name='stallholder',
+        related_name='site_tenures'
+    )
+    years = ArrayField(models.CharField(max_length=4), default=list)
+    years_held = models.PositiveSmallIntegerField(default=0)
+    first_year = models.CharField(max_length=4)
+    last_year = models.CharField(max_length=4)
+    is_latest_holder = models.BooleanField(default=False)
+
+    objects = models.Manager()
+
+    class Meta:
+        unique_together = ('site', 'stallholder')
+
+    def __str__(self):
+        return f"{self.site} - {self.stallholder_id} ({self.first_year}-{self.last_year})"
+
+
 class CurrentSiteAllocationManager(models.Manager):
     def get_queryset(self):
-        return super().get_queryset().filter(event_site__event__fair__fair_year__in=[current_year, next_year],
-                                             event_site__event__fair__is_activated=True)
+        # Imported here as the service imports the fairs models
+        from fairs.services.fair_context_service import FairContextService
+
+        return super().get_queryset().filter(fair_id__in=FairContextService.get().fair_ids)
 
 
 class SiteAllocation(models.Model):
@@ -799,6 +835,15 @@ class SiteAllocation(models.Model):
                                    blank=True,
                                    null=True)
     on_hold = models.BooleanField(default=False) # Used to lock SiteAllocation when deleting unregistered allocations
+    # The fair of the event site, denormalised so the current manager needs no joins
+    fair = models.ForeignKey(
+        Fair,
+        related_name='site_allocations',
+        on_delete=models.CASCADE,
+        editable=False,
+        blank=True,
+        null=True
+    )
 
     objects = models.Manager()  # The default manager.
     currentallocationsmgr = CurrentSiteAllocationManager()  # The current site siteallocations manager
@@ -806,3 +851,18 @@ class SiteAllocation(models.Model):
 
     class Meta:
         unique_together = ('stallholder', 'event_site')
+        indexes = [
+            # The unregistered allocations deleted before the fair opens, on_hold allocations are kept
+            models.Index(
+                fields=['fair', 'stallholder'],
+                condition=Q(stall_registration__isnull=True, on_hold=False),
+                name='siteallocation_unreg_idx',
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.fair_id is None:
+            self.fair_id = EventSite.objects.filter(id=self.event_site_id).values_list(
+                'event__fair_id', flat=True
+            ).first()
+        super().save(*args, **kwargs)
@@ -0,0 +1,29 @@
+# fairs/querysets/site_history.py
+
+from django.db import connections, models
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+
+class SiteHistoryQuerySet(models.QuerySet):
+
+    def latest_per_site(self):
+        """
+        The most recent SiteHistory of each site, a tie within a year goes to the lowest stallholder id.
+        Uses DISTINCT ON (site_id) where the database supports it, otherwise a ROW_NUMBER window.
+        """
+        if connections[self.db].features.can_distinct_on_fields:
+            return self.order_by("site_id", "-year", "stallholder_id").distinct("site_id")
+        return self.latest_per_site_window()
+
+    def latest_per_site_window(self):
+        """
+        Portable form of latest_per_site for databases without DISTINCT ON
+        """
+        return self.annotate(
+            site_row_number=Window(
+                RowNumber(),
+                partition_by=F("site_id"),
+                order_by=[F("year").desc(), F("stallholder_id").asc()],
+            )
+        ).filter(site_row_number=1)
@@ -0,0 +1,104 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+class DashboardMetricsCache:
+    """
+    Cache of the precomputed dashboard counters.
+
+    Provides:
+        - Counters keyed on the dashboard and its filter tuple
+        - Selective invalidation of a dashboard's counters
+
+    Uses the Django cache framework (locmem by default, Redis when CACHE_URL is
+    configured). Each dashboard has a version number that forms part of every
+    key, invalidating a dashboard bumps the version so all of its filter
+    combinations are dropped at once. Entries also expire after
+    DASHBOARD_METRICS_CACHE_TIMEOUT seconds so time-window counts such as
+    "updated today" stay current.
+    """
+
+    KEY_PREFIX = "dashboard_metrics"
+
+    REGISTRATIONS = "registrations"
+    SITES = "sites"
+    PAYMENTS = "payments"
+    FOODLICENCES = "foodlicences"
+
+    DASHBOARDS = (
+        REGISTRATIONS,
+        SITES,
+        PAYMENTS,
+        FOODLICENCES,
+    )
+
+    @staticmethod
+    def get_timeout():
+        return getattr(settings, "DASHBOARD_METRICS_CACHE_TIMEOUT", 300)
+
+    @staticmethod
+    def filter_key(filter_dict):
+        """
+        Returns a stable string for a dashboard filter dict, model instances are
+        represented by their primary key.
+        """
+
+        if not filter_dict:
+            return "all"
+
+        return ",".join(
+            f"{attr}={getattr(value, 'pk', value)}"
+            for attr, value in sorted(filter_dict.items())
+        )
+
+    @classmethod
+    def version_key(cls, dashboard):
+        return f"{cls.KEY_PREFIX}:{dashboard}:version"
+
+    @classmethod
+    def get_version(cls, dashboard):
+        # Seed with the current time so a version lost to eviction can never
+        # be reissued with stale counters still cached against it.
+        return cache.get_or_set(cls.version_key(dashboard), time.time_ns(), None)
+
+    @classmethod
+    def get_or_compute(cls, dashboard, filter_dict, compute):
+        """
+        Returns the cached counters for the dashboard and filter dict, calling
+        compute() and caching the result on a miss.
+        """
+
+        key = (
+            f"{cls.KEY_PREFIX}:{dashboard}:{cls.get_version(dashboard)}:"
+            f"{cls.filter_key(filter_dict)}"
+        )
+        metrics = cache.get(key)
+        if metrics is None:
+            metrics = compute()
+            cache.set(key, metrics, cls.get_timeout())
+        return metrics
+
+    @classmethod
+    def invalidate(cls, *dashboards):
+        """
+        Drops the cached counters of the given dashboards, all dashboards when
+        none are given.
+        """
+
+        for dashboard in dashboards or cls.DASHBOARDS:
+            try:
+                cache.incr(cls.version_key(dashboard))
+            except ValueError:
+                cache.set(cls.version_key(dashboard), time.time_ns(), None)
+
+    @classmethod
+    def invalidate_on_commit(cls, *dashboards):
+        """
+        Invalidates once the current transaction commits, so a concurrent
+        dashboard refresh cannot re-cache counters that predate the change.
+        """
+
+        transaction.on_commit(lambda: cls.invalidate(*dashboards))
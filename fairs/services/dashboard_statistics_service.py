@@ -0,0 +1,207 @@
+from datetime import timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from fairs.models import EventSite
+from fairs.services.fair_year_service import FairYearService
+from foodlicence.models import FoodLicence
+from payment.models import PaymentHistory
+from registration.models import StallRegistration
+
+
+class DashboardStatisticsService:
+    """
+    Service class for dashboard status counters.
+
+    Provides:
+        - Stall registration status counts
+        - Stall registration recently updated counts
+        - Event site status counts
+        - Payment status counts
+        - Food licence status counts
+
+    Each group of counters is built with a single conditional aggregate query
+    so a dashboard refresh does not issue one COUNT query per status.
+    """
+
+    @staticmethod
+    def get_registration_counts(filter_dict=None):
+        """
+        Returns the Stall Registration dashboard counts, honouring the dashboard
+        filter dict (fair and site size).
+        """
+
+        current = Q(
+            fair__fair_year__in=FairYearService.get_current_years(),
+            fair__is_activated=True,
+        )
+        recently = timezone.now() - timedelta(days=2)
+
+        return (
+            StallRegistration.objects
+            .filter(**(filter_dict or {}))
+            .aggregate(
+                total_counts=Count("id"),
+                selling_food_counts=Count(
+                    "id", filter=current & Q(selling_food=True)
+                ),
+                created_counts=Count(
+                    "id", filter=current & Q(booking_status="Created")
+                ),
+                submitted_counts=Count(
+                    "id", filter=current & Q(booking_status="Submitted")
+                ),
+                invoiced_counts=Count(
+                    "id", filter=current & Q(booking_status="Invoiced")
+                ),
+                paid_counts=Count(
+                    "id", filter=current & Q(booking_status="Payment Completed")
+                ),
+                booked_counts=Count(
+                    "id", filter=current & Q(booking_status="Booked")
+                ),
+                cancelled_counts=Count(
+                    "id", filter=current & Q(booking_status="Cancelled")
+                ),
+                recently_created_counts=Count(
+                    "id", filter=current & Q(date_created__gte=recently)
+                ),
+                amended_counts=Count(
+                    "id", filter=current & Q(booking_status="Amended")
+                ),
+                waitlisted_counts=Count(
+                    "id", filter=current & Q(booking_status="Waitlisted")
+                ),
+            )
+        )
+
+    @staticmethod
+    def get_registration_updated_counts():
+        """
+        Returns the counts of current Stall Registrations updated today, within
+        the last week and within the last month.
+        """
+
+        now = timezone.now()
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        return (
+            StallRegistration.objects
+            .filter(
+                fair__fair_year__in=[now.year, now.year + 1],
+                fair__is_activated=True,
+            )
+            .aggregate(
+                updated_today_counts=Count(
+                    "id", filter=Q(date_updated__gte=today)
+                ),
+                updated_week_counts=Count(
+                    "id", filter=Q(date_updated__gte=now - timedelta(days=7))
+                ),
+                updated_month_counts=Count(
+                    "id", filter=Q(date_updated__gte=now - timedelta(days=30))
+                ),
+            )
+        )
+
+    @staticmethod
+    def get_site_counts(filter_dict=None):
+        """
+        Returns the Site dashboard event site status counts, honouring the
+        dashboard filter dict (event, zone and site size).
+        """
+
+        current = Q(
+            event__fair__fair_year__in=FairYearService.get_current_years(),
+            event__fair__is_activated=True,
+        )
+
+        return (
+            EventSite.objects
+            .filter(**(filter_dict or {}))
+            .aggregate(
+                total_counts=Count("id", filter=current),
+                available_counts=Count(
+                    "id", filter=current & Q(site_status=EventSite.AVAILABLE)
+                ),
+                allocated_counts=Count(
+                    "id", filter=Q(site_status=EventSite.ALLOCATED)
+                ),
+                pending_counts=Count(
+                    "id", filter=Q(site_status=EventSite.PENDING)
+                ),
+                booked_counts=Count(
+                    "id", filter=Q(site_status=EventSite.BOOKED)
+                ),
+                unavailable_counts=Count(
+                    "id", filter=Q(site_status=EventSite.UNAVAILABLE)
+                ),
+            )
+        )
+
+    @staticmethod
+    def get_payment_counts():
+        """
+        Returns the Payments dashboard payment status counts.
+        """
+
+        current = Q(
+            invoice__stall_registration__fair__fair_year__in=FairYearService.get_current_years(),
+            invoice__stall_registration__fair__is_activated=True,
+        )
+
+        return PaymentHistory.objects.aggregate(
+            total_counts=Count(
+                "id", filter=~Q(payment_status=PaymentHistory.SUPERCEDED)
+            ),
+            pending_counts=Count(
+                "id", filter=current & Q(payment_status=PaymentHistory.PENDING)
+            ),
+            cancelled_counts=Count(
+                "id", filter=current & Q(payment_status=PaymentHistory.CANCELLED)
+            ),
+            completed_counts=Count(
+                "id", filter=current & Q(payment_status=PaymentHistory.COMPLETED)
+            ),
+            credit_counts=Count(
+                "id", filter=current & Q(payment_status=PaymentHistory.CREDIT)
+            ),
+            failed_counts=Count(
+                "id", filter=Q(payment_status=PaymentHistory.FAILED)
+            ),
+            reconciled_counts=Count(
+                "id", filter=Q(payment_status=PaymentHistory.RECONCILED)
+            ),
+        )
+
+    @staticmethod
+    def get_foodlicence_counts():
+        """
+        Returns the Foodlicence dashboard licence status counts.
+        """
+
+        return (
+            FoodLicence.foodlicencecurrentmgr
+            .aggregate(
+                total_counts=Count("id"),
+                created_counts=Count(
+                    "id", filter=Q(licence_status=FoodLicence.CREATED)
+                ),
+                staged_counts=Count(
+                    "id", filter=Q(licence_status=FoodLicence.STAGED)
+                ),
+                batched_counts=Count(
+                    "id", filter=Q(licence_status=FoodLicence.BATCHED)
+                ),
+                submitted_counts=Count(
+                    "id", filter=Q(licence_status=FoodLicence.SUBMITTED)
+                ),
+                rejected_counts=Count(
+                    "id", filter=Q(licence_status=FoodLicence.REJECTED)
+                ),
+                approved_counts=Count(
+                    "id", filter=Q(licence_status=FoodLicence.APPROVED)
+                ),
+            )
+        )
@@ -0,0 +1,148 @@
+# fairs/services/fair_context_service.py
+
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from fairs.models import Event, Fair
+from fairs.services.fair_year_service import FairYearService
+
+# The FairContext resolved for the request being handled, set by the FairContextMiddleware
+_request_fair_context = ContextVar('request_fair_context', default=None)
+
+
+@dataclass(frozen=True)
+class FairContext:
+    """
+    The current fairs and their events, resolved once.
+
+    fairs holds the activated fairs of the current and next year in fair_year order, as Fair.currentfairmgr returns
+    them. events holds the events of those fairs ordered by their actual date, the postponement date when the event
+    was postponed, each annotated with actual_event_date as by annotate_event_sequence.
+    """
+    fairs: tuple
+    events: tuple
+
+    @property
+    def fair(self):
+        """
+        The current fair, as Fair.currentfairmgr.last()
+        """
+        return self.fairs[-1] if self.fairs else None
+
+    @property
+    def fair_ids(self):
+        return [fair.id for fair in self.fairs]
+
+    @property
+    def first_fair(self):
+        """
+        The earliest current fair, as Fair.currentfairmgr.first()
+        """
+        return self.fairs[0] if self.fairs else None
+
+    def get_event_by_position(self, position):
+        """
+        Returns the event at the 1-based position in date order, or None
+        """
+        if position < 1:
+            raise ValueError("Position must be a positive integer.")
+        return self.events[position - 1] if position <= len(self.events) else None
+
+    @property
+    def first_event(self):
+        return self.get_event_by_position(Event.FIRSTEVENT)
+
+    @property
+    def second_event(self):
+        return self.get_event_by_position(Event.SECONDEVENT)
+
+    @property
+    def last_event(self):
+        return self.events[-1] if self.events else None
+
+
+class FairContextService:
+    """
+    Service class for the current fair and current events.
+
+    Provides:
+        - The FairContext, loaded with two queries
+        - A per request copy, so each request resolves the context at most once
+        - Invalidation when a Fair or Event is saved or deleted
+
+    The context is kept in the Django cache for FAIR_CONTEXT_CACHE_TIMEOUT seconds, keyed on the fair year so a new
+    year starts with a fresh context. The timeout bounds how long another worker can serve a stale context when the
+    cache is local memory. Within a request handled by the FairContextMiddleware the context is read from the cache
+    once and reused for the rest of the request.
+    """
+
+    CACHE_KEY = "fair_context"
+
+    @staticmethod
+    def get_timeout():
+        return getattr(settings, "FAIR_CONTEXT_CACHE_TIMEOUT", 60)
+
+    @classmethod
+    def get_cache_key(cls):
+        return f"{cls.CACHE_KEY}:{FairYearService.get_current_year()}"
+
+    @staticmethod
+    def load():
+        return FairContext(
+            fairs=tuple(Fair.currentfairmgr.all()),
+            events=tuple(Event.currenteventfiltermgr.annotate_event_sequence()),
+        )
+
+    @classmethod
+    def get(cls):
+        """
+        Returns the FairContext, from the request or the cache when it has already been resolved
+        """
+        request_context = _request_fair_context.get()
+        if request_context and "context" in request_context:
+            return request_context["context"]
+
+        cache_key = cls.get_cache_key()
+        fair_context = cache.get(cache_key)
+        if fair_context is None:
+            fair_context = cls.load()
+            cache.set(cache_key, fair_context, cls.get_timeout())
+
+        if request_context is not None:
+            request_context["context"] = fair_context
+        return fair_context
+
+    @classmethod
+    def get_current_fair(cls):
+        return cls.get().fair
+
+    @classmethod
+    def invalidate(cls):
+        cache.delete(cls.get_cache_key())
+        request_context = _request_fair_context.get()
+        if request_context:
+            request_context.pop("context", None)
+
+    @classmethod
+    def invalidate_on_commit(cls):
+        """
+        Invalidates now, so the rest of the transaction sees the change, and again once the transaction commits so
+        a concurrent request cannot leave the context from before the change in the cache.
+        """
+        cls.invalidate()
+        transaction.on_commit(cls.invalidate)
+
+    @staticmethod
+    def start_request():
+        """
+        Start a per request copy of the context, returns the token to pass to end_request
+        """
+        return _request_fair_context.set({})
+
+    @staticmethod
+    def end_request(token):
+        _request_fair_context.reset(token)
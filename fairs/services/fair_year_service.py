@@ -0,0 +1,68 @@
+# fairs/services/fair_year_service.py
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.conf import settings
+
+
+@dataclass(frozen=True)
+class FairYears:
+    """
+    The fair year window for a calendar year. The current managers cover the fairs of current_years, the site history
+    used for allocation covers four_years_past to current_year.
+    """
+    current_year: int
+
+    @property
+    def next_year(self):
+        return self.current_year + 1
+
+    @property
+    def four_years_past(self):
+        return self.current_year - 4
+
+    @property
+    def current_years(self):
+        return [self.current_year, self.next_year]
+
+
+class FairYearService:
+    """
+    Service class for the fair year window.
+
+    Provides:
+        - The current and next fair years used by the current managers
+        - The start of the four year site history window
+
+    The window is recomputed from the clock every FAIR_YEAR_CACHE_TIMEOUT seconds, so a long running worker moves to
+    the new year shortly after midnight on New Year's Day without a restart.
+    """
+
+    _fair_years = None
+    _expires_at = 0.0
+
+    @staticmethod
+    def get_timeout():
+        return getattr(settings, 'FAIR_YEAR_CACHE_TIMEOUT', 60)
+
+    @classmethod
+    def get(cls):
+        now = time.monotonic()
+        if cls._fair_years is None or now >= cls._expires_at:
+            cls._fair_years = FairYears(datetime.now().year)
+            cls._expires_at = now + cls.get_timeout()
+        return cls._fair_years
+
+    @classmethod
+    def get_current_year(cls):
+        return cls.get().current_year
+
+    @classmethod
+    def get_current_years(cls):
+        return cls.get().current_years
+
+    @classmethod
+    def invalidate(cls):
+        cls._fair_years = None
@@ -145,6 +145,51 @@ class PowerboxReportService:
             )
         )
 
+    @staticmethod
+    def get_power_load_lookup(event_ids):
+        """
+        Returns the total electrical load (amps) of food preparation equipment
+        keyed on (powerbox_id, event_id, stallholder_id), computed in a single
+        grouped query for the given events.
+        """
+
+        power_loads = (
+            FoodPrepEquipReq.objects
+            .filter(
+                food_registration__registration__site_allocation__event_site__event_id__in=event_ids,
+                food_registration__registration__site_allocation__event_site__site__powerbox__isnull=False,
+            )
+            .values(
+                "food_registration__registration__site_allocation__event_site__site__powerbox__id",
+                "food_registration__registration__site_allocation__event_site__event_id",
+                "food_registration__registration__stallholder_id",
+            )
+            .annotate(
+                total_amps=Sum(
+                    F("equipment_quantity")
+                    * F(
+                        "food_prep_equipment__power_load_amps"
+                    )
+                )
+            )
+            .order_by()
+        )
+
+        return {
+            (
+                row[
+                    "food_registration__registration__site_allocation__event_site__site__powerbox__id"
+                ],
+                row[
+                    "food_registration__registration__site_allocation__event_site__event_id"
+                ],
+                row[
+                    "food_registration__registration__stallholder_id"
+                ],
+            ): row["total_amps"] or 0
+            for row in power_loads
+        }
+
     @staticmethod
     def get_report_data():
         """
@@ -165,11 +210,18 @@ class PowerboxReportService:
             for row in aggregated
         }
 
-        detailed = (
+        detailed = list(
             PowerboxReportService
             .get_detailed_stallregistrations()
         )
 
+        power_load_lookup = PowerboxReportService.get_power_load_lookup(
+            {
+                sr["site_allocation__event_site__event__id"]
+                for sr in detailed
+            }
+        )
+
         results = []
 
         for sr in detailed:
@@ -185,28 +237,9 @@ class PowerboxReportService:
 
             agg = agg_lookup.get(key, {})
 
-            total_power_load_amps = (
-                FoodPrepEquipReq.objects.filter(
-                    food_registration__registration__site_allocation__event_site__event_id=
-                    sr[
-                        "site_allocation__event_site__event__id"
-                    ],
-                    food_registration__registration__site_allocation__event_site__site__powerbox__id=
-                    sr[
-                        "site_allocation__event_site__site__powerbox__id"
-                    ],
-                    food_registration__registration__stallholder_id=
-                    sr["stallholderid"],
-                )
-                .aggregate(
-                    total_amps=Sum(
-                        F("equipment_quantity")
-                        * F(
-                            "food_prep_equipment__power_load_amps"
-                        )
-                    )
-                )["total_amps"]
-                or 0
+            total_power_load_amps = power_load_lookup.get(
+                (*key, sr["stallholderid"]),
+                0,
             )
 
             results.append(
@@ -0,0 +1,93 @@
+# fairs/services/site_tenure_service.py
+
+from collections import defaultdict
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import transaction
+
+from fairs.models import SiteHistory, SiteTenure
+
+
+class SiteTenureService:
+    """
+    Service class for the SiteTenure summary of SiteHistory.
+
+    Provides:
+        - Refresh of the tenure rows of the sites whose history changed, or of every site
+        - Tenure lookups for site allocation and the site allocation audit
+
+    Tenure is refreshed a whole site at a time, as a change to one stallholder's history can move the site's
+    latest holder flag.
+    """
+
+    @staticmethod
+    def build_tenures(histories):
+        """
+        Returns unsaved SiteTenures for the SiteHistory queryset
+        """
+        rows = (
+            histories
+            .order_by()
+            .values('site_id', 'stallholder_id')
+            .annotate(years=ArrayAgg('year', distinct=True, ordering='year'))
+        )
+
+        tenures = [
+            SiteTenure(
+                site_id=row['site_id'],
+                stallholder_id=row['stallholder_id'],
+                years=row['years'],
+                years_held=len(row['years']),
+                first_year=row['years'][0],
+                last_year=row['years'][-1],
+            )
+            for row in rows
+        ]
+
+        latest_years = defaultdict(str)
+        for tenure in tenures:
+            latest_years[tenure.site_id] = max(latest_years[tenure.site_id], tenure.last_year)
+        for tenure in tenures:
+            tenure.is_latest_holder = tenure.last_year == latest_years[tenure.site_id]
+
+        return tenures
+
+    @classmethod
+    def refresh(cls, site_ids=None):
+        """
+        Rebuild the SiteTenure rows of site_ids from SiteHistory, or of every site when site_ids is None.
+        Returns the number of tenure rows written.
+        """
+        histories = SiteHistory.objects.all()
+        tenures = SiteTenure.objects.all()
+        if site_ids is not None:
+            site_ids = set(site_ids)
+            if not site_ids:
+                return 0
+            histories = histories.filter(site_id__in=site_ids)
+            tenures = tenures.filter(site_id__in=site_ids)
+
+        with transaction.atomic():
+            new_tenures = cls.build_tenures(histories)
+            current_keys = {(tenure.site_id, tenure.stallholder_id) for tenure in new_tenures}
+            stale_ids = [
+                tenure_id
+                for tenure_id, site_id, stallholder_id in tenures.values_list('id', 'site_id', 'stallholder_id')
+                if (site_id, stallholder_id) not in current_keys
+            ]
+            SiteTenure.objects.filter(id__in=stale_ids).delete()
+            SiteTenure.objects.bulk_create(
+                new_tenures,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['site', 'stallholder'],
+                update_fields=['years', 'years_held', 'first_year', 'last_year', 'is_latest_holder'],
+            )
+        return len(new_tenures)
+
+    @staticmethod
+    def get_years_in_window(tenure, first_year, last_year):
+        """
+        Returns the years of the tenure between first_year and last_year inclusive
+        """
+        return [year for year in tenure.years if first_year <= int(year) <= last_year]
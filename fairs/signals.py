@@ -3,7 +3,11 @@
 from django.db.models.signals import pre_save, pre_delete, post_save, post_delete
 from django.dispatch import receiver
 from django.db import transaction
-from .models import Fair, SiteAllocation, EventSite
+from django_fsm.signals import post_transition
+from registration.models import StallRegistration
+from .models import Fair, Event, SiteAllocation, EventSite
+from .services.dashboard_metrics_cache import DashboardMetricsCache
+from .services.fair_context_service import FairContextService
 
 @receiver(pre_save, sender=Fair)
 def archive_event_sites_on_deactivate(sender, instance, **kwargs):
@@ -34,3 +38,33 @@ def allow_siteallocation_delete_if_not_booked(sender, instance, **kwargs):
     eventsite = EventSite.objects.get(id=instance.event_site.id)
     if eventsite.site_status > 2:
         raise Exception("This event site status is beyond allocated.")
+
+
+@receiver(post_save, sender=Fair)
+@receiver(post_delete, sender=Fair)
+def invalidate_all_dashboard_metrics(sender, instance, **kwargs):
+    # Activating or deactivating a fair changes what every dashboard counts as current
+    DashboardMetricsCache.invalidate_on_commit()
+
+
+@receiver(post_save, sender=Fair)
+@receiver(post_delete, sender=Fair)
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_fair_context(sender, instance, **kwargs):
+    FairContextService.invalidate_on_commit()
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=EventSite)
+@receiver(post_delete, sender=EventSite)
+def invalidate_site_dashboard_metrics(sender, instance, **kwargs):
+    DashboardMetricsCache.invalidate_on_commit(DashboardMetricsCache.SITES)
+
+
+@receiver(post_save, sender=StallRegistration)
+@receiver(post_delete, sender=StallRegistration)
+@receiver(post_transition, sender=StallRegistration)
+def invalidate_registration_dashboard_metrics(sender, instance, **kwargs):
+    DashboardMetricsCache.invalidate_on_commit(DashboardMetricsCache.REGISTRATIONS)
@@ -0,0 +1,74 @@
+# fairs/tests/test_dashboard_metrics_cache.py
+
+from datetime import datetime
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from accounts.models import CustomUser
+from fairs.models import Fair
+from fairs.services.dashboard_metrics_cache import DashboardMetricsCache
+from fairs.services.dashboard_statistics_service import DashboardStatisticsService
+from registration.models import StallRegistration
+
+
+class DashboardMetricsCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.fair = Fair.objects.create(
+            fair_name='Metrics Test Fair',
+            fair_year=str(datetime.now().year),
+            fair_description='Test fair',
+            is_activated=True,
+        )
+        self.stallholder = CustomUser.objects.create(username='metrics@example.com', email='metrics@example.com')
+
+    def create_registration(self):
+        return StallRegistration.objects.create(
+            fair=self.fair,
+            stallholder=self.stallholder,
+            stall_manager_name='Manager',
+            stall_description='Stall',
+            products_on_site='Products',
+            total_charge=0,
+        )
+
+    def get_registration_counts(self, filter_dict=None):
+        return DashboardMetricsCache.get_or_compute(
+            DashboardMetricsCache.REGISTRATIONS, filter_dict,
+            lambda: DashboardStatisticsService.get_registration_counts(filter_dict)
+        )
+
+    def test_counts_served_from_cache(self):
+        self.get_registration_counts()
+        with self.assertNumQueries(0):
+            counts = self.get_registration_counts()
+        self.assertEqual(counts['created_counts'], 0)
+
+    def test_filter_dicts_cached_separately(self):
+        self.create_registration()
+        self.assertEqual(self.get_registration_counts()['total_counts'], 1)
+        other_fair = Fair.objects.create(fair_name='Other Fair', fair_description='Other fair')
+        self.assertEqual(self.get_registration_counts({'fair': other_fair})['total_counts'], 0)
+
+    def test_registration_change_invalidates_counts(self):
+        self.assertEqual(self.get_registration_counts()['created_counts'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_registration()
+
+        self.assertEqual(self.get_registration_counts()['created_counts'], 1)
+
+    def test_invalidation_is_selective(self):
+        site_counts = DashboardMetricsCache.get_or_compute(
+            DashboardMetricsCache.SITES, None, DashboardStatisticsService.get_site_counts
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_registration()
+
+        with self.assertNumQueries(0):
+            cached_site_counts = DashboardMetricsCache.get_or_compute(
+                DashboardMetricsCache.SITES, None, DashboardStatisticsService.get_site_counts
+            )
+        self.assertEqual(site_counts, cached_site_counts)
@@ -0,0 +1,78 @@
+# fairs/tests/test_dashboard_statistics_service.py
+
+from datetime import date, datetime
+
+from django.test import TestCase
+
+from accounts.models import CustomUser
+from fairs.models import Fair, Event, EventSite, Site, Zone
+from fairs.services.dashboard_statistics_service import DashboardStatisticsService
+from registration.models import StallRegistration
+
+
+class DashboardStatisticsServiceTest(TestCase):
+    def setUp(self):
+        self.fair = Fair.objects.create(
+            fair_name='Dashboard Test Fair',
+            fair_year=str(datetime.now().year),
+            fair_description='Test fair',
+            is_activated=True,
+        )
+        self.event = Event.objects.create(
+            event_name='Dashboard Test Event',
+            original_event_date=date(datetime.now().year, 11, 1),
+            event_description='Test event',
+            fair=self.fair,
+        )
+        self.zone = Zone.objects.create(zone_name='Dashboard Test Zone')
+        for number, site_status in enumerate(
+                [EventSite.AVAILABLE, EventSite.AVAILABLE, EventSite.ALLOCATED, EventSite.BOOKED], start=1):
+            site = Site.objects.create(site_name=f'DT{number}', zone=self.zone)
+            EventSite.objects.create(event=self.event, site=site, site_status=site_status)
+
+        for number, booking_status in enumerate(['Created', 'Submitted', 'Submitted', 'Booked'], start=1):
+            stallholder = CustomUser.objects.create(
+                username=f'dashboard{number}@example.com',
+                email=f'dashboard{number}@example.com',
+            )
+            StallRegistration.objects.create(
+                fair=self.fair,
+                stallholder=stallholder,
+                stall_manager_name='Manager',
+                stall_description='Stall',
+                products_on_site='Products',
+                total_charge=0,
+                booking_status=booking_status,
+                selling_food=number == 1,
+            )
+
+    def test_registration_counts_match_managers(self):
+        with self.assertNumQueries(1):
+            counts = DashboardStatisticsService.get_registration_counts()
+
+        self.assertEqual(counts['total_counts'], StallRegistration.objects.count())
+        self.assertEqual(counts['selling_food_counts'], StallRegistration.sellingfoodmgr.count())
+        self.assertEqual(counts['created_counts'], StallRegistration.registrationcreatedmgr.count())
+        self.assertEqual(counts['submitted_counts'], StallRegistration.registrationsubmittedmgr.count())
+        self.assertEqual(counts['booked_counts'], StallRegistration.registrationbookedmgr.count())
+        self.assertEqual(counts['recently_created_counts'], StallRegistration.registrationrecentcreatmgr.count())
+        self.assertEqual(counts['submitted_counts'], 2)
+
+    def test_registration_updated_counts(self):
+        with self.assertNumQueries(1):
+            counts = DashboardStatisticsService.get_registration_updated_counts()
+
+        self.assertEqual(counts['updated_today_counts'], StallRegistration.count_updated_within('today'))
+        self.assertEqual(counts['updated_week_counts'], StallRegistration.count_updated_within('week'))
+        self.assertEqual(counts['updated_month_counts'], StallRegistration.count_updated_within('month'))
+
+    def test_site_counts_honour_filter_dict(self):
+        filter_dict = {'event': self.event, 'site__zone': self.zone}
+        with self.assertNumQueries(1):
+            counts = DashboardStatisticsService.get_site_counts(filter_dict)
+
+        self.assertEqual(counts['total_counts'], EventSite.eventsitecurrentmgr.filter(**filter_dict).count())
+        self.assertEqual(counts['available_counts'], EventSite.site_available.filter(**filter_dict).count())
+        self.assertEqual(counts['allocated_counts'], 1)
+        self.assertEqual(counts['booked_counts'], 1)
+        self.assertEqual(counts['pending_counts'], 0)
@@ -0,0 +1,68 @@
+# fairs/tests/test_fair_context_service.py
+
+from datetime import date, datetime
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from fairs.middleware import FairContextMiddleware
+from fairs.models import Event, Fair
+from fairs.services.fair_context_service import FairContextService
+
+
+class FairContextServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.year = datetime.now().year
+        self.fair = Fair.objects.create(
+            fair_name='Context Test Fair',
+            fair_year=str(self.year),
+            fair_description='Test fair',
+            is_activated=True,
+        )
+        self.later_event = Event.objects.create(
+            event_name='Context Test Event 1',
+            original_event_date=date(self.year, 11, 1),
+            postponement_event_date=date(self.year, 11, 20),
+            event_description='Test event',
+            fair=self.fair,
+        )
+        self.earlier_event = Event.objects.create(
+            event_name='Context Test Event 2',
+            original_event_date=date(self.year, 11, 10),
+            event_description='Test event',
+            fair=self.fair,
+        )
+
+    def test_context_is_loaded_once(self):
+        with self.assertNumQueries(2):
+            fair_context = FairContextService.get()
+        with self.assertNumQueries(0):
+            self.assertEqual(FairContextService.get_current_fair(), self.fair)
+
+        self.assertEqual(fair_context.first_event, self.earlier_event)
+        self.assertEqual(fair_context.second_event, self.later_event)
+        self.assertEqual(fair_context.last_event, self.later_event)
+        self.assertIsNone(fair_context.get_event_by_position(3))
+
+    def test_saving_a_fair_or_event_invalidates_the_context(self):
+        FairContextService.get()
+
+        self.fair.is_open = True
+        self.fair.save()
+        self.assertTrue(FairContextService.get_current_fair().is_open)
+
+        self.earlier_event.delete()
+        self.assertEqual(FairContextService.get().events, (self.later_event,))
+
+    def test_middleware_resolves_the_context_once_per_request(self):
+        def view(request):
+            request.fair_context.fair
+            # A cache miss within the request is served from the request's copy
+            cache.clear()
+            FairContextService.get()
+            return HttpResponse()
+
+        with self.assertNumQueries(2):
+            FairContextMiddleware(view)(RequestFactory().get('/'))
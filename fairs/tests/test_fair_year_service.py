@@ -0,0 +1,69 @@
+# fairs/tests/test_fair_year_service.py
+
+from datetime import date, datetime
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from fairs.forms import SiteAllocationListFilterForm
+from fairs.models import Event, Fair
+from fairs.services.fair_year_service import FairYearService
+from reports.forms import ReportListFilterForm
+
+
+class FairYearServiceTest(TestCase):
+    def setUp(self):
+        for year in ('2025', '2026', '2027'):
+            Fair.objects.create(
+                fair_name=f'Year Test Fair {year}', fair_year=year, fair_description='Test fair', is_activated=True
+            )
+        FairYearService.invalidate()
+        self.addCleanup(FairYearService.invalidate)
+
+    def set_clock(self, *args):
+        patcher = mock.patch('fairs.services.fair_year_service.datetime')
+        mocked_datetime = patcher.start()
+        self.addCleanup(patcher.stop)
+        mocked_datetime.now.return_value = datetime(*args)
+
+    def get_current_fair_years(self):
+        return list(Fair.currentfairmgr.values_list('fair_year', flat=True))
+
+    @override_settings(FAIR_YEAR_CACHE_TIMEOUT=0)
+    def test_current_managers_follow_the_new_year(self):
+        self.set_clock(2025, 12, 31, 23, 59)
+        self.assertEqual(self.get_current_fair_years(), ['2025', '2026'])
+        self.assertEqual(FairYearService.get().four_years_past, 2021)
+
+        self.set_clock(2026, 1, 1, 0, 1)
+        self.assertEqual(self.get_current_fair_years(), ['2026', '2027'])
+
+    def test_window_is_cached_until_the_timeout(self):
+        self.set_clock(2025, 12, 31, 23, 59)
+        self.assertEqual(FairYearService.get_current_years(), [2025, 2026])
+
+        self.set_clock(2026, 1, 1, 0, 1)
+        self.assertEqual(FairYearService.get_current_years(), [2025, 2026])
+
+        with mock.patch('fairs.services.fair_year_service.time.monotonic', return_value=float('inf')):
+            self.assertEqual(FairYearService.get_current_years(), [2026, 2027])
+
+    @override_settings(FAIR_YEAR_CACHE_TIMEOUT=0)
+    def test_event_filter_forms_follow_the_new_year(self):
+        for fair in Fair.objects.filter(fair_name__startswith='Year Test Fair'):
+            Event.objects.create(
+                event_name=f'Year Test Event {fair.fair_year}', original_event_date=date(int(fair.fair_year), 11, 1),
+                event_description='Test event', fair=fair,
+            )
+
+        for form_class in (ReportListFilterForm, SiteAllocationListFilterForm):
+            self.set_clock(2025, 12, 31, 23, 59)
+            self.assertEqual(
+                sorted(form_class().fields['event'].queryset.values_list('fair__fair_year', flat=True)),
+                ['2025', '2026'],
+            )
+            self.set_clock(2026, 1, 1, 0, 1)
+            self.assertEqual(
+                sorted(form_class().fields['event'].queryset.values_list('fair__fair_year', flat=True)),
+                ['2026', '2027'],
+            )
@@ -0,0 +1,67 @@
+# fairs/tests/test_fix_site_history.py
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from accounts.models import CustomUser
+from fairs.models import InventoryItem, Site, SiteHistory
+from utils.stallholder_history_tools import (
+    FULL_SIZE_FAIR_SITE,
+    HALF_SIZE_FAIR_SITE,
+    run_site_history_fixup,
+)
+
+
+class SiteHistoryFixupTest(TestCase):
+    def setUp(self):
+        self.half_size = InventoryItem.objects.create(item_name=HALF_SIZE_FAIR_SITE, item_description='Half site')
+        self.full_size = InventoryItem.objects.create(item_name=FULL_SIZE_FAIR_SITE, item_description='Full site')
+        self.stallholder = CustomUser.objects.create(username='fixup@example.com', email='fixup@example.com')
+        self.site = Site.objects.create(site_name='FX1')
+
+    def create_history(self, year, is_half_size, site_size):
+        return SiteHistory.objects.create(
+            stallholder=self.stallholder,
+            site=self.site,
+            year=year,
+            is_half_size=is_half_size,
+            site_size=site_size,
+        )
+
+    def test_site_size_is_set_from_the_half_size_flag_in_one_update(self):
+        half = self.create_history('2020', True, None)
+        full = self.create_history('2021', False, self.half_size)
+        unchanged = self.create_history('2022', False, self.full_size)
+
+        # The savepoint pair of the atomic block, the two inventory item lookups and the UPDATE
+        with self.assertNumQueries(5):
+            count = run_site_history_fixup('site_size')
+
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            dict(SiteHistory.objects.values_list('id', 'site_size_id')),
+            {half.id: self.half_size.id, full.id: self.full_size.id, unchanged.id: self.full_size.id},
+        )
+
+    def test_is_half_size_is_set_from_site_size(self):
+        half = self.create_history('2020', False, self.half_size)
+        unsized = self.create_history('2021', True, None)
+        unchanged = self.create_history('2022', False, self.full_size)
+
+        self.assertEqual(run_site_history_fixup('is_half_size'), 2)
+        self.assertEqual(
+            dict(SiteHistory.objects.values_list('id', 'is_half_size')),
+            {half.id: True, unsized.id: False, unchanged.id: False},
+        )
+
+    def test_dry_run_counts_without_updating(self):
+        history = self.create_history('2020', False, self.half_size)
+        out = StringIO()
+
+        call_command('fix_site_history', 'is_half_size', '--dry-run', stdout=out)
+
+        self.assertIn('1 site history records would be updated', out.getvalue())
+        history.refresh_from_db()
+        self.assertFalse(history.is_half_size)
@@ -0,0 +1,143 @@
+# fairs/tests/test_import_legacy.py
+
+import csv
+import os
+import tempfile
+from datetime import date, datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from accounts.models import CustomUser, Profile
+from fairs.models import Fair, Event, EventSite, InventoryItem, Site, SiteHistory, SiteTenure, Zone
+
+
+class ImportLegacyTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        fair = Fair.objects.create(
+            fair_name='Import Test Fair', fair_year=str(datetime.now().year), fair_description='Test fair',
+            is_activated=True,
+        )
+        self.event = Event.objects.create(
+            event_name='Import Test Event', original_event_date=date(datetime.now().year, 11, 1),
+            event_description='Test event', fair=fair,
+        )
+        self.zone = Zone.objects.create(zone_name='Import Test Zone', zone_code='IZ')
+        self.site_size = InventoryItem.objects.create(item_name='Import Test Site', item_description='Site')
+
+    def write_extract(self, name, rows):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', newline='') as extract:
+            writer = csv.DictWriter(extract, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+    def import_legacy(self, kind, path):
+        out = StringIO()
+        call_command('import_legacy', kind, path, '--chunk-size', '2', stdout=out)
+        with open(f'{path}.rejects.csv', newline='') as rejects:
+            return out.getvalue(), list(csv.DictReader(rejects))
+
+    def test_import_users_sites_and_history(self):
+        users_path = self.write_extract('stallholders.csv', [
+            {'StallHolderID': '101', 'FNAME': 'ann', 'Surname': 'smith', 'EMAIL': 'ann@example.com',
+             'Tele': '021 123 4567/06 306 9999', 'TradingName': 'ann crafts'},
+            {'StallHolderID': '102', 'FNAME': 'andy', 'Surname': 'smith', 'EMAIL': 'andy@example.com', 'Tele': '',
+             'TradingName': ''},
+            {'StallHolderID': '103', 'FNAME': 'bob', 'Surname': 'jones', 'EMAIL': 'bob@example.com',
+             'Tele': 'unknown', 'TradingName': ''},
+        ])
+        sites_path = self.write_extract('sites.csv', [
+            {'Site': 'IM1', 'Zone': 'IZ', 'Size': str(self.site_size.id)},
+            {'Site': 'IM2a', 'Zone': 'IZ', 'Size': str(self.site_size.id)},
+            {'Site': 'IM3', 'Zone': 'ZZ', 'Size': str(self.site_size.id)},
+        ])
+        history_path = self.write_extract('sitehistory.csv', [
+            {'StallholderID': '101', 'CODE': 'IM1', 'Fair_Name': '2022', 'Skipped': '0', 'NumEvents': '2'},
+            {'StallholderID': '101', 'CODE': 'IM1', 'Fair_Name': '2023', 'Skipped': '1', 'NumEvents': '1'},
+            {'StallholderID': '102', 'CODE': 'IM2a', 'Fair_Name': '2023', 'Skipped': '0', 'NumEvents': '2'},
+            {'StallholderID': '999', 'CODE': 'IM1', 'Fair_Name': '2023', 'Skipped': '0', 'NumEvents': '2'},
+            {'StallholderID': '102', 'CODE': 'IM9', 'Fair_Name': '2023', 'Skipped': '0', 'NumEvents': '2'},
+        ])
+
+        output, rejects = self.import_legacy('users', users_path)
+        self.assertIn('2 created', output)
+        self.assertEqual([row['StallHolderID'] for row in rejects], ['103'])
+        ann = CustomUser.objects.get(reference_id='101')
+        self.assertEqual((ann.username, ann.first_name, ann.phone), ('ASmith', 'Ann', '021 123 4567'))
+        self.assertFalse(ann.has_usable_password())
+        self.assertEqual(CustomUser.objects.get(reference_id='102').username, 'ASmith1')
+        self.assertEqual(Profile.objects.get(user=ann).org_name, 'Ann Crafts')
+        self.assertEqual(Profile.objects.get(user=ann).phone2, '06 306 9999')
+
+        output, rejects = self.import_legacy('sites', sites_path)
+        self.assertIn('2 created', output)
+        self.assertEqual(rejects[0]['reject_reason'], 'Zone name ZZ has not been created')
+        self.assertEqual(Site.objects.get(site_name='IM2a').site_suffix, 'a')
+        self.assertEqual(EventSite.objects.filter(event=self.event).count(), 2)
+
+        output, rejects = self.import_legacy('site_history', history_path)
+        self.assertIn('3 created', output)
+        self.assertEqual(len(rejects), 2)
+        self.assertTrue(SiteHistory.objects.get(stallholder=ann, year='2023').is_skipped)
+        self.assertEqual(SiteTenure.objects.get(stallholder=ann).years, ['2022', '2023'])
+
+        output, rejects = self.import_legacy('site_history', history_path)
+        self.assertIn('0 created, 3 already present', output)
+        output, rejects = self.import_legacy('users', users_path)
+        self.assertIn('0 created, 2 already present', output)
+        self.assertEqual(CustomUser.objects.filter(reference_id__in=['101', '102']).count(), 2)
+
+    def test_overlong_values_are_rejected(self):
+        CustomUser.objects.create(username='CBrown', email='existing@example.com')
+        users_path = self.write_extract('stallholders.csv', [
+            {'StallHolderID': '123456', 'FNAME': 'long', 'Surname': 'id', 'EMAIL': 'long@example.com'},
+            {'StallHolderID': '104', 'FNAME': 'cath', 'Surname': 'brown', 'EMAIL': 'cath@example.com'},
+        ])
+        sites_path = self.write_extract('sites.csv', [
+            {'Site': 'IM' + '9' * 40, 'Zone': 'IZ', 'Size': str(self.site_size.id)},
+            {'Site': 'IM4', 'Zone': 'IZ', 'Size': str(self.site_size.id)},
+        ])
+
+        output, rejects = self.import_legacy('users', users_path)
+        self.assertIn('1 created', output)
+        self.assertEqual([row['StallHolderID'] for row in rejects], ['123456'])
+        self.assertEqual(rejects[0]['reject_reason'], 'Reference id 123456 is longer than 5 characters')
+        self.assertEqual(CustomUser.objects.get(reference_id='104').username, 'CBrown1')
+
+        output, rejects = self.import_legacy('sites', sites_path)
+        self.assertIn('1 created', output)
+        self.assertEqual(len(rejects), 1)
+        self.assertTrue(Site.objects.filter(site_name='IM4').exists())
+
+    def test_ragged_rows_are_read_or_rejected(self):
+        stallholder = CustomUser.objects.create(username='ragged@example.com', email='ragged@example.com',
+                                                reference_id='201')
+        Site.objects.create(site_name='IR1', zone=self.zone, site_size=self.site_size)
+        history_path = os.path.join(self.directory.name, 'sitehistory.csv')
+        with open(history_path, 'w', newline='') as extract:
+            extract.write(
+                'StallholderID,CODE,Fair_Name,NumEvents,Skipped\n'
+                '201,IR1,2022,2\n'
+                '201,IR1\n'
+                '201,IR1,2023,inf,0\n'
+                '201,IR1,2024,1,0,extra\n'
+            )
+
+        output, rejects = self.import_legacy('site_history', history_path)
+
+        self.assertIn('2 created', output)
+        self.assertEqual(
+            [(row['Fair_Name'], row['reject_reason']) for row in rejects],
+            [('', 'No value for: year'), ('2023', 'Invalid value: cannot convert float infinity to integer')],
+        )
+        self.assertEqual(
+            list(
+                SiteHistory.objects.filter(stallholder=stallholder).order_by('year').values_list('year', 'is_skipped')
+            ),
+            [('2022', False), ('2024', False)],
+        )
@@ -0,0 +1,120 @@
+# fairs/tests/test_powerbox_service.py
+
+from datetime import date, datetime
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import CustomUser
+from fairs.models import (
+    Fair,
+    Event,
+    EventSite,
+    PowerBox,
+    Site,
+    SiteAllocation,
+    Zone,
+)
+from fairs.services.powerbox_service import PowerboxReportService
+from registration.models import (
+    FoodPrepEquipment,
+    FoodPrepEquipReq,
+    PowerSource,
+    StallRegistration,
+)
+
+
+class PowerboxReportServiceTest(TestCase):
+    def setUp(self):
+        self.fair = Fair.objects.create(
+            fair_name='Powerbox Test Fair',
+            fair_year=str(datetime.now().year),
+            fair_description='Test fair',
+            is_activated=True,
+        )
+        self.event = Event.objects.create(
+            event_name='Powerbox Test Event',
+            original_event_date=date(datetime.now().year, 11, 1),
+            event_description='Test event',
+            fair=self.fair,
+        )
+        self.zone = Zone.objects.create(zone_name='Powerbox Test Zone')
+        self.powerbox = PowerBox.objects.create(
+            power_box_name='PB1',
+            power_box_description='Test powerbox',
+            socket_count=20,
+            caravan_socket_16a=10,
+            three_pin_15a=10,
+            max_load=100,
+            zone=self.zone,
+        )
+        # Two amp draw per unit: ((1200 + 1200) / 2) * 0.4 / 240
+        self.equipment = FoodPrepEquipment.objects.create(
+            equipment_name='Urn',
+            power_load_maximum=1200,
+            power_load_minimum=1200,
+            power_load_factor=40,
+        )
+        self.site_number = 0
+
+    def create_powered_registration(self, equipment_quantity):
+        self.site_number += 1
+        stallholder = CustomUser.objects.create(
+            username=f'powered{self.site_number}@example.com',
+            email=f'powered{self.site_number}@example.com',
+        )
+        site = Site.objects.create(
+            site_name=f'PB{self.site_number}',
+            zone=self.zone,
+            has_power=True,
+            powerbox=self.powerbox,
+        )
+        event_site = EventSite.objects.create(event=self.event, site=site)
+        registration = StallRegistration.objects.create(
+            fair=self.fair,
+            stallholder=stallholder,
+            stall_manager_name='Manager',
+            stall_description='Stall',
+            products_on_site='Food',
+            total_charge=0,
+            selling_food=True,
+            uses_electrical_equipment=True,
+            power_source=PowerSource.FAIR,
+            caravan_socket_16a=1,
+        )
+        SiteAllocation.objects.create(
+            stallholder=stallholder,
+            event_site=event_site,
+            stall_registration=registration,
+        )
+        FoodPrepEquipReq.objects.create(
+            food_registration=registration.food_registration,
+            food_prep_equipment=self.equipment,
+            equipment_quantity=equipment_quantity,
+        )
+        return registration
+
+    def test_report_power_load_totals(self):
+        first = self.create_powered_registration(equipment_quantity=1)
+        second = self.create_powered_registration(equipment_quantity=3)
+
+        report = {
+            row['id']: row for row in PowerboxReportService.get_report_data()
+        }
+
+        self.assertEqual(report[first.id]['total_power_load_amps'], 2)
+        self.assertEqual(report[second.id]['total_power_load_amps'], 6)
+        self.assertEqual(report[first.id]['connected_sites'], 2)
+
+    def test_report_uses_constant_number_of_queries(self):
+        self.create_powered_registration(equipment_quantity=1)
+        with CaptureQueriesContext(connection) as small_report:
+            self.assertEqual(len(PowerboxReportService.get_report_data()), 1)
+
+        for quantity in range(2, 7):
+            self.create_powered_registration(equipment_quantity=quantity)
+        with CaptureQueriesContext(connection) as large_report:
+            self.assertEqual(len(PowerboxReportService.get_report_data()), 6)
+
+        self.assertEqual(len(small_report), len(large_report))
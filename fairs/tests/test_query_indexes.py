@@ -0,0 +1,94 @@
+# fairs/tests/test_query_indexes.py
+
+from datetime import date, datetime
+
+from django.db import connection
+from django.test import TestCase
+
+from accounts.models import CustomUser
+from fairs.models import Event, EventSite, Fair, Site, SiteAllocation
+from payment.models import Invoice, PaymentHistory
+from registration.models import StallRegistration
+
+INDEX_SCANS = ('Index Scan', 'Bitmap Index Scan', 'Index Only Scan')
+
+
+class QueryIndexTest(TestCase):
+    """
+    EXPLAIN the hot list and report queries and check each is answered from an index.
+
+    The test tables hold a handful of rows, where the planner would rightly prefer a sequential scan, so sequential
+    scans are disabled for the test transaction. The plan then shows whether a usable index exists for the query
+    shape, not whether the planner would pick it for production data.
+    """
+
+    def setUp(self):
+        year = datetime.now().year
+        self.fair = Fair.objects.create(
+            fair_name='Index Fair', fair_year=str(year), fair_description='Test fair', is_activated=True
+        )
+        self.event = Event.objects.create(
+            event_name='Index Event', original_event_date=date.today(), event_description='Test event',
+            fair=self.fair,
+        )
+        self.stallholder = CustomUser.objects.create(username='index@example.com', email='index@example.com')
+        self.registration = StallRegistration.objects.create(
+            fair=self.fair,
+            stallholder=self.stallholder,
+            stall_manager_name='Manager',
+            stall_description='Stall',
+            products_on_site='Products',
+            total_charge=0,
+        )
+        self.event_site = EventSite.objects.create(event=self.event, site=Site.objects.create(site_name='IX1'))
+        self.invoice = Invoice.objects.create(stall_registration=self.registration, stallholder=self.stallholder)
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, *index_names):
+        """
+        Assert the plan of queryset scans an index, one of index_names when given
+        """
+        plan = queryset.explain()
+        self.assertTrue(any(scan in plan for scan in INDEX_SCANS), f'No index scan in the plan:\n{plan}')
+        if index_names:
+            self.assertTrue(any(name in plan for name in index_names), f'None of {index_names} in the plan:\n{plan}')
+
+    def test_stall_registration_queries(self):
+        self.assertUsesIndex(
+            StallRegistration.objects.filter(fair=self.fair, booking_status=StallRegistration.SUBMITTED),
+            'stallreg_fair_status_idx',
+        )
+        self.assertUsesIndex(
+            StallRegistration.objects.filter(stallholder=self.stallholder, fair=self.fair),
+            'stallreg_holder_fair_idx',
+        )
+        self.assertUsesIndex(
+            StallRegistration.objects.order_by('-date_updated')[:10],
+            'stallreg_date_updated_idx',
+        )
+        self.assertUsesIndex(
+            StallRegistration.objects.filter(fair=self.fair, booking_status=StallRegistration.BOOKED),
+            'stallreg_booked_fair_idx', 'stallreg_fair_status_idx',
+        )
+
+    def test_site_allocation_queries(self):
+        # stall_registration and (stallholder, event_site) are covered by the foreign key and unique_together indexes
+        self.assertUsesIndex(SiteAllocation.objects.filter(stall_registration=self.registration))
+        self.assertUsesIndex(SiteAllocation.objects.filter(stallholder=self.stallholder, event_site=self.event_site))
+        self.assertUsesIndex(
+            SiteAllocation.objects.filter(fair=self.fair, stall_registration__isnull=True, on_hold=False),
+            'siteallocation_unreg_idx',
+        )
+
+    def test_event_site_queries(self):
+        self.assertUsesIndex(
+            EventSite.objects.filter(event=self.event, site_status=EventSite.AVAILABLE),
+            'eventsite_event_status_idx',
+        )
+
+    def test_payment_history_queries(self):
+        self.assertUsesIndex(
+            PaymentHistory.objects.filter(invoice=self.invoice, payment_status=PaymentHistory.PENDING),
+            'payment_invoice_status_idx',
+        )
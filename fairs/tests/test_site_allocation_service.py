@@ -0,0 +1,280 @@
+# fairs/tests/test_site_allocation_service.py
+
+from datetime import date, datetime
+from itertools import permutations
+from unittest import mock
+
+import numpy as np
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from fairs.models import (
+    Fair,
+    Event,
+    EventSite,
+    InventoryItem,
+    Site,
+    SiteAllocation,
+    SiteHistory,
+)
+from fairs.services.site_tenure_service import SiteTenureService
+from registration.models import StallRegistration
+from utils.services.site_allocation_service import SiteAllocationService
+
+
+class SiteAllocationServiceTest(TestCase):
+    def setUp(self):
+        self.year = datetime.now().year
+        self.fair = Fair.objects.create(
+            fair_name='Allocation Test Fair',
+            fair_year=str(self.year),
+            fair_description='Test fair',
+            is_activated=True,
+        )
+        self.events = [
+            Event.objects.create(
+                event_name=f'Allocation Test Event {day}',
+                original_event_date=date(self.year, 11, day),
+                event_description='Test event',
+                fair=self.fair,
+            )
+            for day in (1, 2)
+        ]
+        self.site_size = InventoryItem.objects.create(
+            item_name='Allocation Test Site',
+            item_type=InventoryItem.FAIRSITE,
+            item_description='Test site',
+        )
+        self.system_user = CustomUser.objects.create(username='system@example.com', email='system@example.com')
+        patcher = mock.patch('utils.services.site_allocation_service.SYSTEM_USER_ID', self.system_user.id)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_site(self, site_name):
+        site = Site.objects.create(site_name=site_name, site_size=self.site_size)
+        for event in self.events:
+            EventSite.objects.create(event=event, site=site)
+        return site
+
+    def create_stallholder(self, username, history):
+        stallholder = CustomUser.objects.create(username=username, email=username)
+        for site, years_past in history:
+            SiteHistory.objects.create(stallholder=stallholder, site=site, year=str(self.year - years_past))
+        SiteTenureService.refresh({site.id for site, _years_past in history})
+        return stallholder
+
+    def get_allocated_sites(self, stallholder):
+        return sorted(
+            SiteAllocation.objects.filter(stallholder=stallholder).values_list(
+                'event_site__event_id', 'event_site__site__site_name'
+            )
+        )
+
+    def test_allocates_by_priority(self):
+        site_one = self.create_site('AL1')
+        site_two = self.create_site('AL2')
+        regular = self.create_stallholder('regular@example.com', [(site_one, years) for years in range(4)])
+        mover = self.create_stallholder(
+            'mover@example.com', [(site_one, 2), (site_one, 3), (site_two, 1)]
+        )
+        newcomer = self.create_stallholder('newcomer@example.com', [(site_two, 0)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            allocations = SiteAllocationService.allocate_sites()
+
+        self.assertEqual(len(allocations), 4)
+        self.assertEqual({allocation.fair_id for allocation in allocations}, {self.fair.id})
+        event_one, event_two = (event.id for event in self.events)
+        self.assertEqual(self.get_allocated_sites(regular), [(event_one, 'AL1'), (event_two, 'AL1')])
+        self.assertEqual(self.get_allocated_sites(newcomer), [(event_one, 'AL2'), (event_two, 'AL2')])
+        self.assertEqual(self.get_allocated_sites(mover), [])
+        self.assertFalse(EventSite.objects.exclude(site_status=EventSite.ALLOCATED).exists())
+
+    def test_skips_allocated_sites_and_stallholders(self):
+        site_one = self.create_site('AL1')
+        site_two = self.create_site('AL2')
+        regular = self.create_stallholder('regular@example.com', [(site_one, 0)])
+        newcomer = self.create_stallholder('newcomer@example.com', [(site_two, 0)])
+        SiteAllocation.objects.create(
+            stallholder=regular, event_site=EventSite.objects.get(event=self.events[0], site=site_two)
+        )
+        EventSite.objects.filter(event=self.events[1], site=site_two).update(site_status=EventSite.UNAVAILABLE)
+
+        SiteAllocationService.allocate_sites()
+
+        self.assertEqual(
+            self.get_allocated_sites(regular), [(self.events[0].id, 'AL2'), (self.events[1].id, 'AL1')]
+        )
+        self.assertEqual(self.get_allocated_sites(newcomer), [])
+        self.assertEqual(
+            EventSite.objects.get(event=self.events[0], site=site_one).site_status, EventSite.AVAILABLE
+        )
+
+    def test_query_count_does_not_grow_with_stallholders(self):
+        def run_allocation(site_count):
+            SiteAllocation.objects.all().delete()
+            EventSite.objects.update(site_status=EventSite.AVAILABLE)
+            for number in range(site_count):
+                site, _created = Site.objects.get_or_create(site_name=f'AQ{number}', site_size=self.site_size)
+                if not site.event_sites.exists():
+                    for event in self.events:
+                        EventSite.objects.create(event=event, site=site)
+                self.create_stallholder(f'stallholder{site_count}_{number}@example.com', [(site, 0)])
+            with CaptureQueriesContext(connection) as queries:
+                allocations = SiteAllocationService.allocate_sites()
+            self.assertEqual(len(allocations), site_count * len(self.events))
+            return len(queries)
+
+        self.assertEqual(run_allocation(2), run_allocation(10))
+
+    def test_preview_writes_nothing(self):
+        site_one = self.create_site('AL1')
+        site_two = self.create_site('AL2')
+        self.create_site('AL3')
+        regular = self.create_stallholder('regular@example.com', [(site_one, years) for years in range(4)])
+        mover = self.create_stallholder('mover@example.com', [(site_one, 2), (site_one, 3), (site_two, 1)])
+
+        plan = SiteAllocationService.preview_allocations()
+
+        self.assertFalse(SiteAllocation.objects.exists())
+        self.assertFalse(EventSite.objects.exclude(site_status=EventSite.AVAILABLE).exists())
+        self.assertEqual(len(plan.allocations), 4)
+        self.assertEqual(
+            [(row['stallholder_id'], row['site_id'], row['taken_by_id']) for row in plan.conflicts],
+            [(mover.id, site_one.id, regular.id)] * 2,
+        )
+        self.assertEqual(len(plan.unallocated), 2)
+
+        rows = SiteAllocationService.get_plan_rows(plan)
+        self.assertEqual(
+            [row['result'] for row in rows],
+            [SiteAllocationService.ALLOCATED] * 4 + [SiteAllocationService.CONFLICT] * 2
+            + [SiteAllocationService.UNALLOCATED] * 2,
+        )
+        self.assertEqual(rows[4]['taken_by'], regular)
+
+    def test_simulation_reuses_snapshot(self):
+        site_one = self.create_site('AL1')
+        self.create_stallholder('regular@example.com', [(site_one, 0)])
+        snapshot = SiteAllocationService.load_snapshot()
+
+        with self.assertNumQueries(0):
+            first_plan = SiteAllocationService.simulate(snapshot)
+            second_plan = SiteAllocationService.simulate(snapshot)
+
+        self.assertEqual(first_plan, second_plan)
+        self.assertEqual(len(snapshot.available_sites), 2)
+
+    def test_optimal_strategy_allocates_second_choice_sites(self):
+        site_one = self.create_site('AL1')
+        site_two = self.create_site('AL2')
+        regular = self.create_stallholder('regular@example.com', [(site_one, years) for years in range(3)])
+        mover = self.create_stallholder(
+            'mover@example.com', [(site_one, 0), (site_one, 1), (site_two, 2), (site_two, 3)]
+        )
+        snapshot = SiteAllocationService.load_snapshot()
+
+        greedy_plan = SiteAllocationService.simulate(snapshot, SiteAllocationService.GREEDY)
+        optimal_plan = SiteAllocationService.simulate(snapshot, SiteAllocationService.OPTIMAL)
+
+        self.assertEqual({row['stallholder_id'] for row in greedy_plan.allocations}, {regular.id})
+        self.assertEqual(
+            sorted((row['stallholder_id'], row['site_id']) for row in optimal_plan.allocations),
+            sorted([(regular.id, site_one.id), (mover.id, site_two.id)] * 2),
+        )
+        self.assertEqual(optimal_plan.conflicts, [])
+
+        allocations = SiteAllocationService.allocate_sites(SiteAllocationService.OPTIMAL)
+
+        self.assertEqual(len(allocations), 4)
+        self.assertEqual(self.get_allocated_sites(mover), [(self.events[0].id, 'AL2'), (self.events[1].id, 'AL2')])
+
+    def test_unknown_strategy(self):
+        site_one = self.create_site('AL1')
+        self.create_stallholder('regular@example.com', [(site_one, 0)])
+
+        with self.assertRaises(ValueError):
+            SiteAllocationService.preview_allocations('random')
+
+    @override_settings(SITE_ALLOCATION_STRATEGY=SiteAllocationService.GREEDY)
+    def test_preview_page_names_the_strategy_the_run_uses(self):
+        self.client.force_login(CustomUser.objects.create_superuser(
+            username='preview@example.com', email='preview@example.com', password='preview'
+        ))
+        url = reverse('fair:site-allocation-preview')
+
+        response = self.client.get(url, {'strategy': SiteAllocationService.GREEDY})
+        self.assertContains(response, 'which uses the greedy strategy')
+
+        response = self.client.get(url, {'strategy': SiteAllocationService.OPTIMAL})
+        self.assertContains(response, 'This is a preview of the optimal strategy')
+        self.assertContains(response, 'greedy strategy so will not make these allocations')
+
+    def test_delete_unregistered_allocations(self):
+        stallholder = CustomUser.objects.create(username='unregistered@example.com', email='unregistered@example.com')
+        registration = StallRegistration.objects.create(
+            fair=self.fair,
+            stallholder=stallholder,
+            stall_manager_name='Manager',
+            stall_description='Stall',
+            products_on_site='Products',
+            total_charge=0,
+        )
+        event = self.events[0]
+        event_sites = {}
+        for site_name, allocation_fields in (
+            ('AL1', {}),
+            ('AL2', {'on_hold': True}),
+            ('AL3', {'stall_registration': registration}),
+            ('AL4', {}),
+        ):
+            event_sites[site_name] = EventSite.objects.get(event=event, site=self.create_site(site_name))
+            SiteAllocation.objects.create(
+                stallholder=stallholder, event_site=event_sites[site_name], **allocation_fields
+            )
+        EventSite.objects.filter(id=event_sites['AL4'].id).update(site_status=EventSite.BOOKED)
+
+        # The savepoint pair of the atomic block, the locking select, the DELETE and the UPDATE
+        with self.assertNumQueries(5):
+            summary = SiteAllocationService.delete_unregistered_allocations()
+
+        self.assertEqual(summary, {'deleted': 1, 'kept': 1})
+        self.assertEqual(
+            sorted(SiteAllocation.objects.values_list('event_site__site__site_name', flat=True)),
+            ['AL2', 'AL3', 'AL4'],
+        )
+        self.assertEqual(
+            {
+                site_name: EventSite.objects.get(id=event_site.id).site_status
+                for site_name, event_site in event_sites.items()
+            },
+            {
+                'AL1': EventSite.AVAILABLE,
+                'AL2': EventSite.ALLOCATED,
+                'AL3': EventSite.ALLOCATED,
+                'AL4': EventSite.BOOKED,
+            },
+        )
+
+    def test_solve_assignment_matches_brute_force(self):
+        generator = np.random.default_rng(2024)
+        for rows, columns in [(4, 4), (3, 5), (5, 3)]:
+            weights = generator.integers(0, 20, size=(rows, columns)).astype(float)
+            pairs = SiteAllocationService.solve_assignment(weights)
+            self.assertEqual(len(pairs), min(rows, columns))
+            self.assertEqual(len({row for row, _column in pairs}), len(pairs))
+            self.assertEqual(len({column for _row, column in pairs}), len(pairs))
+            if rows <= columns:
+                best = max(
+                    sum(weights[row, column] for row, column in enumerate(assignment))
+                    for assignment in permutations(range(columns), rows)
+                )
+            else:
+                best = max(
+                    sum(weights[row, column] for column, row in enumerate(assignment))
+                    for assignment in permutations(range(rows), columns)
+                )
+            self.assertEqual(sum(weights[row, column] for row, column in pairs), best)
@@ -0,0 +1,81 @@
+# fairs/tests/test_site_history_managers.py
+
+from datetime import datetime
+
+from django.test import TestCase
+
+from accounts.models import CustomUser
+from fairs.models import Fair, Site, SiteHistory
+
+
+class SiteSortKeyTest(TestCase):
+    def test_site_name_split_on_save(self):
+        site = Site.objects.create(site_name='SDE123a')
+        self.assertEqual((site.site_prefix, site.site_number, site.site_suffix), ('SDE', 123, 'a'))
+
+        site.site_name = 'SD7'
+        site.save(update_fields=['site_name'])
+        site.refresh_from_db()
+        self.assertEqual((site.site_prefix, site.site_number, site.site_suffix), ('SD', 7, ''))
+
+    def test_site_name_without_number(self):
+        self.assertEqual(Site.split_site_name('Carpark'), ('Carpark', None, ''))
+
+    def test_history_managers_sort_naturally(self):
+        year = datetime.now().year
+        Fair.objects.create(
+            fair_name='Sort Test Fair', fair_year=str(year), fair_description='Test fair', is_activated=True
+        )
+        stallholder = CustomUser.objects.create(username='sort@example.com', email='sort@example.com')
+        site_names = ['SDE1', 'SD10a', 'SD2', 'SD10', 'SDE12']
+        for site_name in site_names:
+            SiteHistory.objects.create(
+                stallholder=stallholder, site=Site.objects.create(site_name=site_name), year=str(year)
+            )
+        expected = ['SD2', 'SD10', 'SD10a', 'SDE1', 'SDE12']
+
+        self.assertEqual(
+            [history.site.site_name for history in SiteHistory.fouryearhistorymgr.select_related('site')],
+            expected,
+        )
+        self.assertEqual(
+            [history.site.site_name for history in SiteHistory.currentsitehistorymgr.select_related('site')],
+            expected,
+        )
+
+
+class SiteHistoryQuerySetTest(TestCase):
+    def setUp(self):
+        self.sites = [Site.objects.create(site_name=f'LH{number}') for number in range(3)]
+        self.stallholders = [
+            CustomUser.objects.create(username=f'latest{number}@example.com', email=f'latest{number}@example.com')
+            for number in range(3)
+        ]
+        first, second, third = self.stallholders
+        for stallholder, site, year in [
+            (first, self.sites[0], '2021'),
+            (second, self.sites[0], '2023'),
+            (third, self.sites[1], '2022'),
+            (second, self.sites[1], '2022'),
+            (first, self.sites[1], '2020'),
+        ]:
+            SiteHistory.objects.create(stallholder=stallholder, site=site, year=year)
+
+    def get_latest(self, queryset):
+        return sorted((history.site_id, history.stallholder_id, history.year) for history in queryset)
+
+    def test_latest_per_site(self):
+        expected = [
+            (self.sites[0].id, self.stallholders[1].id, '2023'),
+            (self.sites[1].id, self.stallholders[1].id, '2022'),
+        ]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_latest(SiteHistory.histories.latest_per_site()), expected)
+        self.assertEqual(self.get_latest(SiteHistory.histories.latest_per_site_window()), expected)
+
+    def test_latest_per_site_of_filtered_sites(self):
+        self.assertEqual(
+            self.get_latest(SiteHistory.histories.filter(site=self.sites[0]).latest_per_site()),
+            [(self.sites[0].id, self.stallholders[1].id, '2023')],
+        )
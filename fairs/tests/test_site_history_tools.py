@@ -0,0 +1,87 @@
+# fairs/tests/test_site_history_tools.py
+
+from datetime import date, datetime
+
+from django.test import TestCase
+
+from accounts.models import CustomUser
+from fairs.models import (
+    Fair,
+    Event,
+    EventSite,
+    InventoryItem,
+    Site,
+    SiteAllocation,
+    SiteHistory,
+    SiteTenure,
+)
+from registration.models import StallRegistration
+from utils.site_history_tools import HALF_SIZE_SITE, populate_site_history
+
+
+class PopulateSiteHistoryTest(TestCase):
+    def setUp(self):
+        self.year = str(datetime.now().year)
+        self.fair = Fair.objects.create(
+            fair_name='History Test Fair', fair_year=self.year, fair_description='Test fair', is_activated=True
+        )
+        self.events = [
+            Event.objects.create(
+                event_name=f'History Test Event {day}',
+                original_event_date=date(int(self.year), 11, day),
+                event_description='Test event',
+                fair=self.fair,
+            )
+            for day in (1, 2)
+        ]
+        self.half_size = InventoryItem.objects.create(item_name=HALF_SIZE_SITE, item_description='Half site')
+        self.stallholders = [
+            CustomUser.objects.create(username=f'history{number}@example.com', email=f'history{number}@example.com')
+            for number in range(4)
+        ]
+        self.sites = [Site.objects.create(site_name=f'HS{number}') for number in range(4)]
+
+    def book(self, stallholder, site, events, site_size=None):
+        registration = StallRegistration.objects.create(
+            fair=self.fair,
+            stallholder=stallholder,
+            stall_manager_name='Manager',
+            stall_description='Stall',
+            products_on_site='Products',
+            total_charge=0,
+            booking_status='Booked',
+            site_size=site_size,
+        )
+        for event in events:
+            SiteAllocation.objects.create(
+                stallholder=stallholder,
+                event_site=EventSite.objects.get_or_create(event=event, site=site)[0],
+                stall_registration=registration,
+            )
+
+    def test_rollup_upserts_and_deletes_current_year(self):
+        unchanged, changed, new, stale = self.stallholders
+        self.book(unchanged, self.sites[0], self.events)
+        self.book(changed, self.sites[1], self.events, site_size=self.half_size)
+        self.book(new, self.sites[2], self.events[:1])
+        SiteHistory.objects.create(stallholder=unchanged, site=self.sites[0], year=self.year, number_events=2,
+                                   history_note='Keep me')
+        SiteHistory.objects.create(stallholder=changed, site=self.sites[1], year=self.year, number_events=1)
+        SiteHistory.objects.create(stallholder=stale, site=self.sites[3], year=self.year)
+        SiteHistory.objects.create(stallholder=stale, site=self.sites[3], year='2019')
+
+        summary = populate_site_history()
+
+        self.assertEqual(summary, {'inserted': 1, 'updated': 1, 'deleted': 1})
+        self.assertEqual(
+            SiteHistory.objects.get(stallholder=unchanged, year=self.year).history_note, 'Keep me'
+        )
+        changed_history = SiteHistory.objects.get(stallholder=changed, year=self.year)
+        self.assertEqual(changed_history.number_events, 2)
+        self.assertTrue(changed_history.is_half_size)
+        self.assertEqual(SiteHistory.objects.get(stallholder=new, year=self.year).number_events, 1)
+        self.assertEqual(list(SiteHistory.objects.filter(stallholder=stale).values_list('year', flat=True)), ['2019'])
+        self.assertEqual(SiteTenure.objects.get(stallholder=stale).years, ['2019'])
+        self.assertTrue(SiteTenure.objects.filter(stallholder=new, site=self.sites[2]).exists())
+
+        self.assertEqual(populate_site_history(), {'inserted': 0, 'updated': 0, 'deleted': 0})
@@ -0,0 +1,79 @@
+# fairs/tests/test_site_tenure_service.py
+
+from datetime import date, datetime
+
+from django.test import TestCase
+
+from accounts.models import CustomUser
+from fairs.models import Fair, Event, EventSite, Site, SiteAllocation, SiteHistory, SiteTenure
+from fairs.services.fair_context_service import FairContextService
+from fairs.services.site_tenure_service import SiteTenureService
+from reports.services.site_allocation_audit_service import SiteAllocationAuditService
+
+
+class SiteTenureServiceTest(TestCase):
+    def setUp(self):
+        self.site = Site.objects.create(site_name='TN1')
+        self.other_site = Site.objects.create(site_name='TN2')
+        self.founder = CustomUser.objects.create(username='founder@example.com', email='founder@example.com')
+        self.successor = CustomUser.objects.create(username='successor@example.com', email='successor@example.com')
+        for year in ('2019', '2020', '2020', '2022'):
+            SiteHistory.objects.get_or_create(stallholder=self.founder, site=self.site, year=year)
+        SiteHistory.objects.create(stallholder=self.successor, site=self.site, year='2023')
+        SiteHistory.objects.create(stallholder=self.successor, site=self.other_site, year='2023')
+
+    def test_refresh_builds_tenure(self):
+        self.assertEqual(SiteTenureService.refresh(), 3)
+
+        founder_tenure = SiteTenure.objects.get(site=self.site, stallholder=self.founder)
+        self.assertEqual(founder_tenure.years, ['2019', '2020', '2022'])
+        self.assertEqual(founder_tenure.years_held, 3)
+        self.assertEqual((founder_tenure.first_year, founder_tenure.last_year), ('2019', '2022'))
+        self.assertFalse(founder_tenure.is_latest_holder)
+        self.assertTrue(SiteTenure.objects.get(site=self.site, stallholder=self.successor).is_latest_holder)
+
+    def test_refresh_is_limited_to_changed_sites(self):
+        SiteTenureService.refresh()
+        SiteHistory.objects.filter(stallholder=self.successor).delete()
+        SiteHistory.objects.create(stallholder=self.founder, site=self.other_site, year='2024')
+
+        SiteTenureService.refresh([self.site.id])
+
+        self.assertTrue(SiteTenure.objects.get(site=self.site, stallholder=self.founder).is_latest_holder)
+        self.assertFalse(SiteTenure.objects.filter(site=self.site, stallholder=self.successor).exists())
+        # other_site was not refreshed so still reflects the old history
+        self.assertTrue(SiteTenure.objects.filter(site=self.other_site, stallholder=self.successor).exists())
+        self.assertFalse(SiteTenure.objects.filter(site=self.other_site, stallholder=self.founder).exists())
+
+    def test_audit_reads_tenure(self):
+        SiteTenureService.refresh()
+        fair = Fair.objects.create(
+            fair_name='Tenure Test Fair', fair_year=str(datetime.now().year), fair_description='Test fair',
+            is_activated=True,
+        )
+        event = Event.objects.create(
+            event_name='Tenure Test Event', original_event_date=date(datetime.now().year, 11, 1),
+            event_description='Test event', fair=fair,
+        )
+        SiteAllocation.objects.create(
+            stallholder=self.founder, event_site=EventSite.objects.create(event=event, site=self.site)
+        )
+        SiteAllocation.objects.create(
+            stallholder=self.successor, event_site=EventSite.objects.create(event=event, site=self.other_site)
+        )
+
+        # The current fair is resolved once per request, outside the audit's own queries
+        FairContextService.get()
+        with self.assertNumQueries(3) as queries:
+            rows = SiteAllocationAuditService.get_changed_allocations()
+
+        # Only the tenures of the allocated sites are read
+        tenure_sql = next(query['sql'] for query in queries.captured_queries if 'fairs_sitetenure' in query['sql'])
+        self.assertIn('"fairs_sitetenure"."site_id" IN (SELECT', tenure_sql)
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['site_name'], 'TN1')
+        self.assertEqual(rows[0]['current_stallholder_id'], self.founder.id)
+        self.assertEqual(rows[0]['last_year_occupied'], '2022')
+        self.assertEqual(rows[0]['count_years_occupied'], 3)
+        self.assertEqual(rows[0]['previous_stallholder_id'], self.successor.id)
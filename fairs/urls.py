@@ -50,6 +50,8 @@ from fairs.views import (
     stall_registration_dashboard_view,
     stallregistration_detail_view,
     setup_process_dashboard_view,
+    site_allocation_preview_view,
+    export_site_allocation_preview_csv,
     messages_dashboard_view,
     stallholder_history_dashboard_view,
     set_message_to_done,
@@ -95,6 +97,9 @@ urlpatterns = [
     path('eventpower/', EventPowerListView.as_view(), name='eventpower-list'),
     path('eventpower/,<int:pk>', EventPowerDetailUpdateView.as_view(), name='eventpower-detail'),
     path('dashboard/process/', setup_process_dashboard_view, name='setup-dashboard'),
+    path('dashboard/process/allocation-preview/', site_allocation_preview_view, name='site-allocation-preview'),
+    path('dashboard/process/allocation-preview-csv/', export_site_allocation_preview_csv,
+         name='site-allocation-preview-csv'),
     path('dashboard/site/', site_dashboard_view, name='site-dashboard'),
     path('dashboard/registrations/', stall_registration_dashboard_view, name='registration-dashboard'),
     path('dashboard/messages/', messages_dashboard_view, name='messages-dashboard'),
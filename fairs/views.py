@@ -1,4 +1,5 @@
 # fairs/views.py
+import csv
 import datetime
 import os
 import logging
@@ -17,7 +18,6 @@ from django.http import HttpResponseRedirect, HttpResponse, FileResponse, Http40
 from django.conf import settings
 from django.contrib import messages
 from django.template.loader import render_to_string
-from weasyprint import HTML
 from django.shortcuts import get_object_or_404,redirect, render
 from django.urls import reverse_lazy, reverse
 from collections import defaultdict
@@ -63,6 +63,7 @@ from utils.site_allocation_tools import (
     delete_unregistered_allocations
 )
 from utils.site_history_tools import populate_site_history
+from utils.services.site_allocation_service import SiteAllocationService
 
 from utils.stallholder_history_tools import(
     update_site_history_is_half_size
@@ -124,13 +125,20 @@ from emails.backend import (
 from .services.powerbox_service import (
     PowerboxReportService
 )
+from .services.dashboard_statistics_service import (
+    DashboardStatisticsService
+)
+from .services.dashboard_metrics_cache import (
+    DashboardMetricsCache
+)
+from .services.fair_context_service import FairContextService
+from .services.fair_year_service import FairYearService
+from reports.services.pdf_job_service import PdfJobService
+from reports.services.pdf_renderer import write_pdf
 
 
 
 # Global Variables
-current_year = datetime.datetime.now().year
-current_month = datetime.datetime.now().month
-next_year = current_year + 1
 media_root = settings.MEDIA_ROOT
 site_status_dict = {
     1: 'Available',
@@ -866,7 +874,6 @@ def site_dashboard_view(request):
     """
     Populate the Site Dashboard with counts of the various site statuses
     """
-    events = EventSite.eventsitecurrentmgr.all()
     filter_message = 'Showing unfiltered data - from all future fair events and sites in all the zones'
 
     if request.POST:
@@ -928,31 +935,21 @@ def site_dashboard_view(request):
                 filter_dict = {}
                 filter_message = 'Showing unfiltered data - from all future fair events and sites in all the zones'
 
-            total_counts = events.filter(**filter_dict).count()
-            available_counts = EventSite.site_available.filter(**filter_dict).count()
-            allocated_counts = EventSite.site_allocated.filter(**filter_dict).count()
-            pending_counts = EventSite.site_pending.filter(**filter_dict).count()
-            booked_counts = EventSite.site_booked.filter(**filter_dict).count()
-            unavailable_counts = EventSite.site_unavailable.filter(**filter_dict).count()
+            site_counts = DashboardMetricsCache.get_or_compute(
+                DashboardMetricsCache.SITES, filter_dict,
+                lambda: DashboardStatisticsService.get_site_counts(filter_dict)
+            )
 
     else:
         form = DashboardSiteFilterForm()
-        total_counts = events.count()
-        available_counts = EventSite.site_available.count()
-        allocated_counts = EventSite.site_allocated.count()
-        pending_counts = EventSite.site_pending.count()
-        booked_counts = EventSite.site_booked.count()
-        unavailable_counts = EventSite.site_unavailable.count()
+        site_counts = DashboardMetricsCache.get_or_compute(
+            DashboardMetricsCache.SITES, None, DashboardStatisticsService.get_site_counts
+        )
 
     return TemplateResponse(request, 'dashboards/dashboard_sites.html', {
         'form': form,
         'filter': filter_message,
-        'total_counts': total_counts,
-        'available_counts': available_counts,
-        'allocated_counts': allocated_counts,
-        'pending_counts': pending_counts,
-        'booked_counts': booked_counts,
-        'unavailable_counts': unavailable_counts
+        **site_counts,
     })
 
 
@@ -1378,7 +1375,6 @@ def stall_registration_dashboard_view(request):
     """
     Populate the Stall Application dashboard with counts of a selected group of Application statuses
     """
-    stall_registrations = StallRegistration.objects.all()
     template_name = 'dashboards/dashboard_registrations.html'
     filter_message = 'Showing unfiltered data - from all current and future fairs and site sizes'
     createemailform = CreateEmailForm(request.POST or None)
@@ -1410,17 +1406,10 @@ def stall_registration_dashboard_view(request):
                 filter_dict = {}
                 filter_message = 'Showing unfiltered data - from all current and future fairs and site sizes'
 
-            total_counts = stall_registrations.filter(**filter_dict).count()
-            selling_food_counts = StallRegistration.sellingfoodmgr.filter(**filter_dict).count()
-            created_counts = StallRegistration.registrationcreatedmgr.filter(**filter_dict).count()
-            submitted_counts = StallRegistration.registrationsubmittedmgr.filter(**filter_dict).count()
-            invoiced_counts = StallRegistration.registrationinvoicedmgr.filter(**filter_dict).count()
-            paid_counts = StallRegistration.registrationpaymentcomplemgr.filter(**filter_dict).count()
-            booked_counts = StallRegistration.registrationbookedmgr.filter(**filter_dict).count()
-            cancelled_counts = StallRegistration.registrationcancelledmgr.filter(**filter_dict).count()
-            recently_created_counts = StallRegistration.registrationrecentcreatmgr.filter(**filter_dict).count()
-            amended_counts = StallRegistration.registrationamendedmgr.filter(**filter_dict).count()
-            waitlisted_counts = StallRegistration.registrationwaitlistedmgr.filter(**filter_dict).count()
+            registration_counts = DashboardMetricsCache.get_or_compute(
+                DashboardMetricsCache.REGISTRATIONS, filter_dict,
+                lambda: DashboardStatisticsService.get_registration_counts(filter_dict)
+            )
 
         if 'invoicedbulkemail' in request.POST and createemailform.is_valid():
                 status = 'Invoiced'
@@ -1434,36 +1423,19 @@ def stall_registration_dashboard_view(request):
             bulk_registration_emails(status, subject_type, body)
     else:
         form = DashboardRegistrationFilterForm()
-        total_counts = stall_registrations.count()
-        selling_food_counts = StallRegistration.sellingfoodmgr.count()
-        created_counts = StallRegistration.registrationcreatedmgr.count()
-        submitted_counts = StallRegistration.registrationsubmittedmgr.count()
-        invoiced_counts = StallRegistration.registrationinvoicedmgr.count()
-        paid_counts = StallRegistration.registrationpaymentcomplemgr.count()
-        booked_counts = StallRegistration.registrationbookedmgr.count()
-        cancelled_counts = StallRegistration.registrationcancelledmgr.count()
-        recently_created_counts = StallRegistration.registrationrecentcreatmgr.count()
-        amended_counts = StallRegistration.registrationamendedmgr.count()
-        waitlisted_counts = StallRegistration.registrationwaitlistedmgr.count()
+        registration_counts = DashboardMetricsCache.get_or_compute(
+            DashboardMetricsCache.REGISTRATIONS, None, DashboardStatisticsService.get_registration_counts
+        )
 
     return TemplateResponse(request, template_name, {
         'form': form,
         'filter': filter_message,
-        'total_counts': total_counts,
-        'selling_food_counts': selling_food_counts,
-        'created_counts': created_counts,
-        'submitted_counts': submitted_counts,
-        'invoiced_counts': invoiced_counts,
-        'paid_counts': paid_counts,
-        'booked_counts': booked_counts,
-        'cancelled_counts': cancelled_counts,
-        'recently_created_counts': recently_created_counts,
-        'amended_counts': amended_counts,
-        'waitlisted_counts': waitlisted_counts,
+        **registration_counts,
+        **DashboardMetricsCache.get_or_compute(
+            DashboardMetricsCache.REGISTRATIONS, {'updated_within': True},
+            DashboardStatisticsService.get_registration_updated_counts
+        ),
         'createemailform': createemailform,
-        'updated_today_counts': StallRegistration.count_updated_within('today'),
-        'updated_week_counts' : StallRegistration.count_updated_within('week'),
-        'updated_month_counts' : StallRegistration.count_updated_within('month'),
     })
 
 @login_required
@@ -1473,6 +1445,8 @@ def setup_process_dashboard_view(request):
     A dashboard that guides the convener through the steps to set up and initiate adn new fair
     """
     template_name = "dashboards/dashboard_management_process.html"
+    current_year = FairYearService.get_current_year()
+    current_month = datetime.datetime.now().month
 
     # Status of site history records
     latest_history = SiteHistory.objects.latest('year')
@@ -1489,7 +1463,8 @@ def setup_process_dashboard_view(request):
         bgcolor2 = 'bg-success'
 
     # Status of Fair Data
-    current_fair = Fair.currentfairmgr.all().last()
+    fair_context = FairContextService.get()
+    current_fair = fair_context.fair
     if current_fair:
         has_reached_activation_date = True
         if int(current_fair.fair_year) < current_year and current_month > 5:
@@ -1503,7 +1478,7 @@ def setup_process_dashboard_view(request):
         bgcolor3 = 'bg-danger'
 
     # Status of Fair Events
-    current_events = Event.currenteventfiltermgr.all()
+    current_events = fair_context.events
     if current_events:
         if int(current_fair.fair_year) < current_year and current_month > 5:
             bgcolor4 = 'bg-danger'
@@ -1558,7 +1533,7 @@ def setup_process_dashboard_view(request):
 
     # Check current fair stallregoistrations with matching sitehistory to
     # Get the current fair
-    current_fair = Fair.currentfairmgr.first()
+    current_fair = fair_context.first_fair
     current_fair_year = current_fair.fair_year
 
     # Count unique stallholder-site combinations for booked registrations in the current fair
@@ -1650,6 +1625,70 @@ def setup_process_dashboard_view(request):
     return TemplateResponse(request, template_name, context )
 
 
+@login_required
+@permission_required('fairs.view_fair', raise_exception=True)
+def site_allocation_preview_view(request):
+    """
+    Shows what running the site allocation script would do for the current fair, the proposed allocations, the
+    preferences that could not be met and the sites left unallocated, without writing anything
+    """
+    template_name = "dashboards/site_allocation_preview.html"
+    strategy = request.GET.get('strategy')
+    if strategy not in SiteAllocationService.STRATEGIES:
+        strategy = SiteAllocationService.get_strategy()
+    plan = SiteAllocationService.preview_allocations(strategy)
+    rows = SiteAllocationService.get_plan_rows(plan) if plan else []
+
+    context = {
+        'rows': rows,
+        'strategy': strategy,
+        'run_strategy': SiteAllocationService.get_strategy(),
+        'strategies': SiteAllocationService.STRATEGIES,
+        'count_allocations': len(plan.allocations) if plan else 0,
+        'count_conflicts': len(plan.conflicts) if plan else 0,
+        'count_unallocated': len(plan.unallocated) if plan else 0,
+    }
+    return TemplateResponse(request, template_name, context)
+
+
+@login_required
+@permission_required('fairs.view_fair', raise_exception=True)
+def export_site_allocation_preview_csv(request):
+    """
+    CSV export of the site allocation preview
+    """
+    strategy = request.GET.get('strategy')
+    if strategy not in SiteAllocationService.STRATEGIES:
+        strategy = SiteAllocationService.get_strategy()
+    plan = SiteAllocationService.preview_allocations(strategy)
+    rows = SiteAllocationService.get_plan_rows(plan) if plan else []
+
+    response = HttpResponse(content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="site-allocation-preview.csv"'
+
+    writer = csv.writer(response)
+    writer.writerow([
+        'Result', 'Event', 'Zone', 'Site', 'Stallholder ID', 'Stallholder', 'Years Held', 'Last Year Held',
+        'Allocated To ID',
+    ])
+
+    for row in rows:
+        stallholder = row['stallholder']
+        writer.writerow([
+            row['result'],
+            row['event_name'],
+            row['zone_name'],
+            row['site_name'],
+            stallholder.id if stallholder else '',
+            f"{stallholder.first_name} {stallholder.last_name}" if stallholder else '',
+            row['year_count'] or '',
+            row['latest_year'] or '',
+            row['taken_by'].id if row['taken_by'] else '',
+        ])
+
+    return response
+
+
 @login_required
 @permission_required('fairs.view_fair', raise_exception=True)
 def messages_dashboard_view(request):
@@ -1658,7 +1697,7 @@ def messages_dashboard_view(request):
     """
     template = "dashboards/dashboard_messages_filter.html"
     template_partial = "dashboards/dashboard_messages_partial.html"
-    current_fair = Fair.currentfairmgr.all().last()
+    current_fair = FairContextService.get_current_fair()
     cards_per_page = 6
 
     message_filter_form = MessageFilterForm(request.POST or None)
@@ -2488,6 +2527,19 @@ def generate_powerbox_pdf(request):
         {}
     )
 
+    return PdfJobService.render_response(
+        request,
+        "powerbox_allocation",
+        {"filter_params": filter_params},
+        "powerbox_allocation.pdf"
+    )
+
+
+def build_powerbox_allocation_context(filter_params):
+    """
+    Build the Powerbox Allocation PDF context for the session filters.
+    """
+
     query_filters = {
         k: v
         for k, v in filter_params.items()
@@ -2509,25 +2561,7 @@ def generate_powerbox_pdf(request):
         "stallregistrations_by_powerbox": filtered_data
     }
 
-    html_template = get_template(
-        "powerboxes/powerbox_siteallocations_pdf.html"
-    ).render(context)
-
-    pdf_file = HTML(
-        string=html_template,
-        base_url=request.build_absolute_uri()
-    ).write_pdf()
-
-    response = HttpResponse(
-        pdf_file,
-        content_type="application/pdf"
-    )
-
-    response[
-        "Content-Disposition"
-    ] = 'inline; filename="powerbox_allocation.pdf"'
-
-    return response
+    return context
 
 
 def powerbox_connections_pdf_view(request):
@@ -2583,7 +2617,7 @@ def powerbox_connections_pdf_view(request):
     html_template = get_template('dashboards/powerbox_connections_pdf.html').render(context)
 
     # Generate PDF
-    pdf_file = HTML(string=html_template, base_url=request.build_absolute_uri()).write_pdf()
+    pdf_file = write_pdf(html_template, request.build_absolute_uri())
 
     # Create response
     response = HttpResponse(pdf_file, content_type='application/pdf')
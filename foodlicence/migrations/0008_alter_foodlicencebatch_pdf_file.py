@@ -0,0 +1,18 @@
+# Generated by Django 4.2.14 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("foodlicence", "0007_alter_foodlicencebatch_pdf_file"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="foodlicencebatch",
+            name="pdf_file",
+            field=models.FileField(blank=True, null=True, upload_to="pdfs/%Y"),
+        ),
+    ]
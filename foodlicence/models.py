@@ -8,9 +8,7 @@ from django_fsm import FSMField, transition
 from registration.models import (
     FoodRegistration
 )
-
-current_year = datetime.datetime.now().year
-next_year = current_year + 1
+from fairs.services.fair_year_service import FairYearService
 
 
 class FoodLicenceBatchCurrentManager(models.Manager):
@@ -34,7 +32,7 @@ class FoodLicenceBatch(models.Model):
     date_returned = models.DateTimeField(null=True, blank=True)
     date_closed = models.DateTimeField(null=True, blank=True)
     batch_count = models.IntegerField()
-    pdf_file = models.FileField(upload_to='pdfs/' + str(current_year), null=True, blank=True)
+    pdf_file = models.FileField(upload_to='pdfs/%Y', null=True, blank=True)
 
     objects = models.Manager()
     foodlicencebatchcurrentmgr = FoodLicenceBatchCurrentManager()
@@ -45,8 +43,7 @@ class FoodLicenceCurrentManager(models.Manager):
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(food_registration__registration__fair__fair_year__in=[current_year,
-                                                                                                next_year],
+        return super().get_queryset().filter(food_registration__registration__fair__fair_year__in=FairYearService.get_current_years(),
                                              food_registration__registration__fair__is_activated=True)
 
     def get_created(self):
@@ -0,0 +1,94 @@
+# foodlicence/services/foodlicence_pdf_service.py
+
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from pypdf import PdfWriter
+
+from reports.services.pdf_renderer import write_pdf_file
+
+
+class FoodLicencePdfService:
+    """
+    Service class for the combined SWDC food licence PDF.
+
+    Provides:
+        - Food licence queryset with every row used by swdc_foodlicence.html loaded up front
+        - Parallel rendering of the licence PDFs across a process pool
+        - Merging of the licence PDFs into a file rather than an in memory bytes object, one licence file open at a
+          time
+    """
+
+    @staticmethod
+    def prefetch_licences(queryset):
+        """
+        Returns the food licences with their registration, stallholder, profile, equipment and site allocations
+        loaded in a fixed number of queries.
+        """
+        return list(
+            queryset.select_related(
+                'food_registration__food_stall_type',
+                'food_registration__registration__stallholder__profile',
+                'food_registration__registration__stall_category',
+            ).prefetch_related(
+                'food_registration__food_prep_equipment',
+                'food_registration__registration__site_allocation__event_site__event',
+                'food_registration__registration__site_allocation__event_site__site__zone',
+            )
+        )
+
+    @staticmethod
+    def render_html(licence, protocol, domain):
+        # Check if the certificate file exists
+        certificate_url = None
+        if licence.food_registration.food_registration_certificate:
+            certificate_url = f'{protocol}://{domain}{licence.food_registration.food_registration_certificate.url}'
+
+        context = {
+            'object': licence,
+            'stallholder_detail': licence.food_registration.registration.stallholder.profile,
+            'full_certificate_url': certificate_url,  # This will be None if no file exists
+        }
+        return render_to_string('swdc_foodlicence.html', context)
+
+    @classmethod
+    def write_combined_pdf(cls, licences, protocol, domain, target):
+        """
+        Render each licence to its own PDF in a process pool, then merge them in licence order into the open
+        binary file target.
+
+        Each licence is merged as soon as it and the licences before it are rendered. Its file is opened only while
+        its pages are copied into the writer and is deleted straight after, so the writer holds the pages of the
+        combined PDF rather than an open file and parsed reader per licence. The pool workers are started by a fork
+        server rather than forked from the web worker, which may be running other threads.
+        """
+        stylesheets = [os.path.join(settings.STATIC_ROOT, 'css', 'licence.css')]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with ProcessPoolExecutor(
+                max_workers=getattr(settings, 'PDF_JOB_WORKERS', 2),
+                mp_context=multiprocessing.get_context('forkserver'),
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        write_pdf_file,
+                        cls.render_html(licence, protocol, domain),
+                        os.path.join(temp_dir, f'{index:05d}.pdf'),
+                        stylesheets,
+                    )
+                    for index, licence in enumerate(licences)
+                ]
+
+                pdf_writer = PdfWriter()
+                for future in futures:
+                    pdf_path = future.result()
+                    with open(pdf_path, 'rb') as licence_file:
+                        pdf_writer.append(licence_file)
+                    os.remove(pdf_path)
+
+            pdf_writer.write(target)
+        return target
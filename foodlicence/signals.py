@@ -1,7 +1,8 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django_fsm.signals import post_transition
 from .models import FoodLicence
+from fairs.services.dashboard_metrics_cache import DashboardMetricsCache
 from registration.models import StallRegistration
 
 @receiver(post_transition, sender=FoodLicence)
@@ -16,3 +17,10 @@ def update_stall_registration_on_licence_approval(instance, name, source, target
         if stall_registration:
             stall_registration.booking_status = StallRegistration.BOOKED
             stall_registration.save()
+
+
+@receiver(post_save, sender=FoodLicence)
+@receiver(post_delete, sender=FoodLicence)
+@receiver(post_transition, sender=FoodLicence)
+def invalidate_foodlicence_dashboard_metrics(sender, instance, **kwargs):
+    DashboardMetricsCache.invalidate_on_commit(DashboardMetricsCache.FOODLICENCES)
@@ -0,0 +1,56 @@
+# foodlicence/tests/test_foodlicence_pdf_service.py
+
+from datetime import datetime
+
+from django.test import TestCase
+
+from accounts.models import CustomUser
+from fairs.models import Fair
+from foodlicence.models import FoodLicence
+from foodlicence.services.foodlicence_pdf_service import FoodLicencePdfService
+from registration.models import FoodRegistration, StallRegistration
+
+
+class FoodLicencePdfServiceTest(TestCase):
+    def setUp(self):
+        self.fair = Fair.objects.create(
+            fair_name='Licence Test Fair',
+            fair_year=str(datetime.now().year),
+            fair_description='Test fair',
+            is_activated=True,
+        )
+
+    def create_staged_licence(self, index):
+        stallholder = CustomUser.objects.create(
+            username=f'licence{index}@example.com',
+            email=f'licence{index}@example.com',
+        )
+        registration = StallRegistration.objects.create(
+            fair=self.fair,
+            stallholder=stallholder,
+            stall_manager_name='Manager',
+            stall_description='Food stall',
+            products_on_site='Food',
+            selling_food=True,
+            total_charge=0,
+        )
+        food_registration, created = FoodRegistration.objects.get_or_create(registration=registration)
+        return FoodLicence.objects.create(food_registration=food_registration, licence_status=FoodLicence.STAGED)
+
+    def render_staged_licences(self):
+        licences = FoodLicencePdfService.prefetch_licences(FoodLicence.objects.filter(licence_status='Staged'))
+        with self.assertNumQueries(0):
+            return [FoodLicencePdfService.render_html(licence, 'https', 'example.com') for licence in licences]
+
+    def test_render_queries_do_not_grow_with_licences(self):
+        self.create_staged_licence(1)
+        with self.assertNumQueries(3):
+            self.render_staged_licences()
+
+        for index in range(2, 6):
+            self.create_staged_licence(index)
+        with self.assertNumQueries(3):
+            pages = self.render_staged_licences()
+
+        self.assertEqual(len(pages), 5)
+        self.assertIn('licence3@example.com', ''.join(pages))
@@ -1,12 +1,11 @@
 # foodlicence/views.py
 
-import io
-import os
+import tempfile
 from django.utils.timezone import now
 from django.core.mail import EmailMessage
 from django.conf import settings
 from django.template.loader import get_template, render_to_string
-from django.http import HttpResponseRedirect, HttpResponse, Http404
+from django.http import FileResponse, HttpResponseRedirect, HttpResponse, Http404
 from django.urls import reverse_lazy, reverse
 from django.template.response import TemplateResponse
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
@@ -14,16 +13,11 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.sites.shortcuts import get_current_site
 from django.core.exceptions import PermissionDenied
 from django_fsm import can_proceed
-from weasyprint import HTML, CSS
-from pypdf import PdfWriter, PdfReader
-from django.core.files.base import ContentFile
+from django.core.files import File
 from django.db.models import Q
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 
-from accounts.models import (
-    Profile
-)
 from registration.models import (
     StallRegistration,
     FoodRegistration
@@ -40,6 +34,9 @@ from .forms import (
     FoodLicenceBatchUpUpdateForm
 )
 
+from fairs.services.dashboard_metrics_cache import DashboardMetricsCache
+from foodlicence.services.foodlicence_pdf_service import FoodLicencePdfService
+from fairs.services.dashboard_statistics_service import DashboardStatisticsService
 from foodlicence.templatetags.hasfoodlicences_tag import get_number_staged_foodlicences
 
 def staged_licences_count_view(request):
@@ -50,63 +47,6 @@ def staged_licences_count_view(request):
     return TemplateResponse(request,"staged_licences_count.html", {"staged_count": staged_count})
 
 
-def generate_pdf(object, request):
-    # Get the current site domain
-    current_site = get_current_site(request)
-    domain = current_site.domain
-    protocol = 'https' if request.is_secure() else 'http'
-
-    # Check if the certificate file exists
-    certificate_url = None
-    if object.food_registration.food_registration_certificate:
-        certificate_url = f'{protocol}://{domain}{object.food_registration.food_registration_certificate.url}'
-
-    # Render a template to HTML
-    stall_registration = StallRegistration.objects.get(id=object.food_registration.registration.id)
-    stallholder_detail = Profile.objects.get(user=stall_registration.stallholder)
-
-    # Use render_to_string to render the template with context
-    context = {
-        'object': object,
-        'stallholder_detail': stallholder_detail,
-        'full_certificate_url': certificate_url,  # This will be None if no file exists
-    }
-    html_content = render_to_string('swdc_foodlicence.html', context)
-
-    css_file = os.path.join(settings.STATIC_ROOT, 'css', 'licence.css')
-
-    # Convert HTML to PDF
-    pdf_file = HTML(string=html_content).write_pdf(stylesheets=[CSS(filename=css_file)])
-
-    return pdf_file
-
-
-def merge_pdfs(pdf_files):
-    pdf_writer = PdfWriter()
-    current_page_number = 1
-
-    for pdf_file in pdf_files:
-        pdf_reader = PdfReader(io.BytesIO(pdf_file))
-        for page_num in range(len(pdf_reader.pages)):
-            page = pdf_reader.pages[page_num]
-            pdf_writer.add_page(page)
-
-            # Add page number (this part is theoretical; actual code may vary)
-            '''
-            annotation = FreeText(
-                text=f"Page {current_page_number}",
-                rect=(50, 550, 200, 650),
-            )
-            pdf_writer.add_annotation(
-                page_num, annotation=annotation
-            )
-            current_page_number += 1
-            '''
-    output = io.BytesIO()
-    pdf_writer.write(output)
-
-    return output.getvalue()
-
 def generate_combined_pdf(request):
     # Fetch selected objects
     selected_licences = FoodLicence.objects.filter(licence_status="Staged")  # Adjust filter as needed
@@ -114,11 +54,12 @@ def generate_combined_pdf(request):
     if not selected_licences.exists():
         return HttpResponse("No licences found.", content_type="text/plain")
 
-    # Generate PDFs for each object
-    pdf_files = [generate_pdf(obj, request) for obj in selected_licences]
+    licences = FoodLicencePdfService.prefetch_licences(selected_licences)
 
-    # Merge the PDFs
-    combined_pdf = merge_pdfs(pdf_files)
+    # Get the current site domain
+    current_site = get_current_site(request)
+    domain = current_site.domain
+    protocol = 'https' if request.is_secure() else 'http'
 
     # Retrieve recipient email from settings
     recipient_email = getattr(settings, 'SWDC_FOOD_LICENCE_EMAIL_ADDRESS')
@@ -129,7 +70,7 @@ def generate_combined_pdf(request):
         date_sent=now(),
         date_returned=None,
         date_closed=None,
-        batch_count=len(selected_licences)
+        batch_count=len(licences)
     )
     food_licence_batch.save()  # Save first to get the ID
 
@@ -142,8 +83,11 @@ def generate_combined_pdf(request):
     # Create the filename with batch ID and datetime
     filename = f'combined_{batch_id}_{current_datetime}.pdf'
 
-    # Save the PDF to the instance
-    food_licence_batch.pdf_file.save(filename, ContentFile(combined_pdf))
+    # Generate the licence PDFs, merge them and save the combined PDF to the instance
+    with tempfile.TemporaryFile() as combined_pdf:
+        FoodLicencePdfService.write_combined_pdf(licences, protocol, domain, combined_pdf)
+        combined_pdf.seek(0)
+        food_licence_batch.pdf_file.save(filename, File(combined_pdf, name=filename))
     food_licence_batch.save()
 
     # Update FoodLicence objects to reference the new batch
@@ -170,7 +114,8 @@ def generate_combined_pdf(request):
     email.content_subtype = 'html' # This makes the email render as HTML
 
     # Attach PDF
-    email.attach(filename, combined_pdf, 'application/pdf')
+    with food_licence_batch.pdf_file.open('rb') as combined_pdf:
+        email.attach(filename, combined_pdf.read(), 'application/pdf')
 
      # Try sending the email
     try:
@@ -185,12 +130,13 @@ def generate_combined_pdf(request):
             foodlicence.date_requested = now()
             foodlicence.save()
 
-    # Return the combined PDF as a response
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    response.write(combined_pdf)
-
-    return response
+    # Stream the combined PDF from storage as the response
+    return FileResponse(
+        food_licence_batch.pdf_file.open('rb'),
+        as_attachment=True,
+        filename=filename,
+        content_type='application/pdf'
+    )
 
 def mark_licence_as_staged(request, id):
     """
@@ -292,23 +238,11 @@ def foodlicence_dashboard_view(request):
     """
     Populate the Foodlicence Dashboard with counts of the various food licences statuses
     """
-    total_counts = FoodLicence.foodlicencecurrentmgr.count()
-    created_counts = FoodLicence.foodlicencecurrentmgr.get_created().count()
-    staged_counts = FoodLicence.foodlicencecurrentmgr.get_staged().count()
-    batched_counts = FoodLicence.foodlicencecurrentmgr.get_batched().count()
-    submitted_counts = FoodLicence.foodlicencecurrentmgr.get_submitted().count()
-    rejected_counts = FoodLicence.foodlicencecurrentmgr.get_rejected().count()
-    approved_counts = FoodLicence.foodlicencecurrentmgr.get_approved().count()
-
-    return TemplateResponse(request, 'dashboard_foodlicences.html', {
-        'total_counts': total_counts,
-        'created_counts': created_counts,
-        'staged_counts': staged_counts,
-        'batched_counts': batched_counts,
-        'submitted_counts': submitted_counts,
-        'rejected_counts': rejected_counts,
-        'approved_counts': approved_counts
-    })
+    foodlicence_counts = DashboardMetricsCache.get_or_compute(
+        DashboardMetricsCache.FOODLICENCES, None, DashboardStatisticsService.get_foodlicence_counts
+    )
+
+    return TemplateResponse(request, 'dashboard_foodlicences.html', foodlicence_counts)
 
 
 def foodlicence_listview(request):
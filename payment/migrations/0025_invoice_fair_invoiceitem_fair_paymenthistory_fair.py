@@ -0,0 +1,71 @@
+# Generated by Django 4.2.14 on 2026-10-18 11:05
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def populate_fair(apps, schema_editor):
+    """
+    Set the fair of every Invoice from its stall registration, then of every PaymentHistory and InvoiceItem from its
+    invoice, with one update per table
+    """
+    StallRegistration = apps.get_model('registration', 'StallRegistration')
+    Invoice = apps.get_model('payment', 'Invoice')
+    PaymentHistory = apps.get_model('payment', 'PaymentHistory')
+    InvoiceItem = apps.get_model('payment', 'InvoiceItem')
+    Invoice.objects.update(
+        fair_id=Subquery(StallRegistration.objects.filter(id=OuterRef('stall_registration_id')).values('fair_id')[:1])
+    )
+    invoice_fair = Subquery(Invoice.objects.filter(id=OuterRef('invoice_id')).values('fair_id')[:1])
+    PaymentHistory.objects.update(fair_id=invoice_fair)
+    InvoiceItem.objects.update(fair_id=invoice_fair)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fairs", "0082_siteallocation_fair"),
+        ("payment", "0024_alter_discountitem_options_alter_invoiceitem_options"),
+        ("registration", "0066_upload_to_year_directories"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="invoice",
+            name="fair",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="invoices",
+                to="fairs.fair",
+            ),
+        ),
+        migrations.AddField(
+            model_name="invoiceitem",
+            name="fair",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="invoice_items",
+                to="fairs.fair",
+            ),
+        ),
+        migrations.AddField(
+            model_name="paymenthistory",
+            name="fair",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="payment_histories",
+                to="fairs.fair",
+            ),
+        ),
+        migrations.RunPython(populate_fair, migrations.RunPython.noop),
+    ]
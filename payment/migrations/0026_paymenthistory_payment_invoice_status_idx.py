@@ -0,0 +1,17 @@
+# Generated by Django 4.2.14 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0025_invoice_fair_invoiceitem_fair_paymenthistory_fair'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paymenthistory',
+            index=models.Index(fields=['invoice', 'payment_status'], name='payment_invoice_status_idx'),
+        ),
+    ]
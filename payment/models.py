@@ -1,7 +1,6 @@
 # payment/models.py
 
 import decimal
-import datetime
 import logging
 from django.db import models
 from django.conf import settings
@@ -12,6 +11,7 @@ from django_fsm import FSMField, transition
 from accounts.models import CustomUser
 
 from fairs.models import (
+    Fair,
     InventoryItem,
     InventoryItemFair,
     SiteAllocation
@@ -21,11 +21,9 @@ from registration.models import (
     AdditionalSiteRequirement
 )
 
+from fairs.services.fair_context_service import FairContextService
 from registration.services.billing import RegistrationBillingService
 
-# Global Variables
-current_year = datetime.datetime.now().year
-next_year = current_year + 1
 db_logger = logging.getLogger('db')
 
 
@@ -50,7 +48,7 @@ class InvoiceCurrentManager(models.Manager):
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(stall_registration__fair__fair_year__in=[current_year, next_year], stall_registration__fair__is_activated=True )
+        return super().get_queryset().filter(fair_id__in=FairContextService.get().fair_ids)
 
     def get_registration_invoices(self, registration):
         return super().get_queryset().filter(stall_registration_id=registration)
@@ -73,6 +71,9 @@ class Invoice(models.Model):
     total_cost = models.DecimalField(blank=True, null=True, max_digits=8, decimal_places=2)
     gst_component = models.DecimalField(blank=True, null=True, max_digits=8, decimal_places=2)
     date_created = models.DateTimeField(auto_now_add=True)
+    # The fair of the stall registration, denormalised so the current managers need no joins
+    fair = models.ForeignKey(Fair, related_name='invoices', on_delete=models.CASCADE, editable=False, blank=True,
+                             null=True)
     objects = models.Manager()
     invoicecurrentmgr = InvoiceCurrentManager()
 
@@ -84,6 +85,11 @@ class Invoice(models.Model):
         verbose_name = "invoice"
         verbose_name_plural = "invoices"
 
+    def save(self, *args, **kwargs):
+        if self.fair_id is None:
+            self.fair_id = self.stall_registration.fair_id
+        super().save(*args, **kwargs)
+
     def generate_invoice_number(stallregistration_pk):
         """
         Used to Generate invoice number for a new invoice
@@ -144,7 +150,7 @@ class PaymentHistoryCurrentManager(models.Manager):
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(invoice__stall_registration__fair__fair_year__in=[current_year, next_year], invoice__stall_registration__fair__is_activated=True )
+        return super().get_queryset().filter(fair_id__in=FairContextService.get().fair_ids)
 
     def get_registration_payment_history(self, registration):
         return super().get_queryset().filter(invoice__stall_registration=registration).last()
@@ -227,6 +233,9 @@ class PaymentHistory(models.Model):
         blank=True,
         null=True
     )
+    # The fair of the invoice, denormalised so the current managers need no joins
+    fair = models.ForeignKey(Fair, related_name='payment_histories', on_delete=models.CASCADE, editable=False,
+                             blank=True, null=True)
     objects = models.Manager()
     paymenthistorymgr = PaymentHistoryManager()
     paymenthistorycurrentmgr = PaymentHistoryCurrentManager()
@@ -234,6 +243,14 @@ class PaymentHistory(models.Model):
     class Meta:
         verbose_name = "payment"
         verbose_name_plural = "payments"
+        indexes = [
+            models.Index(fields=['invoice', 'payment_status'], name='payment_invoice_status_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.fair_id is None:
+            self.fair_id = self.invoice.fair_id
+        super().save(*args, **kwargs)
 
     def total_paid(stall_registration):
         paid_total = PaymentHistory.objects.filter(invoice__stall_registration=stall_registration).aggregate(TOTAL=Sum(
@@ -279,15 +296,10 @@ class PaymentHistory(models.Model):
             
 class InvoiceItemCurrentManager(models.Manager):
     def get_queryset(self):
-        return super().get_queryset().filter(
-            invoice__stall_registration__fair__fair_year__in=[current_year, next_year],
-            invoice__stall_registration__fair__is_activated=True,
-        )
+        return super().get_queryset().filter(fair_id__in=FairContextService.get().fair_ids)
 
     def for_fair(self, fair):
-        return self.get_queryset().filter(
-            invoice__stall_registration__fair=fair
-        )
+        return self.get_queryset().filter(fair=fair)
 
     def for_registration(self, registration):
         return self.get_queryset().filter(
@@ -595,6 +607,9 @@ class InvoiceItem(models.Model):
     inventory_item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE)
     item_quantity = models.IntegerField(default=0, validators=[MinValueValidator(0), MaxValueValidator(9999), ], )
     item_cost = models.DecimalField(max_digits=8, decimal_places=2)
+    # The fair of the invoice, denormalised so the current managers need no joins
+    fair = models.ForeignKey(Fair, related_name='invoice_items', on_delete=models.CASCADE, editable=False,
+                             blank=True, null=True)
 
     objects = models.Manager()
     invoiceitemmgr = InvoiceItemManager()
@@ -605,6 +620,11 @@ class InvoiceItem(models.Model):
         verbose_name = "invoiceitem"
         verbose_name_plural = "invoiceitems"
 
+    def save(self, *args, **kwargs):
+        if self.fair_id is None:
+            self.fair_id = self.invoice.fair_id
+        super().save(*args, **kwargs)
+
 
 class DiscountItemManager(models.Manager):
     """
@@ -612,7 +632,7 @@ class DiscountItemManager(models.Manager):
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(stall_registration__fair__fair_year__in=[current_year, next_year], stall_registration__fair__is_activated=True)
+        return super().get_queryset().filter(stall_registration__fair_id__in=FairContextService.get().fair_ids)
 
     def get_registration_discount(self, registration):
         return super().get_queryset().filter(stall_registration=registration)
@@ -623,10 +643,7 @@ class DiscountItemManager(models.Manager):
 
 class DiscountCurrentItemManager(models.Manager):
     def get_queryset(self):
-        return super().get_queryset().filter(
-            stall_registration__fair__fair_year__in=[current_year, next_year],
-            stall_registration__fair__is_activated=True
-        )
+        return super().get_queryset().filter(stall_registration__fair_id__in=FairContextService.get().fair_ids)
 
 
 class DiscountItem(models.Model):
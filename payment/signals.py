@@ -0,0 +1,14 @@
+# payment/signals.py
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django_fsm.signals import post_transition
+from fairs.services.dashboard_metrics_cache import DashboardMetricsCache
+from .models import PaymentHistory
+
+
+@receiver(post_save, sender=PaymentHistory)
+@receiver(post_delete, sender=PaymentHistory)
+@receiver(post_transition, sender=PaymentHistory)
+def invalidate_payment_dashboard_metrics(sender, instance, **kwargs):
+    DashboardMetricsCache.invalidate_on_commit(DashboardMetricsCache.PAYMENTS)
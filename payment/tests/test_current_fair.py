@@ -0,0 +1,69 @@
+# payment/tests/test_current_fair.py
+
+from datetime import date, datetime
+
+from django.test import TestCase
+
+from accounts.models import CustomUser
+from fairs.models import Event, EventSite, Fair, InventoryItem, Site, SiteAllocation
+from fairs.services.fair_context_service import FairContextService
+from payment.models import Invoice, InvoiceItem, PaymentHistory
+from registration.models import StallRegistration
+
+
+class CurrentFairDenormalisationTest(TestCase):
+    def setUp(self):
+        year = datetime.now().year
+        self.stallholder = CustomUser.objects.create(username='current@example.com', email='current@example.com')
+        self.inventory_item = InventoryItem.objects.create(item_name='Current Test Item', item_description='Item')
+        self.current_fair = Fair.objects.create(
+            fair_name='Current Fair', fair_year=str(year), fair_description='Test fair', is_activated=True
+        )
+        self.past_fair = Fair.objects.create(
+            fair_name='Past Fair', fair_year=str(year - 2), fair_description='Test fair', is_activated=True
+        )
+
+    def create_invoice(self, fair):
+        registration = StallRegistration.objects.create(
+            fair=fair,
+            stallholder=self.stallholder,
+            stall_manager_name='Manager',
+            stall_description='Stall',
+            products_on_site='Products',
+            total_charge=0,
+        )
+        invoice = Invoice.objects.create(stall_registration=registration, stallholder=self.stallholder)
+        PaymentHistory.paymenthistorymgr.create_paymenthistory(invoice, 100)
+        InvoiceItem.objects.create(invoice=invoice, inventory_item=self.inventory_item, item_quantity=1, item_cost=10)
+        return invoice
+
+    def test_fair_is_copied_on_save(self):
+        invoice = self.create_invoice(self.current_fair)
+
+        self.assertEqual(invoice.fair, self.current_fair)
+        self.assertEqual(PaymentHistory.objects.get(invoice=invoice).fair, self.current_fair)
+        self.assertEqual(InvoiceItem.objects.get(invoice=invoice).fair, self.current_fair)
+
+        event = Event.objects.create(
+            event_name='Current Test Event', original_event_date=date.today(), event_description='Test event',
+            fair=self.current_fair,
+        )
+        allocation = SiteAllocation.objects.create(
+            stallholder=self.stallholder,
+            event_site=EventSite.objects.create(event=event, site=Site.objects.create(site_name='CF1')),
+        )
+        self.assertEqual(allocation.fair, self.current_fair)
+
+    def test_current_managers_filter_on_the_fair_alone(self):
+        current_invoice = self.create_invoice(self.current_fair)
+        self.create_invoice(self.past_fair)
+        FairContextService.get()
+
+        for queryset, expected in (
+            (Invoice.invoicecurrentmgr.all(), current_invoice),
+            (PaymentHistory.paymenthistorycurrentmgr.all(), PaymentHistory.objects.get(invoice=current_invoice)),
+            (InvoiceItem.invoiceitemcurrentmgr.all(), InvoiceItem.objects.get(invoice=current_invoice)),
+        ):
+            with self.assertNumQueries(1):
+                self.assertEqual([row.id for row in queryset], [expected.id])
+            self.assertNotIn('JOIN', str(queryset.query))
@@ -7,12 +7,10 @@ import logging
 import uuid  # For generating unique idempotency keys
 from django.views.decorators.csrf import csrf_exempt
 import decimal
-from weasyprint import HTML, CSS
 from django.urls import reverse_lazy, reverse
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required,permission_required
-from django.template.loader import get_template
 from django.http import HttpResponseRedirect, HttpResponse, Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.response import TemplateResponse
@@ -41,6 +39,9 @@ from fairs.models import (
     Site,
     Zone
 )
+from fairs.services.dashboard_metrics_cache import DashboardMetricsCache
+from fairs.services.dashboard_statistics_service import DashboardStatisticsService
+from reports.services.pdf_job_service import PdfJobService
 
 db_logger = logging.getLogger('db')
 
@@ -156,6 +157,14 @@ def stripe_webhook(request):
 
 
 def invoice_pdf_generation(request, id, seq):
+    get_object_or_404(Invoice, id=id, invoice_sequence=seq)
+    return PdfJobService.render_response(request, 'invoice', {'id': id, 'seq': seq}, 'MB_Fair_Invoice.pdf')
+
+
+def build_invoice_context(id, seq):
+    """
+    Build the invoice.html context for an invoice
+    """
     invoice = get_object_or_404(Invoice, id=id, invoice_sequence=seq)
     invoice_items = InvoiceItem.objects.filter(invoice=id)
     profile = get_object_or_404(Profile, user=invoice.stallholder)
@@ -187,11 +196,7 @@ def invoice_pdf_generation(request, id, seq):
         'amount_to_pay': amount_to_pay,
         'profile': profile
     }
-    html_template = get_template('invoice.html').render(context)
-    pdf_file = HTML(string=html_template, base_url=request.build_absolute_uri()).write_pdf()
-    response = HttpResponse(pdf_file, content_type='application/pdf')
-    response['Content-Disposition'] = 'filename="MB_Fair_Invoice.pdf"'
-    return response
+    return context
 
 
 def mark_payment_as_cancelled(request, id):
@@ -297,23 +302,11 @@ def payment_dashboard_view(request):
     """
     Populate the Payments Dashboard with counts of the various payment statuses
     """
-    total_counts = PaymentHistory.paymenthistorycurrentmgr.get_all_except_superceded().count()
-    pending_counts = PaymentHistory.paymenthistorycurrentmgr.get_pending().count()
-    cancelled_counts = PaymentHistory.paymenthistorycurrentmgr.get_cancelled().count()
-    completed_counts = PaymentHistory.paymenthistorycurrentmgr.get_completed().count()
-    credit_counts = PaymentHistory.paymenthistorycurrentmgr.get_credit().count()
-    failed_counts = PaymentHistory.paymenthistorycurrentmgr.get_failed().count()
-    reconciled_counts = PaymentHistory.paymenthistorycurrentmgr.get_reconciled().count()
-
-    return TemplateResponse(request, 'dashboards/dashboard_payments.html', {
-        'total_counts': total_counts,
-        'pending_counts': pending_counts,
-        'cancelled_counts': cancelled_counts,
-        'completed_counts': completed_counts,
-        'credit_counts': credit_counts,
-        'failed_counts': failed_counts,
-        'reconciled_counts': reconciled_counts
-    })
+    payment_counts = DashboardMetricsCache.get_or_compute(
+        DashboardMetricsCache.PAYMENTS, None, DashboardStatisticsService.get_payment_counts
+    )
+
+    return TemplateResponse(request, 'dashboards/dashboard_payments.html', payment_counts)
 
 
 def load_update_form(request, id):
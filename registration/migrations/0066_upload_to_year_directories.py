@@ -0,0 +1,25 @@
+# Generated by Django 4.2.14 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registration", "0065_stallregistration_date_updated"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="foodregistration",
+            name="food_registration_certificate",
+            field=models.FileField(
+                blank=True, null=True, upload_to="food_certificates/%Y"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="stallregistration",
+            name="vehicle_image",
+            field=models.ImageField(blank=True, null=True, upload_to="vehicles/%Y"),
+        ),
+    ]
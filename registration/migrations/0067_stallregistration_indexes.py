@@ -0,0 +1,33 @@
+# Generated by Django 4.2.14 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registration', '0066_upload_to_year_directories'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stallregistration',
+            index=models.Index(fields=['fair', 'booking_status'], name='stallreg_fair_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stallregistration',
+            index=models.Index(fields=['stallholder', 'fair'], name='stallreg_holder_fair_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stallregistration',
+            index=models.Index(fields=['date_updated'], name='stallreg_date_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stallregistration',
+            index=models.Index(
+                condition=models.Q(('booking_status', 'Booked')),
+                fields=['fair'],
+                name='stallreg_booked_fair_idx',
+            ),
+        ),
+    ]
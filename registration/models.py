@@ -1,6 +1,6 @@
 # registration/models.py
 
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 from django.db.models.enums import TextChoices
 from django.utils import timezone
@@ -17,11 +17,12 @@ from django_fsm import FSMField, transition
 
 from fairs.models import (
     Fair,
-    Event,
     InventoryItem
 )
 
 from fairs.querysets.passpack import PasspackManager
+from fairs.services.fair_context_service import FairContextService
+from fairs.services.fair_year_service import FairYearService
 
 
 import magic
@@ -29,8 +30,6 @@ import magic
 PERCENTAGE_VALIDATOR = [MinValueValidator(0), MaxValueValidator(100)]
 
 # Global Variables
-current_year = datetime.now().year
-next_year = current_year + 1
 
 class PowerSource(models.TextChoices):
     NONE = "none", "No electrical equipment"
@@ -175,7 +174,7 @@ class RegistrationCurrentAllManager(models.Manager):
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(fair__fair_year__in=[current_year, next_year],
+        return super().get_queryset().filter(fair__fair_year__in=FairYearService.get_current_years(),
                                              fair__is_activated=True)
 
 
@@ -185,7 +184,7 @@ class RegistrationCurrentManager(models.Manager):
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(fair__fair_year__in=[current_year, next_year],
+        return super().get_queryset().filter(fair__fair_year__in=FairYearService.get_current_years(),
                                              fair__is_activated=True).exclude(is_cancelled=True)
     def fair_power(self):
         # returns all registrations that have fair power
@@ -205,7 +204,7 @@ class RegistrationSellingFoodManager(models.Manager):
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(fair__fair_year__in=[current_year, next_year],
+        return super().get_queryset().filter(fair__fair_year__in=FairYearService.get_current_years(),
                                              fair__is_activated=True, selling_food=True)
 
 
@@ -215,7 +214,7 @@ class RegistrationCreatedManager(models.Manager):
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(fair__fair_year__in=[current_year, next_year],
+        return super().get_queryset().filter(fair__fair_year__in=FairYearService.get_current_years(),
                                              fair__is_activated=True, booking_status='Created')
 
 
@@ -225,7 +224,7 @@ class RegistrationSubmittedManager(models.Manager):
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(fair__fair_year__in=[current_year, next_year],
+        return super().get_queryset().filter(fair__fair_year__in=FairYearService.get_current_years(),
                                              fair__is_activated=True, booking_status='Submitted')
 
 
@@ -235,7 +234,7 @@ class RegistrationInvoicedManager(models.Manager):
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(fair__fair_year__in=[current_year, next_year],
+        return super().get_queryset().filter(fair__fair_year__in=FairYearService.get_current_years(),
                                              fair__is_activated=True, booking_status='Invoiced')
 
 class RegistrationPaymentCompleteManager(models.Manager):
@@ -244,7 +243,7 @@ class RegistrationPaymentCompleteManager(models.Manager):
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(fair__fair_year__in=[current_year, next_year],
+        return super().get_queryset().filter(fair__fair_year__in=FairYearService.get_current_years(),
                                              fair__is_activated=True, booking_status='Payment Completed')
 
 
@@ -254,7 +253,7 @@ class RegistrationBookedManager(models.Manager):
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(fair__fair_year__in=[current_year, next_year],
+        return super().get_queryset().filter(fair__fair_year__in=FairYearService.get_current_years(),
                                              fair__is_activated=True, booking_status='Booked')
 
 
@@ -264,7 +263,7 @@ class RegistrationCancelledManager(models.Manager):
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(fair__fair_year__in=[current_year, next_year],
+        return super().get_queryset().filter(fair__fair_year__in=FairYearService.get_current_years(),
                                              fair__is_activated=True, booking_status='Cancelled')
 
 
@@ -276,7 +275,7 @@ class RegistrationRecentlyCreatedManager(models.Manager):
         now = timezone.now()  # timezone-aware datetime
         since = now - timedelta(days=2)
         return super().get_queryset().filter(
-            fair__fair_year__in=[current_year, next_year],
+            fair__fair_year__in=FairYearService.get_current_years(),
             fair__is_activated=True,
             date_created__gte=since
         )
@@ -295,8 +294,6 @@ class RegistrationUpdatedWithinManager(models.Manager):
         - "month"     → last 30 days
         """
         now = timezone.now()
-        current_year = now.year
-        next_year = current_year + 1
 
         if period == "today":
             start = now.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -311,7 +308,7 @@ class RegistrationUpdatedWithinManager(models.Manager):
             super()
             .get_queryset()
             .filter(
-                fair__fair_year__in=[current_year, next_year],
+                fair__fair_year__in=FairYearService.get_current_years(),
                 fair__is_activated=True,
                 date_updated__gte=start,
             )
@@ -324,7 +321,7 @@ class RegistrationAmendedManager(models.Manager):
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(fair__fair_year__in=[current_year, next_year],
+        return super().get_queryset().filter(fair__fair_year__in=FairYearService.get_current_years(),
                                              fair__is_activated=True, booking_status='Amended')
 
 class RegistrationWaitlistedManager(models.Manager):
@@ -333,7 +330,7 @@ class RegistrationWaitlistedManager(models.Manager):
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(fair__fair_year__in=[current_year, next_year],
+        return super().get_queryset().filter(fair__fair_year__in=FairYearService.get_current_years(),
                                              fair__is_activated=True, booking_status='Waitlisted')
 
 
@@ -348,7 +345,7 @@ class VehiclesOnSiteManager(models.Manager):
     """
 
     def get_queryset(self):
-        current_fair = Fair.currentfairmgr.all().last()
+        current_fair = FairContextService.get_current_fair()
         return super().get_queryset().filter(fair=current_fair.id, vehicle_on_site=True)
 
     def has_size(self, registration_id):
@@ -370,7 +367,7 @@ class IsMultiSiteRegistrationManager(models.Manager):
     """
 
     def get_queryset(self):
-        current_fair = Fair.currentfairmgr.all().last()
+        current_fair = FairContextService.get_current_fair()
         return super().get_queryset().filter(fair=current_fair.id, multi_site=True)
 
     def filter_by_stallregistration(self, stallregistration_id):
@@ -452,7 +449,7 @@ class StallRegistration(models.Model):
     vehicle_on_site = models.BooleanField(default=False)
     vehicle_width = models.FloatField(default=0)
     vehicle_length = models.FloatField(default=0)
-    vehicle_image = models.ImageField(blank=True, null=True, upload_to='vehicles/' + str(current_year))
+    vehicle_image = models.ImageField(blank=True, null=True, upload_to='vehicles/%Y')
     multi_site = models.BooleanField(default=False)
     is_cancelled = models.BooleanField(default=False)
     is_invoiced = models.BooleanField(default=False)
@@ -495,6 +492,16 @@ class StallRegistration(models.Model):
     class Meta:
         verbose_name = "stallregistration"
         verbose_name_plural = "stallregistrations"
+        indexes = [
+            # Registration lists and dashboards filtered by booking status
+            models.Index(fields=['fair', 'booking_status'], name='stallreg_fair_status_idx'),
+            # A stallholder's registrations for a fair
+            models.Index(fields=['stallholder', 'fair'], name='stallreg_holder_fair_idx'),
+            # The recently updated registrations dashboard
+            models.Index(fields=['date_updated'], name='stallreg_date_updated_idx'),
+            # The reports and site history rollup read only the booked registrations
+            models.Index(fields=['fair'], condition=Q(booking_status='Booked'), name='stallreg_booked_fair_idx'),
+        ]
 
     def __str__(self):
         return str(self.booking_id)
@@ -696,7 +703,7 @@ class HasUnactionedCommentsManager(models.Manager):
     """
 
     def get_queryset(self):
-        current_fair = Fair.currentfairmgr.all().last()
+        current_fair = FairContextService.get_current_fair()
         return super().get_queryset().filter(fair=current_fair.id, is_done=False, is_archived=False)
 
     def filter_by_stallholder(self, stallholder_id):
@@ -769,7 +776,7 @@ class RegistrationComment(models.Model):
 class CertificateValidityManager(models.Manager):
 
     def get_queryset(self):
-        current_fair = Fair.currentfairmgr.all().last()
+        current_fair = FairContextService.get_current_fair()
         return super().get_queryset().filter(registration__fair=current_fair.id)
 
     def has_certificate(self, registration_id):
@@ -777,7 +784,7 @@ class CertificateValidityManager(models.Manager):
                                           food_registration_certificate__isnull=False).exists()
 
     def not_expiring(self, registration_id):
-        current_event = Event.currenteventfiltermgr.all().last()
+        current_event = FairContextService.get().last_event
         food_registration = self.get_queryset().filter(registration=registration_id)
         if current_event.postponement_event_date:
             return food_registration.filter(certificate_expiry_date__gt=current_event.postponement_event_date).exists()
@@ -798,7 +805,7 @@ class FoodRegistration(models.Model):
     food_display_method = models.TextField(blank=True, null=True)
     has_food_certificate = models.BooleanField(null=True, default=False)
     food_registration_certificate = models.FileField(blank=True, null=True,
-                                                     upload_to='food_certificates/' + str(current_year))
+                                                     upload_to='food_certificates/%Y')
     certificate_expiry_date = models.DateField(blank=True, null=True)
     food_fair_consumed = models.BooleanField(null=True, default=False)
     food_prep_equipment = models.ManyToManyField(
@@ -1,10 +1,10 @@
 # registration/templatetags/hasopenapplications_tags.py
 
 from django import template
-from fairs.models import Fair
+from fairs.services.fair_context_service import FairContextService
 
 register = template.Library()
 
 @register.simple_tag
 def has_open_applications():
-    return Fair.currentfairmgr.filter(is_open=True).exists()
\ No newline at end of file
+    return any(fair.is_open for fair in FairContextService.get().fairs)
@@ -38,10 +38,10 @@ from emails.forms import (
 )
 
 from fairs.models import (
-    Fair,
     SiteAllocation,
     InventoryItemFair
 )
+from fairs.services.fair_context_service import FairContextService
 from payment.models import (
     PaymentHistory,
     Invoice,
@@ -91,9 +91,6 @@ from registration.services.billing import RegistrationBillingService
 from registration.services.registration_update import build_update_context, update_registration
 from registration.controllers.convener_registration import ConvenerRegistrationController
 
-# Global Variables
-current_year = datetime.now().year
-next_year = current_year + 1
 db_logger = logging.getLogger('db')
 
 
@@ -375,7 +372,7 @@ def get_initial_registration_data(stallholder):
             siteallocation,
         )
 
-    current_fair = Fair.currentfairmgr.last()
+    current_fair = FairContextService.get_current_fair()
     return {"fair": current_fair.id}, None
 
 
@@ -481,7 +478,7 @@ def stall_registration_create(request):
     # -------------------------
     # Comments (display only)
     # -------------------------
-    current_fair = Fair.currentfairmgr.last()
+    current_fair = FairContextService.get_current_fair()
 
     comments = RegistrationComment.objects.filter(
         stallholder=stallholder.id,
@@ -808,7 +805,7 @@ def myfair_dashboard_view(request):
     commentform = RegistrationCommentForm(request.POST or None)
     replyform = CommentReplyForm(request.POST or None)
     # list of active parent comments
-    current_fair = Fair.currentfairmgr.all().last()
+    current_fair = FairContextService.get_current_fair()
     comments = RegistrationComment.objects.filter(stallholder=request.user, is_archived=False, convener_only_comment=False, comment_parent__isnull=True, fair=current_fair.id)
     try:
         # Use prefetch_related to bring through the site allocation data associated with the stall registration
@@ -859,7 +856,7 @@ def food_registration_create_view(request, pk):
     replyform = CommentReplyForm(request.POST or None)
     comment_filter_message = 'Showing current comments of the current fair'
     # list of active parent comments
-    current_fair = Fair.currentfairmgr.all().last()
+    current_fair = FairContextService.get_current_fair()
     comments = RegistrationComment.objects.filter(stallholder=request.user, is_archived=False,
                                                   convener_only_comment=False, comment_parent__isnull=True,
                                                   fair=current_fair.id)
@@ -907,7 +904,7 @@ def food_registration_update_view(request, id=None):
     commentfilterform = CommentFilterForm(request.POST or None)
     commentform = RegistrationCommentForm(request.POST or None)
     replyform = CommentReplyForm(request.POST or None)
-    current_fair = Fair.currentfairmgr.all().last()
+    current_fair = FairContextService.get_current_fair()
     comments = RegistrationComment.objects.filter(stallholder=request.user, is_archived=False,
                                                   convener_only_comment=False, comment_parent__isnull=True,
                                                   fair=current_fair.id)
@@ -1033,7 +1030,7 @@ def comments_view_add(request):
     commentfilterform = CommentFilterForm(request.POST or None)
     commentform = RegistrationCommentForm(request.POST or None)
     replyform = CommentReplyForm(request.POST or None)
-    current_fair = Fair.currentfairmgr.all().last()
+    current_fair = FairContextService.get_current_fair()
     if request.session.get('stallholder_id'):
         stallholder_id = request.session['stallholder_id']
         comments = RegistrationComment.objects.filter(stallholder=stallholder_id, is_archived=False,
@@ -1201,7 +1198,7 @@ def old_convener_stall_registration_detail_view(request, id):
     commentform = RegistrationCommentForm(request.POST or None)
     createstallholderemailform = CreateStallholderEmailForm(request.POST or None)
     replyform = CommentReplyForm(request.POST or None)
-    current_fair = Fair.currentfairmgr.all().last()
+    current_fair = FairContextService.get_current_fair()
     stall_registration = StallRegistration.objects.get(id=id)
 
     # Determine if there are any discounts, if so sum them and add it to the context
@@ -1314,7 +1311,7 @@ def stallholder_stall_registration_detail_view(request, id):
     commentfilterform = CommentFilterForm(request.POST or None)
     commentform = RegistrationCommentForm(request.POST or None)
     replyform = CommentReplyForm(request.POST or None)
-    current_fair = Fair.currentfairmgr.all().last()
+    current_fair = FairContextService.get_current_fair()
     stall_registration = StallRegistration.registrationcurrentallmgr.get(id=id)
 
      # Check if food_registration exists
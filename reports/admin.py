@@ -1,3 +1,12 @@
 from django.contrib import admin
 
-# Register your models here.
+from reports.models import PdfJob
+
+
+class PdfJobAdmin(admin.ModelAdmin):
+    list_display = ('report_name', 'filename', 'job_status', 'attempts', 'created_by', 'date_created', 'date_completed')
+    list_filter = ('job_status', 'report_name')
+    readonly_fields = ('uuid', 'date_created', 'date_started', 'date_completed')
+
+
+admin.site.register(PdfJob, PdfJobAdmin)
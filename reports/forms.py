@@ -21,7 +21,7 @@ class ReportListFilterForm(Form):
     """
 
     event = ModelChoiceField(
-        queryset=Event.currenteventfiltermgr.all(),
+        queryset=Event.objects.none(),
         empty_label='Show All',
         label='Event',
         required=False,
@@ -48,6 +48,10 @@ class ReportListFilterForm(Form):
     )
     form_purpose = forms.CharField(widget=forms.HiddenInput(), initial='filter')
 
+    def __init__(self, *args, **kwargs):
+        super(ReportListFilterForm, self).__init__(*args, **kwargs)
+        self.fields['event'].queryset = Event.currenteventfiltermgr.all()
+
     class Meta:
         fields = [
             'zone',
@@ -0,0 +1,85 @@
+# reports/management/commands/process_pdf_jobs.py
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from reports.services.pdf_job_service import PdfJobService
+from reports.services.pdf_renderer import write_pdf
+
+
+class Command(BaseCommand):
+    """
+    Worker that renders the queued PdfJobs. The report HTML is built in this process, the WeasyPrint layout is run
+    in a pool of worker processes and the finished PDFs are stored under MEDIA_ROOT.
+    Usage: python3 manage.py process_pdf_jobs [--workers 2] [--poll-interval 2] [--once]
+    """
+    help = 'Render queued PDF report jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'PDF_JOB_WORKERS', 2),
+            help='Number of WeasyPrint worker processes',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2,
+            help='Seconds to wait between polls of an empty queue',
+        )
+        parser.add_argument(
+            '--stall-timeout',
+            type=int,
+            default=600,
+            help='Seconds after which a Running job is treated as abandoned and queued again',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once the queue is empty rather than polling',
+        )
+
+    def handle(self, *args, **options):
+        purged = PdfJobService.purge_jobs(getattr(settings, 'PDF_JOB_RETENTION_DAYS', 7))
+        if purged:
+            self.stdout.write(self.style.SUCCESS(f'Purged {purged} expired PDF jobs'))
+
+        # Child processes must not inherit open database connections
+        connections.close_all()
+
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                requeued = PdfJobService.requeue_stalled_jobs(options['stall_timeout'])
+                if requeued:
+                    self.stdout.write(self.style.WARNING(f'Requeued {requeued} stalled PDF jobs'))
+
+                jobs = PdfJobService.claim_jobs(options['workers'])
+                if not jobs:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                futures = []
+                for job in jobs:
+                    try:
+                        html = PdfJobService.render_html(job.report_name, job.parameters)
+                    except Exception as e:
+                        PdfJobService.fail_job(job, e)
+                        self.stdout.write(self.style.ERROR(f'Failed {job.report_name} {job.uuid}: {e}'))
+                        continue
+                    cache_key = PdfJobService.get_cache_key(job.report_name, html, job.base_url)
+                    futures.append((job, cache_key, executor.submit(write_pdf, html, job.base_url)))
+
+                for job, cache_key, future in futures:
+                    try:
+                        PdfJobService.complete_job(job, future.result(), cache_key)
+                        self.stdout.write(self.style.SUCCESS(f'Rendered {job.report_name} {job.uuid}'))
+                    except Exception as e:
+                        PdfJobService.fail_job(job, e)
+                        self.stdout.write(self.style.ERROR(f'Failed {job.report_name} {job.uuid}: {e}'))
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.14 on 2026-10-18 23:01
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django_fsm
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PdfJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('report_name', models.CharField(max_length=100)),
+                ('parameters', models.JSONField(blank=True, default=dict)),
+                ('base_url', models.CharField(blank=True, max_length=255)),
+                ('filename', models.CharField(max_length=255)),
+                ('disposition', models.CharField(choices=[('inline', 'Inline'), ('attachment', 'Attachment')], default='inline', max_length=10)),
+                ('job_status', django_fsm.FSMField(choices=[('Queued', 'Queued'), ('Running', 'Running'), ('Completed', 'Completed'), ('Failed', 'Failed')], default='Queued', max_length=50, verbose_name='Job State')),
+                ('pdf_file', models.FileField(blank=True, null=True, upload_to='pdf_jobs/%Y/%m/')),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('date_started', models.DateTimeField(blank=True, null=True)),
+                ('date_completed', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pdf_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'pdfjob',
+                'verbose_name_plural': 'pdfjobs',
+                'indexes': [models.Index(fields=['job_status', 'date_created'], name='reports_pdf_job_sta_9fd6ae_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,104 @@
+# reports/models.py
+
+import uuid
+from django.conf import settings
 from django.db import models
+from django.utils.translation import gettext_lazy as _
+from django_fsm import FSMField, transition
+
+
+class PdfJobQueuedManager(models.Manager):
+    """
+    Queryset of PdfJobs waiting to be rendered, oldest first
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(job_status=PdfJob.QUEUED).order_by('date_created')
+
+
+class PdfJob(models.Model):
+    """
+    Description: A queued WeasyPrint render of one of the PDF reports, rendered by the process_pdf_jobs worker so
+    long renders do not tie up a web worker. The finished file is stored under MEDIA_ROOT.
+    """
+    QUEUED = 'Queued'
+    RUNNING = 'Running'
+    COMPLETED = 'Completed'
+    FAILED = 'Failed'
+
+    JOB_STATUS_CHOICES = [
+        (QUEUED, _('Queued')),
+        (RUNNING, _('Running')),
+        (COMPLETED, _('Completed')),
+        (FAILED, _('Failed')),
+    ]
+
+    INLINE = 'inline'
+    ATTACHMENT = 'attachment'
+
+    DISPOSITION_CHOICES = [
+        (INLINE, _('Inline')),
+        (ATTACHMENT, _('Attachment')),
+    ]
+
+    uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    report_name = models.CharField(max_length=100)
+    parameters = models.JSONField(default=dict, blank=True)
+    base_url = models.CharField(max_length=255, blank=True)
+    filename = models.CharField(max_length=255)
+    disposition = models.CharField(max_length=10, choices=DISPOSITION_CHOICES, default=INLINE)
+    job_status = FSMField(
+        default=QUEUED,
+        verbose_name='Job State',
+        choices=JOB_STATUS_CHOICES,
+        protected=False,
+    )
+    pdf_file = models.FileField(upload_to='pdf_jobs/%Y/%m/', blank=True, null=True)
+    error_message = models.TextField(blank=True, null=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name='pdf_jobs',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True
+    )
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_started = models.DateTimeField(blank=True, null=True)
+    date_completed = models.DateTimeField(blank=True, null=True)
+
+    objects = models.Manager()
+    queuedmgr = PdfJobQueuedManager()
+
+    class Meta:
+        verbose_name = "pdfjob"
+        verbose_name_plural = "pdfjobs"
+        indexes = [
+            models.Index(fields=['job_status', 'date_created']),
+        ]
+
+    def __str__(self):
+        return f"{self.report_name} ({self.job_status})"
+
+    @property
+    def is_finished(self):
+        return self.job_status in [self.COMPLETED, self.FAILED]
+
+    @transition(field=job_status, source=["Queued"], target="Running")
+    def to_job_status_running(self):
+        self.attempts += 1
+
+    @transition(field=job_status, source=["Running"], target="Completed")
+    def to_job_status_completed(self):
+        pass
+
+    @transition(field=job_status, source=["Running"], target="Failed")
+    def to_job_status_failed(self):
+        pass
 
-# Create your models here.
+    @transition(field=job_status, source=["Running", "Failed"], target="Queued")
+    def to_job_status_queued(self):
+        """
+            Moves a stalled or failed job back onto the queue for another attempt.
+        """
+        self.date_started = None
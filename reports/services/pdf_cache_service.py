@@ -0,0 +1,125 @@
+# reports/services/pdf_cache_service.py
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+
+class PdfCacheService:
+    """
+    Content addressed on disk cache of rendered PDF reports.
+
+    Provides:
+        - Cache keys hashed from the template name, rendered HTML, base URL and stylesheet mtimes
+        - Size bounded least recently used eviction
+        - FileResponses carrying a strong ETag, with 304 handling
+
+    The rendered HTML stands in for the template context, it captures exactly the context data the template uses.
+    Files are kept under MEDIA_ROOT/pdf_cache, a file's mtime is refreshed on every hit and is used as its last
+    access time for eviction.
+    """
+
+    CACHE_DIR = 'pdf_cache'
+
+    @classmethod
+    def get_cache_dir(cls):
+        return Path(settings.MEDIA_ROOT) / cls.CACHE_DIR
+
+    @staticmethod
+    def get_max_size():
+        return getattr(settings, 'PDF_CACHE_MAX_SIZE', 200 * 1024 * 1024)
+
+    @staticmethod
+    def get_stylesheet_mtime(path):
+        absolute_path = finders.find(path)
+        return os.path.getmtime(absolute_path) if absolute_path else 0
+
+    @classmethod
+    def get_key(cls, template_name, html, base_url, stylesheets=()):
+        digest = hashlib.sha256()
+        for part in (template_name, base_url, html):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        for stylesheet in stylesheets:
+            digest.update(f'{stylesheet}:{cls.get_stylesheet_mtime(stylesheet)}'.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    @classmethod
+    def get_path(cls, key):
+        return cls.get_cache_dir() / key[:2] / f'{key}.pdf'
+
+    @classmethod
+    def get(cls, key):
+        """
+        Returns the path of the cached PDF for key, or None on a miss
+        """
+        path = cls.get_path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    @classmethod
+    def put(cls, key, pdf_file):
+        """
+        Store the PDF bytes for key then evict the least recently used files over PDF_CACHE_MAX_SIZE
+        """
+        path = cls.get_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so a concurrent reader never sees a partial PDF
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix='.tmp', delete=False) as temp_file:
+            temp_file.write(pdf_file)
+        os.replace(temp_file.name, path)
+        cls.evict(keep=path)
+        return path
+
+    @classmethod
+    def evict(cls, keep=None):
+        """
+        Delete the least recently used PDFs until the cache is within PDF_CACHE_MAX_SIZE, keep is never evicted
+        """
+        cached_files = []
+        total_size = 0
+        for path in cls.get_cache_dir().glob('*/*.pdf'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            cached_files.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        max_size = cls.get_max_size()
+        for mtime, size, path in sorted(cached_files):
+            if total_size <= max_size:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total_size -= size
+
+    @staticmethod
+    def get_etag(key):
+        return f'"{key}"'
+
+    @classmethod
+    def serve(cls, request, key, path, filename, disposition):
+        """
+        Return the cached PDF, or 304 Not Modified when the client already holds this version
+        """
+        etag = cls.get_etag(key)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = FileResponse(open(path, 'rb'), content_type='application/pdf')
+        response['ETag'] = etag
+        # Revalidate on every use so a changed invoice or passpack is never served from the browser cache
+        patch_cache_control(response, private=True, no_cache=True)
+        response['Content-Disposition'] = f'{disposition}; filename="{filename}"'
+        return response
@@ -0,0 +1,215 @@
+# reports/services/pdf_job_service.py
+
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseRedirect
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from reports.models import PdfJob
+from reports.services.pdf_cache_service import PdfCacheService
+from reports.services.pdf_renderer import write_pdf
+
+db_logger = logging.getLogger('db')
+
+
+@dataclass(frozen=True)
+class PdfReport:
+    """
+    A PDF report that can be rendered by the PdfJob worker.
+
+    context_builder is the dotted path of a function that takes the job
+    parameters as keyword arguments and returns the template context.
+    Cacheable reports are kept in the PdfCacheService, stylesheets are the
+    static paths whose mtime forms part of the cache key.
+    """
+    template_name: str
+    context_builder: str
+    cacheable: bool = False
+    stylesheets: tuple = ()
+
+
+PDF_REPORTS = {
+    "marshall_zone_report": PdfReport(
+        "marshallingsitelist.html", "reports.views.build_marshall_zone_context"
+    ),
+    "trestle_distribution_report": PdfReport(
+        "trestlelist.html", "reports.views.build_trestle_distribution_context"
+    ),
+    "fair_passpack": PdfReport(
+        "passpack.html", "reports.views.build_fair_passpack_context",
+        cacheable=True, stylesheets=("css/reports.css",)
+    ),
+    "food_stall_site_report": PdfReport(
+        "foodstalllist.html", "reports.views.build_food_stall_site_context"
+    ),
+    "stall_search_report": PdfReport(
+        "searchstalllist.html", "reports.views.build_stall_search_context"
+    ),
+    "site_allocation_audit": PdfReport(
+        "site_allocation_audit_pdf.html", "reports.views.build_site_allocation_audit_context"
+    ),
+    "powerbox_allocation": PdfReport(
+        "powerboxes/powerbox_siteallocations_pdf.html", "fairs.views.build_powerbox_allocation_context"
+    ),
+    "invoice": PdfReport(
+        "invoice.html", "payment.views.build_invoice_context",
+        cacheable=True, stylesheets=("css/invoice.css",)
+    ),
+}
+
+
+class PdfJobService:
+    """
+    Renders the WeasyPrint reports, either inline or through the PdfJob queue.
+
+    Provides:
+        - The render entry point used by the PDF endpoints
+        - Queue operations used by the process_pdf_jobs worker
+    """
+
+    @staticmethod
+    def render_html(report_name, parameters):
+        """
+        Build the report context and render its template to HTML.
+        """
+        report = PDF_REPORTS[report_name]
+        build_context = import_string(report.context_builder)
+        return get_template(report.template_name).render(build_context(**parameters))
+
+    @classmethod
+    def render_response(cls, request, report_name, parameters, filename, disposition=PdfJob.INLINE,
+                        base_url=None):
+        """
+        Return the PDF for an endpoint. When PDF_JOB_QUEUE_ENABLED the render is queued and the user is redirected
+        to the htmx polled job status page, otherwise the PDF is rendered within the request.
+        Cacheable reports are served from the PdfCacheService when this version has already been rendered.
+        """
+        base_url = base_url or request.build_absolute_uri()
+        report = PDF_REPORTS[report_name]
+
+        if report.cacheable:
+            html = cls.render_html(report_name, parameters)
+            cache_key = cls.get_cache_key(report_name, html, base_url)
+            cached_path = PdfCacheService.get(cache_key)
+            if cached_path:
+                return PdfCacheService.serve(request, cache_key, cached_path, filename, disposition)
+
+        if getattr(settings, 'PDF_JOB_QUEUE_ENABLED', False):
+            job = cls.enqueue(
+                report_name,
+                parameters,
+                filename,
+                base_url,
+                disposition,
+                user=request.user if request.user.is_authenticated else None,
+            )
+            return HttpResponseRedirect(reverse('reports:pdf-job-status', args=[job.uuid]))
+
+        if report.cacheable:
+            cached_path = PdfCacheService.put(cache_key, write_pdf(html, base_url))
+            return PdfCacheService.serve(request, cache_key, cached_path, filename, disposition)
+
+        pdf_file = write_pdf(cls.render_html(report_name, parameters), base_url)
+        response = HttpResponse(pdf_file, content_type='application/pdf')
+        response['Content-Disposition'] = f'{disposition}; filename="{filename}"'
+        return response
+
+    @staticmethod
+    def get_cache_key(report_name, html, base_url):
+        """
+        Returns the PdfCacheService key of a cacheable report, or None
+        """
+        report = PDF_REPORTS[report_name]
+        if not report.cacheable:
+            return None
+        return PdfCacheService.get_key(report.template_name, html, base_url, report.stylesheets)
+
+    @staticmethod
+    def enqueue(report_name, parameters, filename, base_url, disposition=PdfJob.INLINE, user=None):
+        if report_name not in PDF_REPORTS:
+            raise ValueError(f"Unknown PDF report: {report_name}")
+        return PdfJob.objects.create(
+            report_name=report_name,
+            parameters=parameters,
+            filename=filename,
+            base_url=base_url,
+            disposition=disposition,
+            created_by=user,
+        )
+
+    @staticmethod
+    def claim_jobs(limit):
+        """
+        Move up to limit queued jobs to Running. Rows locked by another worker are skipped so several workers
+        can drain the queue at once.
+        """
+        with transaction.atomic():
+            jobs = list(PdfJob.queuedmgr.select_for_update(skip_locked=True)[:limit])
+            for job in jobs:
+                job.to_job_status_running()
+                job.date_started = timezone.now()
+                job.save(update_fields=['job_status', 'attempts', 'date_started'])
+        return jobs
+
+    @staticmethod
+    def complete_job(job, pdf_file, cache_key=None):
+        if cache_key:
+            PdfCacheService.put(cache_key, pdf_file)
+        job.pdf_file.save(f'{job.uuid}.pdf', ContentFile(pdf_file), save=False)
+        job.to_job_status_completed()
+        job.date_completed = timezone.now()
+        job.error_message = None
+        job.save()
+
+    @staticmethod
+    def fail_job(job, error):
+        """
+        Record a render failure, the job is queued again until it has used PDF_JOB_MAX_ATTEMPTS.
+        """
+        job.error_message = str(error)
+        if job.attempts < getattr(settings, 'PDF_JOB_MAX_ATTEMPTS', 3):
+            job.to_job_status_queued()
+        else:
+            job.to_job_status_failed()
+            job.date_completed = timezone.now()
+            db_logger.error('PDF job ' + str(job.uuid) + ' for ' + job.report_name + ' failed. ' + str(error),
+                            extra={'custom_category': 'PDF Jobs'})
+        job.save()
+
+    @classmethod
+    def requeue_stalled_jobs(cls, timeout):
+        """
+        Return jobs left Running longer than timeout seconds, e.g. by a killed worker, to the queue.
+        """
+        stalled = PdfJob.objects.filter(
+            job_status=PdfJob.RUNNING,
+            date_started__lt=timezone.now() - timedelta(seconds=timeout),
+        )
+        for job in stalled:
+            cls.fail_job(job, 'Render did not finish within ' + str(timeout) + ' seconds')
+        return len(stalled)
+
+    @staticmethod
+    def purge_jobs(days):
+        """
+        Delete finished jobs, and their files, older than days.
+        """
+        expired = PdfJob.objects.filter(
+            job_status__in=[PdfJob.COMPLETED, PdfJob.FAILED],
+            date_created__lt=timezone.now() - timedelta(days=days),
+        )
+        count = 0
+        for job in expired:
+            if job.pdf_file:
+                job.pdf_file.delete(save=False)
+            job.delete()
+            count += 1
+        return count
@@ -0,0 +1,25 @@
+# reports/services/pdf_renderer.py
+
+from weasyprint import CSS, HTML
+
+from CustomDBLogger.request_metrics import timed
+
+
+def write_pdf(html, base_url):
+    """
+    Lay out rendered report HTML with WeasyPrint and return the PDF bytes.
+
+    Kept free of Django model imports so the PdfJob worker can run it in a child process.
+    """
+    with timed('pdf'):
+        return HTML(string=html, base_url=base_url).write_pdf()
+
+
+def write_pdf_file(html, target, stylesheets=()):
+    """
+    Lay out rendered HTML with WeasyPrint, applying the stylesheet files, and write the PDF to the target path.
+    Returns the target so pooled callers can match results to their inputs.
+    """
+    with timed('pdf'):
+        HTML(string=html).write_pdf(target=target, stylesheets=[CSS(filename=stylesheet) for stylesheet in stylesheets])
+    return target
@@ -1,15 +1,16 @@
-from django.db.models import Count, Max
-
 from fairs.models import (
     SiteAllocation,
     SiteHistory,
+    SiteTenure,
 )
 
 
 class SiteAllocationAuditService:
     """
     Produces a report showing sites that have changed hands
-    compared with the most recent historical occupant.
+    compared with the most recent historical occupant. The
+    latest occupant of each site is read with one row per site
+    and the years held from the SiteTenure summary.
 
     One row per site.
     """
@@ -35,9 +36,13 @@ class SiteAllocationAuditService:
         #
         # Build lookup tables
         #
-        latest_history_lookup = cls._build_latest_history_lookup()
-        years_held_lookup = cls._build_years_held_lookup()
-        last_occupied_lookup = cls._build_last_occupied_lookup()
+        allocated_site_ids = allocations.values("event_site__site_id")
+        latest_history_lookup = cls._build_latest_history_lookup(
+            allocated_site_ids
+        )
+        tenure_lookup = cls._build_tenure_lookup(
+            allocated_site_ids
+        )
 
         #
         # Prevent duplicate rows caused by multiple events
@@ -58,23 +63,26 @@ class SiteAllocationAuditService:
             if previous_history is None:
                 continue
 
-            current_holder_last_year = (
-                last_occupied_lookup.get(
-                    (
-                        site.id,
-                        allocation.stallholder_id,
-                    )
-                )
-            )
-
             if previous_history.stallholder_id == allocation.stallholder_id:
                 continue
 
-            years_held = years_held_lookup.get(
-                (site.id, allocation.stallholder_id),
-                0,
+            current_holder_tenure = tenure_lookup.get(
+                (
+                    site.id,
+                    allocation.stallholder_id,
+                )
             )
 
+            #
+            # The current holder may have shared the site in
+            # its latest year
+            #
+            if (
+                current_holder_tenure is not None
+                and current_holder_tenure.last_year == previous_history.year
+            ):
+                continue
+
             rows.append(
                 {
                     "zone_name": (
@@ -89,8 +97,16 @@ class SiteAllocationAuditService:
                         else ""
                     ),
                     "current_stallholder_id": allocation.stallholder_id,
-                    "last_year_occupied": current_holder_last_year,
-                    "count_years_occupied": years_held,
+                    "last_year_occupied": (
+                        current_holder_tenure.last_year
+                        if current_holder_tenure
+                        else None
+                    ),
+                    "count_years_occupied": (
+                        current_holder_tenure.years_held
+                        if current_holder_tenure
+                        else 0
+                    ),
                     "previous_stallholder_id": previous_history.stallholder_id,
                 }
             )
@@ -98,7 +114,7 @@ class SiteAllocationAuditService:
         return rows
 
     @staticmethod
-    def _build_latest_history_lookup():
+    def _build_latest_history_lookup(site_ids):
         """
         Returns:
 
@@ -107,108 +123,56 @@ class SiteAllocationAuditService:
         }
 
         containing only the most recent SiteHistory
-        record for each site.
+        record of each allocated site.
         """
 
-        latest_years = (
-            SiteHistory.objects
-            .values("site_id")
-            .annotate(
-                latest_year=Max("year")
-            )
-        )
-
-        latest_lookup = {}
-
-        #
-        # Build quick lookup:
-        # {site_id: latest_year}
-        #
-        site_year_lookup = {
-            row["site_id"]: row["latest_year"]
-            for row in latest_years
-        }
-
         histories = (
-            SiteHistory.objects
-            .select_related(
-                "stallholder",
-                "site",
+            SiteHistory.histories
+            .filter(
+                site_id__in=site_ids
             )
-        )
-
-        for history in histories:
-
-            if (
-                site_year_lookup.get(history.site_id)
-                == history.year
-            ):
-                latest_lookup[history.site_id] = history
-
-        return latest_lookup
-
-    @staticmethod
-    def _build_years_held_lookup():
-        """
-        Returns:
-
-        {
-            (site_id, stallholder_id): years_held
-        }
-
-        Years held is based on distinct years rather than
-        SiteHistory records, since there may be multiple
-        events per year.
-        """
-
-        history_counts = (
-            SiteHistory.objects
-            .values(
+            .only(
                 "site_id",
                 "stallholder_id",
+                "year",
             )
-            .annotate(
-                year_count=Count(
-                    "year",
-                    distinct=True,
-                )
-            )
+            .latest_per_site()
         )
 
         return {
-            (
-                row["site_id"],
-                row["stallholder_id"],
-            ): row["year_count"]
-            for row in history_counts
+            history.site_id: history
+            for history in histories
         }
 
-
     @staticmethod
-    def _build_last_occupied_lookup():
+    def _build_tenure_lookup(site_ids):
         """
         Returns:
 
         {
-            (site_id, stallholder_id): latest_year
+            (site_id, stallholder_id): SiteTenure
         }
+
+        containing only the tenures of the allocated sites.
         """
 
-        records = (
-            SiteHistory.objects
-            .values(
+        tenures = (
+            SiteTenure.objects
+            .filter(
+                site_id__in=site_ids
+            )
+            .only(
                 "site_id",
                 "stallholder_id",
-            )
-            .annotate(
-                last_year=Max("year")
+                "years_held",
+                "last_year",
             )
         )
 
         return {
             (
-                row["site_id"],
-                row["stallholder_id"],
-            ): row["last_year"]
-            for row in records
-        }
\ No newline at end of file
+                tenure.site_id,
+                tenure.stallholder_id,
+            ): tenure
+            for tenure in tenures
+        }
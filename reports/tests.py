@@ -1,3 +1,100 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from reports.models import PdfJob
+from reports.services.pdf_cache_service import PdfCacheService
+from reports.services.pdf_job_service import PdfJobService
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, PDF_JOB_MAX_ATTEMPTS=2)
+class PdfJobServiceTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def enqueue(self):
+        return PdfJobService.enqueue(
+            'trestle_distribution_report', {'event': 1}, 'trestles.pdf', 'http://testserver/'
+        )
+
+    def test_unknown_report_is_rejected(self):
+        with self.assertRaises(ValueError):
+            PdfJobService.enqueue('no_such_report', {}, 'report.pdf', 'http://testserver/')
+
+    def test_claim_and_complete_job(self):
+        job = self.enqueue()
+
+        claimed = PdfJobService.claim_jobs(5)
+        self.assertEqual(claimed, [job])
+        self.assertEqual(claimed[0].job_status, PdfJob.RUNNING)
+        self.assertEqual(claimed[0].attempts, 1)
+        self.assertEqual(PdfJobService.claim_jobs(5), [])
+
+        PdfJobService.complete_job(claimed[0], b'%PDF-1.7')
+        job.refresh_from_db()
+        self.assertEqual(job.job_status, PdfJob.COMPLETED)
+        with job.pdf_file.open('rb') as pdf_file:
+            self.assertEqual(pdf_file.read(), b'%PDF-1.7')
+
+    def test_failed_job_is_retried_until_max_attempts(self):
+        self.enqueue()
+
+        job = PdfJobService.claim_jobs(1)[0]
+        PdfJobService.fail_job(job, 'render error')
+        self.assertEqual(job.job_status, PdfJob.QUEUED)
+
+        job = PdfJobService.claim_jobs(1)[0]
+        PdfJobService.fail_job(job, 'render error')
+        job.refresh_from_db()
+        self.assertEqual(job.job_status, PdfJob.FAILED)
+        self.assertEqual(job.error_message, 'render error')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, PDF_CACHE_MAX_SIZE=20)
+class PdfCacheServiceTest(SimpleTestCase):
+    def setUp(self):
+        shutil.rmtree(PdfCacheService.get_cache_dir(), ignore_errors=True)
+
+    def test_key_changes_with_content(self):
+        key = PdfCacheService.get_key('invoice.html', '<p>Invoice 1</p>', 'http://testserver/')
+        self.assertEqual(key, PdfCacheService.get_key('invoice.html', '<p>Invoice 1</p>', 'http://testserver/'))
+        self.assertNotEqual(key, PdfCacheService.get_key('invoice.html', '<p>Invoice 2</p>', 'http://testserver/'))
+        self.assertNotEqual(key, PdfCacheService.get_key('passpack.html', '<p>Invoice 1</p>', 'http://testserver/'))
+
+    def test_put_and_get(self):
+        self.assertIsNone(PdfCacheService.get('a' * 64))
+        PdfCacheService.put('a' * 64, b'%PDF-1.7')
+        with open(PdfCacheService.get('a' * 64), 'rb') as pdf_file:
+            self.assertEqual(pdf_file.read(), b'%PDF-1.7')
+
+    def test_least_recently_used_are_evicted(self):
+        PdfCacheService.put('a' * 64, b'0123456789')
+        os.utime(PdfCacheService.get_path('a' * 64), (1, 1))
+        PdfCacheService.put('b' * 64, b'0123456789')
+        os.utime(PdfCacheService.get_path('b' * 64), (2, 2))
+        PdfCacheService.get('a' * 64)
+
+        PdfCacheService.put('c' * 64, b'0123456789')
+
+        self.assertIsNotNone(PdfCacheService.get('a' * 64))
+        self.assertIsNone(PdfCacheService.get('b' * 64))
+        self.assertIsNotNone(PdfCacheService.get('c' * 64))
+
+    def test_serve_not_modified(self):
+        key = 'a' * 64
+        path = PdfCacheService.put(key, b'%PDF-1.7')
+
+        request = RequestFactory().get('/', HTTP_IF_NONE_MATCH=PdfCacheService.get_etag(key))
+        response = PdfCacheService.serve(request, key, path, 'invoice.pdf', PdfJob.INLINE)
+        self.assertEqual(response.status_code, 304)
+
+        response = PdfCacheService.serve(RequestFactory().get('/'), key, path, 'invoice.pdf', PdfJob.INLINE)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], f'"{key}"')
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.7')
@@ -11,6 +11,8 @@ from reports.views import (
     site_allocation_audit_report,
     export_site_allocation_audit_pdf,
     export_site_allocation_audit_csv,
+    pdf_job_status,
+    pdf_job_download,
 )
 
 
@@ -25,4 +27,6 @@ urlpatterns = [
     path('reports/site-allocations-review-list/', site_allocation_audit_report, name='site-allocation-audit-report'),
     path('reports/site-allocations-audit-pdf/', export_site_allocation_audit_pdf, name='site-allocation-audit-pdf'),
     path('reports/site-allocations-audit-csv/', export_site_allocation_audit_csv, name='site-allocation-audit-csv'),
+    path('reports/pdf-jobs/<uuid:uuid>/', pdf_job_status, name='pdf-job-status'),
+    path('reports/pdf-jobs/<uuid:uuid>/download/', pdf_job_download, name='pdf-job-download'),
 ]
@@ -4,11 +4,9 @@ import csv
 from django.shortcuts import get_object_or_404, render
 from django.db.models import F, Q, Subquery, OuterRef, Value, Count
 from django.db.models.functions import Coalesce
-from weasyprint import HTML
 from django.contrib.sites.shortcuts import get_current_site
-from django.template.loader import get_template, render_to_string
 from django.template.response import TemplateResponse
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse
 from django.db.models import Max, Case, When, Value, IntegerField, BooleanField
 from django.contrib.postgres.aggregates import StringAgg  # PostgreSQL only
 from django.urls import reverse
@@ -25,16 +23,18 @@ from accounts.models import (
 
 from fairs.models import (
     Event,
-    Fair,
     PowerBox,
     SiteHistory,
     Zone,
     ZoneMap
 )
+from fairs.services.fair_context_service import FairContextService
 
 from registration.models import(
     StallRegistration
 )
+from .models import PdfJob
+from .services.pdf_job_service import PdfJobService
 from .services.site_allocation_audit_service import (
     SiteAllocationAuditService
 )
@@ -198,14 +198,8 @@ def site_allocation_numbers_report(request, event):
     """
     Function to generate a site allocation numbers report for an Event plus a breakdown of allocations by Zone.
     """
-    current_fair = Fair.currentfairmgr.all().last()
     event_data = Event.objects.get(id=event)
 
-    # Precompute the first and second events for the current fair
-    event_query = Event.currenteventfiltermgr.annotate_event_sequence()
-    first_event = event_query.first()
-    second_event = event_query[1] if event_query.count() > 1 else None
-
     # Base queryset for StallRegistration
     site_information = StallRegistration.registrationcurrentallmgr.filter(
         site_allocation__event_site__event=event_data
@@ -259,18 +253,25 @@ def marshall_zone_report(request, zone, event):
     """
     Function to generate a marshall report for a specific Zone and Event
     """
-    current_fair = Fair.currentfairmgr.all().last()
-    zone_data = Zone.objects.get(id=zone)
     event_data = Event.objects.get(id=event)
+    filename= f'marshalls_{event_data.event_name}_report.pdf'
+    return PdfJobService.render_response(
+        request, 'marshall_zone_report', {'zone': zone, 'event': event}, filename
+    )
 
-    # Precompute the first and second events for the current fair
-    event_query = Event.currenteventfiltermgr.annotate_event_sequence()
 
-    # Get the first and second events
-    first_event = event_query.first()
-    second_event = event_query[1] if event_query.count() > 1 else None
-    if event_query.count() <= 1:
-        second_event = None
+def build_marshall_zone_context(zone, event):
+    """
+    Build the marshallingsitelist.html context for a specific Zone and Event
+    """
+    fair_context = FairContextService.get()
+    current_fair = fair_context.fair
+    zone_data = Zone.objects.get(id=zone)
+    event_data = Event.objects.get(id=event)
+
+    # The first and second events of the current fair in date order
+    first_event = fair_context.first_event
+    second_event = fair_context.second_event
 
     # Subquery to fetch the `is_skipped` value from SiteHistory
     site_history_subquery = SiteHistory.objects.filter(
@@ -353,20 +354,23 @@ def marshall_zone_report(request, zone, event):
         'zone_data': zone_data,
         'event_data': event_data
     }
+    return context
 
-    filename= f'marshalls_{event_data.event_name}_report.pdf'
-
-    html_template = get_template('marshallingsitelist.html').render(context)
-    pdf_file = HTML(string=html_template, base_url=request.build_absolute_uri()).write_pdf()
-    response = HttpResponse(pdf_file, content_type='application/pdf')
-    response['Content-Disposition'] = f'filename="{filename}"'
-    return response
 
 def trestle_distribution_report(request, event):
     """
     Function to generate a trestle distribution report for a specific Event
     """
-    current_fair = Fair.currentfairmgr.all().last()
+    event_data = Event.objects.get(id=event)
+    filename= f'trestle_distribution_{event_data.event_name}_report.pdf'
+    return PdfJobService.render_response(request, 'trestle_distribution_report', {'event': event}, filename)
+
+
+def build_trestle_distribution_context(event):
+    """
+    Build the trestlelist.html context for a specific Event
+    """
+    current_fair = FairContextService.get_current_fair()
     event_data = Event.objects.get(id=event)
     # Queryset for StallRegistration
     site_information = StallRegistration.registrationcurrentallmgr.filter(
@@ -392,13 +396,7 @@ def trestle_distribution_report(request, event):
         'event_data': event_data
     }
 
-    filename= f'trestle_distribution_{event_data.event_name}_report.pdf'
-
-    html_template = get_template('trestlelist.html').render(context)
-    pdf_file = HTML(string=html_template, base_url=request.build_absolute_uri()).write_pdf()
-    response = HttpResponse(pdf_file, content_type='application/pdf')
-    response['Content-Disposition'] = f'filename="{filename}"'
-    return response
+    return context
 
 
 
@@ -407,10 +405,33 @@ def fair_passpack_generator(request, stallregistration):
     """
     Generate a fair passpack PDF for a stallregistration
     """
+    stall_registration = get_object_or_404(
+        StallRegistration,
+        id=stallregistration
+    )
+    get_object_or_404(
+        Profile,
+        user=stall_registration.stallholder
+    )
+
+    current_site = get_current_site(request)
+    parameters = {
+        'stallregistration': stallregistration,
+        'protocol': 'https' if request.is_secure() else 'http',
+        'domain': current_site.domain,
+    }
+    filename = f"fair_passpack_for_stallregid{stallregistration}.pdf"
+    return PdfJobService.render_response(request, 'fair_passpack', parameters, filename)
+
+
+def build_fair_passpack_context(stallregistration, protocol, domain):
+    """
+    Build the passpack.html context for a stallregistration, zone map URLs are built from protocol and domain
+    """
 
     report_date = datetime.datetime.now()
 
-    current_fair = Fair.currentfairmgr.last()
+    current_fair = FairContextService.get_current_fair()
 
     # ✅ fetch registration object
     stall_registration = get_object_or_404(
@@ -443,10 +464,6 @@ def fair_passpack_generator(request, stallregistration):
     # -----------------------------
     # Build zone map URLs
     # -----------------------------
-    current_site = get_current_site(request)
-    domain = current_site.domain
-    protocol = 'https' if request.is_secure() else 'http'
-
     for site in site_list:
         if site["zone_map_path"]:
             site["zone_map_url"] = (
@@ -485,22 +502,7 @@ def fair_passpack_generator(request, stallregistration):
             if current_event_site else None,
     }
 
-    # -----------------------------
-    # Render PDF
-    # -----------------------------
-    filename = f"fair_passpack_for_stallregid{stallregistration}.pdf"
-
-    html_template = get_template("passpack.html").render(context)
-
-    pdf_file = HTML(
-        string=html_template,
-        base_url=request.build_absolute_uri()
-    ).write_pdf()
-
-    response = HttpResponse(pdf_file, content_type="application/pdf")
-    response["Content-Disposition"] = f'inline; filename="{filename}"'
-
-    return response
+    return context
 
 
 
@@ -509,7 +511,16 @@ def food_stall_site_report(request, event):
     Report to produce a listing of the food stallholders and their site for a specific fair event.
     Required the event to be selected
     """
-    current_fair = Fair.currentfairmgr.all().last()
+    event_data = Event.objects.get(id=event)
+    filename= f'food_stall_{event_data.event_name}_report.pdf'
+    return PdfJobService.render_response(request, 'food_stall_site_report', {'event': event}, filename)
+
+
+def build_food_stall_site_context(event):
+    """
+    Build the foodstalllist.html context for a specific fair event
+    """
+    current_fair = FairContextService.get_current_fair()
     event_data = Event.objects.get(id=event)
     # Queryset for StallRegistration
     site_information = StallRegistration.registrationcurrentallmgr.filter(
@@ -536,13 +547,8 @@ def food_stall_site_report(request, event):
         'event_data': event_data
     }
 
-    filename= f'food_stall_{event_data.event_name}_report.pdf'
+    return context
 
-    html_template = get_template('foodstalllist.html').render(context)
-    pdf_file = HTML(string=html_template, base_url=request.build_absolute_uri()).write_pdf()
-    response = HttpResponse(pdf_file, content_type='application/pdf')
-    response['Content-Disposition'] = f'filename="{filename}"'
-    return response
 
 def stall_search_report(request, event):
     """
@@ -550,7 +556,16 @@ def stall_search_report(request, event):
     The purpose of the report is for finding sites at the Fair Information Kiosk
     Required the event to be selected
     """
-    current_fair = Fair.currentfairmgr.all().last()
+    event_data = Event.objects.get(id=event)
+    filename= f'stall_search_{event_data.event_name}_report.pdf'
+    return PdfJobService.render_response(request, 'stall_search_report', {'event': event}, filename)
+
+
+def build_stall_search_context(event):
+    """
+    Build the searchstalllist.html context for a specific fair event
+    """
+    current_fair = FairContextService.get_current_fair()
     event_data = Event.objects.get(id=event)
     # Queryset for StallRegistration
     site_information = StallRegistration.registrationcurrentallmgr.filter(
@@ -581,13 +596,7 @@ def stall_search_report(request, event):
         'event_data': event_data
     }
 
-    filename= f'stall_search_{event_data.event_name}_report.pdf'
-
-    html_template = get_template('searchstalllist.html').render(context)
-    pdf_file = HTML(string=html_template, base_url=request.build_absolute_uri()).write_pdf()
-    response = HttpResponse(pdf_file, content_type='application/pdf')
-    response['Content-Disposition'] = f'filename="{filename}"'
-    return response
+    return context
 
 
 
@@ -596,7 +605,7 @@ def stall_search_csv_report(request, event):
     """
     Export the stall search data as a CSV report.
     """
-    current_fair = Fair.currentfairmgr.all().last()
+    current_fair = FairContextService.get_current_fair()
     event_data = Event.objects.get(id=event)
 
     # Queryset for StallRegistration
@@ -652,7 +661,7 @@ def stall_search_csv_report(request, event):
 
 def stall_validation_report(request):
     # Get the current fair
-    current_fair = Fair.currentfairmgr.all().last()
+    current_fair = FairContextService.get_current_fair()
 
     # Validation 1: Find Booked Stall registrations with no sites allocated
     unallocated_stalls = StallRegistration.registrationcurrentallmgr.filter(
@@ -758,27 +767,50 @@ def export_site_allocation_audit_csv(request):
 
 def export_site_allocation_audit_pdf(request):
 
+    return PdfJobService.render_response(
+        request,
+        'site_allocation_audit',
+        {},
+        'site-allocation-audit.pdf',
+        disposition=PdfJob.ATTACHMENT,
+        base_url=request.build_absolute_uri("/"),
+    )
+
+
+def build_site_allocation_audit_context():
+
     rows = SiteAllocationAuditService.get_changed_allocations()
 
-    html = render_to_string(
-        "site_allocation_audit_pdf.html",
-        {
-            "rows": rows,
-        }
-    )
+    return {
+        "rows": rows,
+    }
 
-    pdf = HTML(
-        string=html,
-        base_url=request.build_absolute_uri("/")
-    ).write_pdf()
 
-    response = HttpResponse(
-        pdf,
-        content_type="application/pdf"
-    )
+def pdf_job_status(request, uuid):
+    """
+    Status page for a queued PDF render. The page polls the status partial with htmx, once the job has completed
+    the partial redirects the browser to the PDF.
+    """
+    job = get_object_or_404(PdfJob, uuid=uuid)
+    download_url = reverse('reports:pdf-job-download', args=[job.uuid])
 
-    response["Content-Disposition"] = (
-        'attachment; filename="site-allocation-audit.pdf"'
-    )
+    if request.htmx:
+        response = TemplateResponse(request, 'partials/pdf_job_status.html', {'job': job})
+        if job.job_status == PdfJob.COMPLETED:
+            response['HX-Redirect'] = download_url
+        return response
 
-    return response
+    return TemplateResponse(request, 'pdf_job_status.html', {'job': job, 'download_url': download_url})
+
+
+def pdf_job_download(request, uuid):
+    """
+    Serve the rendered PDF of a completed job from MEDIA_ROOT
+    """
+    job = get_object_or_404(PdfJob, uuid=uuid, job_status=PdfJob.COMPLETED)
+    return FileResponse(
+        job.pdf_file.open('rb'),
+        as_attachment=job.disposition == PdfJob.ATTACHMENT,
+        filename=job.filename,
+        content_type='application/pdf',
+    )
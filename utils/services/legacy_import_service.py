@@ -0,0 +1,360 @@
+# utils/services/legacy_import_service.py
+
+import csv
+import logging
+from dataclasses import dataclass
+from functools import reduce
+from itertools import islice
+from operator import or_
+
+import phonenumbers as pn
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Q
+
+from accounts.models import CustomUser, Profile
+from fairs.models import Event, EventSite, InventoryItem, Site, SiteHistory, Zone
+from fairs.services.site_tenure_service import SiteTenureService
+
+db_logger = logging.getLogger('db')
+
+
+class RejectedRow(Exception):
+    """
+    Raised by a row builder when a legacy row cannot be imported, the message is written to the reject file
+    """
+
+
+@dataclass(frozen=True)
+class LegacyImport:
+    """
+    A kind of legacy extract that can be loaded by import_legacy.
+
+    columns maps each field the importer reads to the legacy column names it may appear under, the first name
+    present in the file is used. Fields listed in required must have a column. importer is the name of the
+    LegacyImportService method that loads one chunk of rows.
+    """
+    columns: dict
+    required: tuple
+    importer: str
+
+
+LEGACY_IMPORTS = {
+    "users": LegacyImport(
+        columns={
+            "reference_id": ("StallHolderID", "StallholderID"),
+            "username": ("UserName",),
+            "first_name": ("FirstName", "FNAME"),
+            "last_name": ("LastName", "Surname"),
+            "email": ("Email", "EMAIL"),
+            "phone": ("Phone", "Tele"),
+            "org_name": ("BusinessName", "TradingName"),
+        },
+        required=("reference_id", "first_name", "last_name", "email"),
+        importer="import_users",
+    ),
+    "sites": LegacyImport(
+        columns={
+            "site_name": ("Site",),
+            "zone_code": ("Zone",),
+            "site_size": ("Size",),
+        },
+        required=("site_name", "zone_code", "site_size"),
+        importer="import_sites",
+    ),
+    "site_history": LegacyImport(
+        columns={
+            "reference_id": ("StallholderID", "StallHolderID"),
+            "site_name": ("CODE",),
+            "year": ("Fair_Name",),
+            "is_skipped": ("Skipped",),
+            "number_events": ("NumEvents",),
+            "is_half_size": ("bIsHalfSite",),
+        },
+        required=("reference_id", "site_name", "year"),
+        importer="import_site_history",
+    ),
+}
+
+
+class LegacyImportService:
+    """
+    Service class for loading extracts of the legacy system.
+
+    Provides:
+        - Streaming of a CSV extract in chunks
+        - Foreign key resolution with one prefetch query per chunk
+        - Idempotent inserts, rows already loaded are counted and skipped
+        - A reject file holding each row that could not be loaded and the reason
+
+    Rows are written with bulk_create(ignore_conflicts=True) a chunk at a time, each chunk in its own transaction,
+    so an import can be re-run after fixing the rejected rows.
+    """
+
+    REJECT_REASON = "reject_reason"
+
+    @classmethod
+    def run(cls, kind, path, rejects_path, chunk_size=1000):
+        """
+        Load the CSV extract at path. Returns a dict of the number of rows read, created, already present and
+        rejected.
+        """
+        legacy_import = LEGACY_IMPORTS[kind]
+        summary = {"read": 0, "created": 0, "existing": 0, "rejected": 0}
+
+        with open(path, newline="", encoding="utf-8-sig") as extract, \
+                open(rejects_path, "w", newline="", encoding="utf-8") as rejects_file:
+            reader = csv.DictReader(extract)
+            columns = cls.get_column_map(legacy_import, reader.fieldnames or [])
+            # Cells beyond the header of a ragged row are not written to the reject file
+            rejects = csv.DictWriter(
+                rejects_file, fieldnames=[*(reader.fieldnames or []), cls.REJECT_REASON], extrasaction="ignore"
+            )
+            rejects.writeheader()
+            importer = getattr(cls, legacy_import.importer)
+
+            while chunk := list(islice(reader, chunk_size)):
+                rows, incomplete = cls.get_rows(legacy_import, columns, chunk)
+                with transaction.atomic():
+                    created, existing, rejected = importer(rows)
+                rejected = incomplete + rejected
+                for raw, reason in rejected:
+                    rejects.writerow({**raw, cls.REJECT_REASON: reason})
+                summary["read"] += len(chunk)
+                summary["created"] += created
+                summary["existing"] += existing
+                summary["rejected"] += len(rejected)
+
+        db_logger.info(
+            f'Legacy {kind} import of {path}: {summary["created"]} created, {summary["existing"]} already present, '
+            f'{summary["rejected"]} rejected',
+            extra={'custom_category': 'Legacy Import'}
+        )
+        return summary
+
+    @staticmethod
+    def get_column_map(legacy_import, fieldnames):
+        """
+        Returns {field: column} for the fields whose column is in the extract
+        """
+        columns = {}
+        for field, names in legacy_import.columns.items():
+            column = next((name for name in names if name in fieldnames), None)
+            if column:
+                columns[field] = column
+        missing = [field for field in legacy_import.required if field not in columns]
+        if missing:
+            raise ValueError(f"The extract has no column for: {', '.join(missing)}")
+        return columns
+
+    @staticmethod
+    def get_rows(legacy_import, columns, chunk):
+        """
+        Returns the (raw, {field: value}) pairs of the chunk's rows and the (raw, reason) pairs of the rows missing a
+        required value. csv sets the cells missing from the end of a short row to None, they are read as empty.
+        """
+        rows = []
+        incomplete = []
+        for raw in chunk:
+            row = {field: (raw[column] or "").strip() for field, column in columns.items()}
+            missing = [field for field in legacy_import.required if not row[field]]
+            if missing:
+                incomplete.append((raw, f"No value for: {', '.join(missing)}"))
+            else:
+                rows.append((raw, row))
+        return rows, incomplete
+
+    @staticmethod
+    def build_rows(rows, build):
+        """
+        Apply build to each row, returns the built objects and the (raw, reason) pairs of the rejected rows
+        """
+        built = []
+        rejected = []
+        for raw, row in rows:
+            try:
+                built.append(build(row))
+            except RejectedRow as e:
+                rejected.append((raw, str(e)))
+            except (TypeError, ValueError, OverflowError) as e:
+                rejected.append((raw, f"Invalid value: {e}"))
+        return built, rejected
+
+    @staticmethod
+    def check_max_lengths(*instances):
+        """
+        Raise RejectedRow for a value longer than its field allows, which would otherwise fail the insert of the
+        whole chunk
+        """
+        for instance in instances:
+            for field in instance._meta.concrete_fields:
+                value = getattr(instance, field.attname)
+                if field.max_length and isinstance(value, str) and len(value) > field.max_length:
+                    raise RejectedRow(
+                        f"{field.verbose_name.capitalize()} {value} is longer than {field.max_length} characters"
+                    )
+
+    @staticmethod
+    def parse_bool(value):
+        return value.strip().lower() in ("1", "true", "yes", "y", "-1")
+
+    @staticmethod
+    def format_phone(number):
+        try:
+            return pn.format_number(pn.parse(number.strip(), "NZ"), pn.PhoneNumberFormat.NATIONAL)
+        except pn.NumberParseException as e:
+            raise RejectedRow(f"Phone number {number} is not valid: {e}")
+
+    @classmethod
+    def import_site_history(cls, rows):
+        reference_ids = {row["reference_id"] for _raw, row in rows}
+        site_names = {row["site_name"] for _raw, row in rows}
+        stallholders = dict(
+            CustomUser.objects.filter(reference_id__in=reference_ids).values_list("reference_id", "id")
+        )
+        sites = dict(Site.objects.filter(site_name__in=site_names).values_list("site_name", "id"))
+
+        def build(row):
+            if row["reference_id"] not in stallholders:
+                raise RejectedRow(f"Stallholder legacy ID {row['reference_id']} has not been created")
+            if row["site_name"] not in sites:
+                raise RejectedRow(f"Site name {row['site_name']} has not been created")
+            if len(row["year"]) != 4 or not row["year"].isdigit():
+                raise RejectedRow(f"Fair year {row['year']} is not a year")
+            history = SiteHistory(
+                stallholder_id=stallholders[row["reference_id"]],
+                site_id=sites[row["site_name"]],
+                year=row["year"],
+                is_skipped=cls.parse_bool(row.get("is_skipped", "")),
+                is_half_size=cls.parse_bool(row.get("is_half_size", "")),
+                number_events=int(float(row.get("number_events") or 0)),
+            )
+            cls.check_max_lengths(history)
+            return history
+
+        histories, rejected = cls.build_rows(rows, build)
+
+        # A key repeated within the chunk is loaded once
+        histories = list({(h.stallholder_id, h.site_id, h.year): h for h in histories}.values())
+        existing_keys = set(
+            SiteHistory.objects.filter(
+                stallholder_id__in={h.stallholder_id for h in histories},
+                site_id__in={h.site_id for h in histories},
+                year__in={h.year for h in histories},
+            ).values_list("stallholder_id", "site_id", "year")
+        )
+        new_histories = [h for h in histories if (h.stallholder_id, h.site_id, h.year) not in existing_keys]
+        SiteHistory.objects.bulk_create(new_histories, ignore_conflicts=True)
+        SiteTenureService.refresh({h.site_id for h in new_histories})
+
+        return len(new_histories), len(histories) - len(new_histories), rejected
+
+    @classmethod
+    def import_sites(cls, rows):
+        zones = dict(Zone.objects.exclude(zone_code=None).values_list("zone_code", "id"))
+        site_sizes = set(InventoryItem.objects.values_list("id", flat=True))
+        existing_names = set(
+            Site.objects.filter(site_name__in={row["site_name"] for _raw, row in rows}).values_list(
+                "site_name", flat=True
+            )
+        )
+
+        def build(row):
+            if row["zone_code"] not in zones:
+                raise RejectedRow(f"Zone name {row['zone_code']} has not been created")
+            site_size_id = int(float(row["site_size"]))
+            if site_size_id not in site_sizes:
+                raise RejectedRow(f"Site size {site_size_id} is not an inventory item")
+            site = Site(site_name=row["site_name"], zone_id=zones[row["zone_code"]], site_size_id=site_size_id)
+            # bulk_create does not call save so the natural sort key is set here
+            site.site_prefix, site.site_number, site.site_suffix = Site.split_site_name(site.site_name)
+            cls.check_max_lengths(site)
+            return site
+
+        sites, rejected = cls.build_rows(rows, build)
+        sites = list({site.site_name: site for site in sites}.values())
+        new_sites = [site for site in sites if site.site_name not in existing_names]
+        Site.objects.bulk_create(new_sites, ignore_conflicts=True)
+
+        # Make the new sites available for the current events, matched by name as ignore_conflicts returns no ids
+        events = list(Event.currenteventfiltermgr.all())
+        created_sites = Site.objects.filter(
+            site_name__in=[site.site_name for site in new_sites], event_sites__isnull=True
+        )
+        EventSite.objects.bulk_create(
+            [
+                EventSite(event=event, site=site, site_status=EventSite.AVAILABLE)
+                for site in created_sites
+                for event in events
+            ],
+            ignore_conflicts=True,
+        )
+
+        return len(new_sites), len(sites) - len(new_sites), rejected
+
+    @classmethod
+    def import_users(cls, rows):
+        existing_reference_ids = set(
+            CustomUser.objects.filter(
+                reference_id__in={row["reference_id"] for _raw, row in rows}
+            ).values_list("reference_id", flat=True)
+        )
+        profiles = {}
+
+        def get_username(row):
+            return row.get("username") or (row["first_name"].title()[:1] + row["last_name"].title())
+
+        # Only the usernames a row of the chunk could take, its own and its numbered variants, are loaded
+        candidates = {get_username(row) for _raw, row in rows} - {""}
+        taken_usernames = set(
+            CustomUser.objects.filter(
+                reduce(or_, (Q(username__startswith=username) for username in candidates))
+            ).values_list("username", flat=True)
+        ) if candidates else set()
+
+        def build(row):
+            first_name = row["first_name"].title()
+            last_name = row["last_name"].title()
+            username = get_username(row)
+            if not username:
+                raise RejectedRow("No username, first name or last name")
+            unique_username = username
+            counter = 1
+            while unique_username in taken_usernames:
+                unique_username = f"{username}{counter}"
+                counter += 1
+            phones = [cls.format_phone(number) for number in row.get("phone", "").split("/") if number.strip()]
+            user = CustomUser(
+                reference_id=row["reference_id"],
+                username=unique_username,
+                first_name=first_name,
+                last_name=last_name,
+                email=row["email"],
+                phone=phones[0] if phones else "",
+                # Legacy stallholders set their password through the password reset
+                password=make_password(None),
+                is_active=True,
+                role=CustomUser.STALLHOLDER,
+            )
+            profile = Profile(
+                org_name=row.get("org_name", "").title(),
+                phone2=phones[1] if len(phones) > 1 else "",
+            )
+            cls.check_max_lengths(user, profile)
+            taken_usernames.add(unique_username)
+            profiles[user.reference_id] = profile
+            return user
+
+        new_rows = [(raw, row) for raw, row in rows if row["reference_id"] not in existing_reference_ids]
+        unique_rows = list({row["reference_id"]: (raw, row) for raw, row in new_rows}.values())
+        users, rejected = cls.build_rows(unique_rows, build)
+
+        # reference_id is not unique so the users are checked above rather than with ignore_conflicts, which would
+        # leave the new users without the ids their profiles need. The post_save signal that creates each user's
+        # Profile is not sent by bulk_create
+        users = CustomUser.objects.bulk_create(users)
+        for user in users:
+            profiles[user.reference_id].user = user
+        Profile.objects.bulk_create([profiles[user.reference_id] for user in users])
+
+        return len(users), len(rows) - len(unique_rows), rejected
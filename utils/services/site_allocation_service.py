@@ -1,15 +1,23 @@
 from collections import defaultdict
+from dataclasses import dataclass, field
 
-from django.db import transaction
-from django.db.models import Count, Max
+import numpy as np
 
+from django.conf import settings
+from django.db import connection, transaction
+
+from accounts.models import CustomUser
 from fairs.models import (
     Event,
     EventSite,
     InventoryItem,
+    Site,
     SiteAllocation,
-    SiteHistory,
+    SiteTenure,
 )
+from fairs.services.dashboard_metrics_cache import DashboardMetricsCache
+from fairs.services.fair_year_service import FairYearService
+from fairs.services.site_tenure_service import SiteTenureService
 
 import logging
 
@@ -18,6 +26,40 @@ logger = logging.getLogger(__name__)
 SYSTEM_USER_ID = 3
 
 
+@dataclass(frozen=True)
+class AllocationSnapshot:
+    """
+    The allocation inputs for the current events, loaded once.
+
+    site_preferences maps each stallholder to their historical
+    (site_id, year_count, latest_year) preferences, best first. ranked_groups holds, for each priority group from four years down to
+    one, the (stallholder_id, site_id, year_count, latest_year) preferences
+    in allocation order. available_sites maps (event_id, site_id) to the
+    available EventSite id and existing_allocations holds the
+    (stallholder_id, event_id) pairs already allocated. A snapshot is never
+    modified, so any number of simulations can be run over it.
+    """
+    events: tuple
+    site_preferences: dict
+    ranked_groups: tuple
+    available_sites: dict
+    existing_allocations: frozenset
+
+
+@dataclass
+class AllocationPlan:
+    """
+    The result of a simulated allocation run.
+
+    allocations are the proposed allocations, conflicts the preferences that
+    could not be met and unallocated the available sites nobody was given,
+    each as a list of dicts.
+    """
+    allocations: list = field(default_factory=list)
+    conflicts: list = field(default_factory=list)
+    unallocated: list = field(default_factory=list)
+
+
 class SiteAllocationService:
     """
     Automatically allocate sites to existing stallholders based on
@@ -27,12 +69,100 @@ class SiteAllocationService:
 
     1. Number of years occupying the site.
     2. Most recent occupancy.
+
+    The allocation inputs are loaded once into an AllocationSnapshot and the
+    allocations are resolved in memory by simulate, which is also used to
+    preview a run without writing anything. The greedy strategy gives each
+    stallholder only their top site of each priority group, the optimal
+    strategy solves each event as a weighted bipartite matching of
+    stallholders to sites, so a stallholder who loses their top site can
+    still be given another site they have held. allocate_sites writes the
+    simulated plan with a single bulk insert and a single EventSite status
+    update inside one transaction, so a run either allocates every site or
+    none of them.
     """
 
+    GREEDY = "greedy"
+    OPTIMAL = "optimal"
+
+    STRATEGIES = {
+        GREEDY: "_simulate_greedy",
+        OPTIMAL: "_simulate_optimal",
+    }
+
+    # Optimal strategy weight of each year a site was held, larger than the
+    # most recency weight so years held always outrank recency
+    YEAR_WEIGHT = 5
+
+    ALLOCATED = "Allocated"
+    CONFLICT = "Conflict"
+    UNALLOCATED = "Unallocated"
+
+    @classmethod
+    def allocate_sites(cls, strategy=None):
+        """
+        Run the historical site allocation for the current events
+        with the named strategy, SITE_ALLOCATION_STRATEGY by default.
+
+        Returns:
+            The list of SiteAllocations created.
+        """
+
+        with transaction.atomic():
+
+            snapshot = cls.load_snapshot(lock=True)
+
+            if snapshot is None:
+                return []
+
+            plan = cls.simulate(snapshot, strategy)
+
+            allocations = cls._save_allocations(snapshot, plan)
+
+        logger.info(
+            "Historical site allocation completed successfully, "
+            "%s sites allocated.",
+            len(allocations),
+        )
+
+        return allocations
+
+    @classmethod
+    def preview_allocations(cls, strategy=None):
+        """
+        Simulate the historical site allocation for the current
+        events without writing anything.
+
+        Returns:
+            An AllocationPlan, or None when there is nothing to allocate.
+        """
+
+        snapshot = cls.load_snapshot()
+
+        if snapshot is None:
+            return None
+
+        return cls.simulate(snapshot, strategy)
+
+    @classmethod
+    def get_strategy(cls):
+        return getattr(settings, "SITE_ALLOCATION_STRATEGY", cls.GREEDY)
+
     @classmethod
-    def allocate_sites(cls):
+    def load_snapshot(cls, lock=False):
+        """
+        Load the allocation inputs for the current events.
+
+        With lock the available EventSite rows stay locked until the
+        surrounding transaction ends, so a convener allocating by hand
+        cannot take a site between planning and writing.
 
-        events = list(
+        Returns:
+            An AllocationSnapshot, or None when there are no current
+            events or no site history.
+        """
+
+        events = tuple(
             Event.currenteventfiltermgr.all()
         )
 
@@ -40,9 +170,7 @@ class SiteAllocationService:
             logger.error(
                 "Site allocation aborted: no current events found."
             )
-            return
-
-        existing_allocations = cls._get_existing_allocations()
+            return None
 
         site_preferences = cls._get_site_preferences()
 
@@ -50,42 +178,549 @@ class SiteAllocationService:
             logger.error(
                 "Site allocation aborted: no historical site data found."
             )
-            return
+            return None
+
+        return AllocationSnapshot(
+            events=events,
+            site_preferences={
+                stallholder_id: tuple(
+                    (
+                        site["site_id"],
+                        site["year_count"],
+                        site["latest_year"],
+                    )
+                    for site in sites
+                )
+                for stallholder_id, sites in site_preferences.items()
+            },
+            ranked_groups=tuple(
+                cls._rank_priority_group(
+                    minimum_years=minimum_years,
+                    site_preferences=site_preferences,
+                )
+                for minimum_years in range(4, 0, -1)
+            ),
+            available_sites=cls._get_available_sites(events, lock),
+            existing_allocations=cls._get_existing_allocations(events),
+        )
+
+    @classmethod
+    def simulate(cls, snapshot, strategy=None):
+        """
+        Resolve the allocations for a snapshot in memory with
+        the named strategy, SITE_ALLOCATION_STRATEGY by default.
 
-        for minimum_years in range(4, 0, -1):
+        Returns:
+            An AllocationPlan.
+        """
+
+        strategy = strategy or cls.get_strategy()
 
-            cls._process_priority_group(
-                minimum_years=minimum_years,
-                site_preferences=site_preferences,
-                events=events,
-                existing_allocations=existing_allocations,
+        if strategy not in cls.STRATEGIES:
+            raise ValueError(
+                f"Unknown site allocation strategy: {strategy}"
             )
 
-        logger.info(
-            "Historical site allocation completed successfully."
+        return getattr(cls, cls.STRATEGIES[strategy])(snapshot)
+
+    @classmethod
+    def _simulate_greedy(cls, snapshot):
+        """
+        Give each stallholder their top site of each priority
+        group, highest priority group first.
+
+        Returns:
+            An AllocationPlan.
+        """
+
+        plan = AllocationPlan()
+
+        available_sites = dict(snapshot.available_sites)
+
+        allocated = set(snapshot.existing_allocations)
+
+        # (event_id, site_id) -> stallholder_id of the sites taken in this run
+        taken_sites = {}
+
+        # A preferred site that is lost in one priority group is usually
+        # preferred again in the next, record each conflict once
+        conflicted = set()
+
+        for ranked_stallholders in snapshot.ranked_groups:
+
+            for (
+                stallholder_id,
+                site_id,
+                year_count,
+                latest_year,
+            ) in ranked_stallholders:
+
+                for event in snapshot.events:
+
+                    if (
+                        stallholder_id,
+                        event.id,
+                    ) in allocated:
+                        continue
+
+                    row = {
+                        "stallholder_id": stallholder_id,
+                        "event_id": event.id,
+                        "site_id": site_id,
+                        "year_count": year_count,
+                        "latest_year": latest_year,
+                    }
+
+                    event_site_id = available_sites.pop(
+                        (
+                            event.id,
+                            site_id,
+                        ),
+                        None,
+                    )
+
+                    if event_site_id is None:
+
+                        if (
+                            stallholder_id,
+                            event.id,
+                            site_id,
+                        ) in conflicted:
+                            continue
+
+                        conflicted.add(
+                            (
+                                stallholder_id,
+                                event.id,
+                                site_id,
+                            )
+                        )
+
+                        row["taken_by_id"] = taken_sites.get(
+                            (
+                                event.id,
+                                site_id,
+                            )
+                        )
+
+                        plan.conflicts.append(row)
+
+                        continue
+
+                    row["event_site_id"] = event_site_id
+
+                    plan.allocations.append(row)
+
+                    allocated.add(
+                        (
+                            stallholder_id,
+                            event.id,
+                        )
+                    )
+
+                    taken_sites[
+                        (
+                            event.id,
+                            site_id,
+                        )
+                    ] = stallholder_id
+
+        plan.unallocated = cls._get_unallocated(available_sites)
+
+        return plan
+
+    @classmethod
+    def _simulate_optimal(cls, snapshot):
+        """
+        Solve each event as a weighted bipartite matching of
+        the unallocated stallholders to the available sites
+        they have held.
+
+        The matching first allocates as many stallholders as
+        possible, then prefers the most years held and the most
+        recent occupancy. Conflicts are reported against each
+        unallocated stallholder's top site.
+
+        Returns:
+            An AllocationPlan.
+        """
+
+        plan = AllocationPlan()
+
+        available_sites = dict(snapshot.available_sites)
+
+        first_year = min(
+            int(latest_year)
+            for preferences in snapshot.site_preferences.values()
+            for _site_id, _year_count, latest_year in preferences
+        )
+
+        for event in snapshot.events:
+
+            # stallholder_id -> {site_id: (year_count, latest_year)}
+            candidates = {}
+
+            for (
+                stallholder_id,
+                preferences,
+            ) in sorted(snapshot.site_preferences.items()):
+
+                if (
+                    stallholder_id,
+                    event.id,
+                ) in snapshot.existing_allocations:
+                    continue
+
+                candidates[stallholder_id] = {
+                    site_id: (year_count, latest_year)
+                    for site_id, year_count, latest_year in preferences
+                    if (event.id, site_id) in available_sites
+                }
+
+            assignment = {}
+
+            for stallholder_ids, site_ids in cls._get_components(candidates):
+
+                weights = np.zeros(
+                    (len(stallholder_ids), len(site_ids))
+                )
+
+                site_index = {
+                    site_id: column
+                    for column, site_id in enumerate(site_ids)
+                }
+
+                for row, stallholder_id in enumerate(stallholder_ids):
+                    for site_id, (year_count, latest_year) in candidates[stallholder_id].items():
+                        weights[row, site_index[site_id]] = (
+                            year_count * cls.YEAR_WEIGHT
+                            + int(latest_year) - first_year + 1
+                        )
+
+                # Weight every allocation above any combination of
+                # preferences so the most stallholders are allocated
+                edges = weights > 0
+                weights[edges] += weights.max() * len(stallholder_ids) + 1
+
+                for row, column in cls.solve_assignment(weights):
+                    if edges[row, column]:
+                        assignment[stallholder_ids[row]] = site_ids[column]
+
+            taken_sites = {
+                site_id: stallholder_id
+                for stallholder_id, site_id in assignment.items()
+            }
+
+            for (
+                stallholder_id,
+                preferences,
+            ) in sorted(snapshot.site_preferences.items()):
+
+                if stallholder_id not in candidates:
+                    continue
+
+                if stallholder_id in assignment:
+
+                    site_id = assignment[stallholder_id]
+
+                    year_count, latest_year = candidates[stallholder_id][site_id]
+
+                    plan.allocations.append(
+                        {
+                            "stallholder_id": stallholder_id,
+                            "event_id": event.id,
+                            "site_id": site_id,
+                            "year_count": year_count,
+                            "latest_year": latest_year,
+                            "event_site_id": available_sites.pop(
+                                (
+                                    event.id,
+                                    site_id,
+                                )
+                            ),
+                        }
+                    )
+
+                    continue
+
+                site_id, year_count, latest_year = preferences[0]
+
+                plan.conflicts.append(
+                    {
+                        "stallholder_id": stallholder_id,
+                        "event_id": event.id,
+                        "site_id": site_id,
+                        "year_count": year_count,
+                        "latest_year": latest_year,
+                        "taken_by_id": taken_sites.get(site_id),
+                    }
+                )
+
+        plan.unallocated = cls._get_unallocated(available_sites)
+
+        return plan
+
+    @staticmethod
+    def _get_components(candidates):
+        """
+        Split the stallholder to site candidate graph into its
+        connected components, which can be matched independently.
+        Stallholders have held only a handful of sites, so the
+        components are small and far cheaper to solve than one
+        matrix of every stallholder and site.
+
+        Returns:
+            (stallholder_ids, site_ids) lists per component.
+        """
+
+        parent = {}
+
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for stallholder_id, sites in candidates.items():
+
+            stallholder_node = ("stallholder", stallholder_id)
+
+            parent.setdefault(stallholder_node, stallholder_node)
+
+            for site_id in sites:
+
+                site_node = ("site", site_id)
+
+                parent.setdefault(site_node, site_node)
+
+                parent[find(site_node)] = find(stallholder_node)
+
+        components = defaultdict(lambda: ([], []))
+
+        for node in parent:
+
+            kind, node_id = node
+
+            stallholder_ids, site_ids = components[find(node)]
+
+            if kind == "stallholder":
+                stallholder_ids.append(node_id)
+            else:
+                site_ids.append(node_id)
+
+        return [
+            (stallholder_ids, site_ids)
+            for stallholder_ids, site_ids in components.values()
+            if site_ids
+        ]
+
+    @staticmethod
+    def solve_assignment(weights):
+        """
+        Maximum weight assignment of the rows of a weight
+        matrix to its columns, by the Hungarian algorithm with
+        the column scans vectorised in NumPy.
+
+        Returns:
+            (row, column) pairs, one for each row or column,
+            whichever is fewer.
+        """
+
+        transposed = weights.shape[0] > weights.shape[1]
+
+        if transposed:
+            weights = weights.T
+
+        rows, columns = weights.shape
+
+        cost = weights.max() - weights
+
+        # Row and column potentials, and the row assigned to each
+        # column, with column 0 standing for the row being added
+        u = np.zeros(rows + 1)
+        v = np.zeros(columns + 1)
+        assigned = np.zeros(columns + 1, dtype=int)
+        way = np.zeros(columns + 1, dtype=int)
+
+        for row in range(1, rows + 1):
+
+            assigned[0] = row
+            column = 0
+            min_slack = np.full(columns + 1, np.inf)
+            used = np.zeros(columns + 1, dtype=bool)
+
+            while assigned[column] != 0:
+
+                used[column] = True
+
+                current_row = assigned[column]
+
+                free = np.flatnonzero(~used)
+
+                slack = cost[current_row - 1, free - 1] - u[current_row] - v[free]
+
+                improved = slack < min_slack[free]
+
+                min_slack[free[improved]] = slack[improved]
+
+                way[free[improved]] = column
+
+                next_column = free[np.argmin(min_slack[free])]
+
+                delta = min_slack[next_column]
+
+                used_columns = np.flatnonzero(used)
+
+                u[assigned[used_columns]] += delta
+
+                v[used_columns] -= delta
+
+                min_slack[free] -= delta
+
+                column = next_column
+
+            while column:
+                previous_column = way[column]
+                assigned[column] = assigned[previous_column]
+                column = previous_column
+
+        pairs = [
+            (assigned[column] - 1, column - 1)
+            for column in range(1, columns + 1)
+            if assigned[column]
+        ]
+
+        if transposed:
+            pairs = [
+                (row, column)
+                for column, row in pairs
+            ]
+
+        return pairs
+
+    @staticmethod
+    def _get_unallocated(available_sites):
+        return [
+            {
+                "event_id": event_id,
+                "site_id": site_id,
+                "event_site_id": event_site_id,
+            }
+            for (event_id, site_id), event_site_id in available_sites.items()
+        ]
+
+    @classmethod
+    def get_plan_rows(cls, plan):
+        """
+        Flatten a plan into display rows with the stallholder,
+        event and site names resolved.
+
+        Returns:
+            A list of dicts, allocations first, then conflicts,
+            then unallocated sites.
+        """
+
+        sections = (
+            (cls.ALLOCATED, plan.allocations),
+            (cls.CONFLICT, plan.conflicts),
+            (cls.UNALLOCATED, plan.unallocated),
+        )
+
+        stallholder_ids = set()
+        event_ids = set()
+        site_ids = set()
+
+        for _result, rows in sections:
+            for row in rows:
+                stallholder_ids.update(
+                    (row.get("stallholder_id"), row.get("taken_by_id"))
+                )
+                event_ids.add(row["event_id"])
+                site_ids.add(row["site_id"])
+
+        stallholder_ids.discard(None)
+
+        stallholders = CustomUser.objects.in_bulk(stallholder_ids)
+        events = Event.objects.in_bulk(event_ids)
+        sites = Site.objects.select_related("zone").in_bulk(site_ids)
+
+        plan_rows = []
+
+        for result, rows in sections:
+
+            for row in rows:
+
+                site = sites[row["site_id"]]
+
+                plan_rows.append(
+                    {
+                        "result": result,
+                        "event_name": events[row["event_id"]].event_name,
+                        "zone_name": site.zone.zone_name if site.zone else "",
+                        "site_name": site.site_name,
+                        "stallholder": stallholders.get(row.get("stallholder_id")),
+                        "year_count": row.get("year_count"),
+                        "latest_year": row.get("latest_year"),
+                        "taken_by": stallholders.get(row.get("taken_by_id")),
+                    }
+                )
+
+        return plan_rows
+
+    @staticmethod
+    def _get_available_sites(events, lock=False):
+        """
+        Load every available fair site for the events in one query.
+
+        Returns:
+
+        {
+            (event_id, site_id): event_site_id,
+            ...
+        }
+        """
+
+        queryset = EventSite.objects.filter(
+            event__in=events,
+            site_status=EventSite.AVAILABLE,
+            site__site_size__item_type=InventoryItem.FAIRSITE,
         )
 
+        if lock:
+            queryset = queryset.select_for_update(of=("self",))
+
+        return {
+            (event_id, site_id): event_site_id
+            for event_site_id, event_id, site_id in queryset.values_list(
+                "id",
+                "event_id",
+                "site_id",
+            )
+        }
+
     @staticmethod
-    def _get_existing_allocations():
+    def _get_existing_allocations(events):
         """
         Cache existing allocations to eliminate repeated
         EXISTS queries.
         """
 
-        return {
-            (
-                allocation.stallholder_id,
-                allocation.event_site.event_id,
+        return frozenset(
+            SiteAllocation.objects
+            .filter(
+                event_site__event__in=events
             )
-            for allocation in SiteAllocation.objects.select_related(
-                "event_site"
+            .values_list(
+                "stallholder_id",
+                "event_site__event_id",
             )
-        }
+        )
 
     @staticmethod
     def _get_site_preferences():
         """
-        Returns historical site rankings.
+        Returns historical site rankings over the last four
+        years, read from the SiteTenure summary.
 
         Example:
 
@@ -101,56 +736,70 @@ class SiteAllocationService:
         }
         """
 
-        queryset = (
-            SiteHistory.fouryearhistorymgr
+        fair_years = FairYearService.get()
+
+        tenures = (
+            SiteTenure.objects
             .filter(
-                stallholder__is_active=True
+                stallholder__is_active=True,
+                last_year__gte=str(fair_years.four_years_past),
+                first_year__lte=str(fair_years.current_year),
             )
-            .values(
-                "stallholder_id",
+            .only(
                 "site_id",
-            )
-            .annotate(
-                year_count=Count(
-                    "year",
-                    distinct=True,
-                ),
-                latest_year=Max("year"),
-            )
-            .order_by(
-                "-year_count",
-                "-latest_year",
+                "stallholder_id",
+                "years",
             )
         )
 
         preferences = defaultdict(list)
 
-        for row in queryset:
+        for tenure in tenures:
+
+            years = SiteTenureService.get_years_in_window(
+                tenure,
+                fair_years.four_years_past,
+                fair_years.current_year,
+            )
+
+            if not years:
+                continue
 
             preferences[
-                row["stallholder_id"]
+                tenure.stallholder_id
             ].append(
                 {
-                    "site_id": row["site_id"],
-                    "year_count": row["year_count"],
-                    "latest_year": row["latest_year"],
+                    "site_id": tenure.site_id,
+                    "year_count": len(years),
+                    "latest_year": years[-1],
                 }
             )
 
+        for sites in preferences.values():
+
+            sites.sort(
+                key=lambda site: (
+                    site["year_count"],
+                    site["latest_year"],
+                ),
+                reverse=True,
+            )
+
         return preferences
 
-    @classmethod
-    def _process_priority_group(
-        cls,
+    @staticmethod
+    def _rank_priority_group(
         *,
         minimum_years,
         site_preferences,
-        events,
-        existing_allocations,
     ):
         """
-        Process stallholders with at least
-        minimum_years occupancy.
+        Rank stallholders with at least minimum_years
+        occupancy.
+
+        Returns:
+            (stallholder_id, site_id, year_count,
+            latest_year) tuples, highest priority first.
         """
 
         ranked_stallholders = []
@@ -175,121 +824,157 @@ class SiteAllocationService:
             ranked_stallholders.append(
                 (
                     stallholder_id,
+                    preferred_site["site_id"],
                     preferred_site["year_count"],
                     preferred_site["latest_year"],
-                    preferred_site["site_id"],
                 )
             )
 
         ranked_stallholders.sort(
             key=lambda row: (
-                row[1],
                 row[2],
+                row[3],
             ),
             reverse=True,
         )
 
-        for (
-            stallholder_id,
-            _year_count,
-            _latest_year,
-            site_id,
-        ) in ranked_stallholders:
-
-            cls._allocate_site(
-                stallholder_id=stallholder_id,
-                site_id=site_id,
-                events=events,
-                existing_allocations=existing_allocations,
-            )
+        return tuple(ranked_stallholders)
 
-    @classmethod
-    def _allocate_site(
-        cls,
-        *,
-        stallholder_id,
-        site_id,
-        events,
-        existing_allocations,
-    ):
+    @staticmethod
+    def _save_allocations(snapshot, plan):
+        """
+        Write the allocations of a simulated plan.
 
-        for event in events:
+        bulk_create does not send post_save, so the
+        set_allocation_status signal that would re-fetch and
+        save each EventSite does not run. Its work is done
+        here by one status update over all the allocated
+        EventSites, and the site dashboard counters are
+        invalidated once the transaction commits. Nor does it
+        call save, so the denormalised fair is set from the
+        snapshot events.
 
-            if (
-                stallholder_id,
-                event.id,
-            ) in existing_allocations:
-                continue
+        Returns:
+            The SiteAllocations created.
+        """
 
-            try:
+        event_fairs = {
+            event.id: event.fair_id
+            for event in snapshot.events
+        }
 
-                event_site = (
-                    EventSite.objects
-                    .select_related(
-                        "site",
-                        "event",
-                        "site__site_size",
-                    )
-                    .get(
-                        event_id=event.id,
-                        site_id=site_id,
-                        site__site_size__item_type=InventoryItem.FAIRSITE,
-                    )
-                )
+        allocations = [
+            SiteAllocation(
+                stallholder_id=row["stallholder_id"],
+                event_site_id=row["event_site_id"],
+                fair_id=event_fairs[row["event_id"]],
+                created_by_id=SYSTEM_USER_ID,
+            )
+            for row in plan.allocations
+        ]
 
-            except EventSite.DoesNotExist:
-                continue
+        if not allocations:
+            return allocations
 
-            if event_site.site_status != 1:
-                continue
+        SiteAllocation.objects.bulk_create(
+            allocations,
+            batch_size=1000,
+        )
 
-            allocation_created = cls._create_allocation(
-                stallholder_id=stallholder_id,
-                event_site=event_site,
+        (
+            EventSite.objects
+            .filter(
+                id__in=[
+                    allocation.event_site_id
+                    for allocation in allocations
+                ],
+            )
+            .update(
+                site_status=EventSite.ALLOCATED
             )
+        )
 
-            if allocation_created:
+        DashboardMetricsCache.invalidate_on_commit(
+            DashboardMetricsCache.SITES
+        )
 
-                existing_allocations.add(
-                    (
-                        stallholder_id,
-                        event.id,
-                    )
-                )
+        return allocations
 
     @staticmethod
-    @transaction.atomic
-    def _create_allocation(
-        *,
-        stallholder_id,
-        event_site,
-    ):
+    def delete_unregistered_allocations():
         """
-        Atomic allocation.
+        Delete the SiteAllocations that have no StallRegistration and are
+        not on hold, returning their EventSites to Available.
+
+        Allocations whose EventSite has moved beyond Allocated are kept,
+        as the allow_siteallocation_delete_if_not_booked signal would
+        refuse to delete them. The allocations are deleted with a single
+        DELETE and their EventSites reset with a single UPDATE inside one
+        transaction, without the per row delete signals.
 
         Returns:
-            True if allocation created.
-            False otherwise.
+            A dict of the number of allocations deleted and kept.
         """
 
-        rows_updated = (
-            EventSite.objects
-            .filter(
-                pk=event_site.pk,
-                site_status=1,
-            )
-            .update(
-                site_status=2
+        with transaction.atomic():
+
+            unregistered = list(
+                SiteAllocation.objects
+                .filter(
+                    stall_registration__isnull=True,
+                    on_hold=False,
+                )
+                .select_for_update()
+                .values_list(
+                    "id",
+                    "event_site_id",
+                    "event_site__site_status",
+                )
             )
-        )
 
-        if rows_updated == 0:
-            return False
+            deletable = [
+                (allocation_id, event_site_id)
+                for allocation_id, event_site_id, site_status in unregistered
+                if site_status <= EventSite.ALLOCATED
+            ]
 
-        SiteAllocation.objects.create(
-            stallholder_id=stallholder_id,
-            event_site=event_site,
-            created_by_id=SYSTEM_USER_ID,
-        )
+            if deletable:
+                # Nothing references a SiteAllocation, so the rows are
+                # deleted directly rather than collected for the per row
+                # delete signals
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"DELETE FROM {SiteAllocation._meta.db_table} "
+                        f"WHERE id = ANY(%s)",
+                        [
+                            [
+                                allocation_id
+                                for allocation_id, _event_site_id in deletable
+                            ]
+                        ],
+                    )
+
+                # An EventSite still held by a registered or on hold
+                # allocation keeps its status
+                (
+                    EventSite.objects
+                    .filter(
+                        id__in={
+                            event_site_id
+                            for _allocation_id, event_site_id in deletable
+                        },
+                        site_allocation__isnull=True,
+                    )
+                    .update(
+                        site_status=EventSite.AVAILABLE
+                    )
+                )
 
-        return True
\ No newline at end of file
+                DashboardMetricsCache.invalidate_on_commit(
+                    DashboardMetricsCache.SITES
+                )
+
+        return {
+            "deleted": len(deletable),
+            "kept": len(unregistered) - len(deletable),
+        }
@@ -1,88 +1,101 @@
 # utils/site_history_tools.py
 
 import logging
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Count, Min
 from fairs.models import (
-    Fair,
     SiteAllocation,
     SiteHistory,
     InventoryItem,
 )
+from fairs.services.fair_context_service import FairContextService
+from fairs.services.site_tenure_service import SiteTenureService
 
 db_logger = logging.getLogger('db')
 
+HALF_SIZE_SITE = 'Half Size 3x3 Fair Site'
+
+
 def populate_site_history():
     """
-    Populates the SiteHistory model based on StallRegistration and SiteAllocation data.
-    Ensures no duplicates and updates existing records if necessary.
+    Populates the SiteHistory model for the current fair year from the Booked StallRegistration SiteAllocations.
+    New rows are inserted and changed rows updated with a single upsert, rows for the current year that no longer
+    have a booked allocation are deleted with a single delete. History of earlier years and the convener's notes
+    and flags are left untouched.
+    Returns a summary dict of the number of inserted, updated and deleted rows.
     """
 
-    current_fair_year = Fair.currentfairmgr.first().fair_year
+    current_fair_year = FairContextService.get().first_fair.fair_year
 
     # Aggregate SiteAllocations to count events per site for each stallholder
     site_allocations = (
         SiteAllocation.objects
         .filter(stall_registration__booking_status='Booked', event_site__event__fair__fair_year=current_fair_year)  # Only include registrations with status 'Booked'
-        .values('stallholder', 'event_site__site', 'stall_registration__site_size')
-        .annotate(number_events=Count('event_site__event', distinct=True))
+        .values('stallholder_id', 'event_site__site_id')
+        .annotate(
+            number_events=Count('event_site__event', distinct=True),
+            site_size_id=Min('stall_registration__site_size'),
+        )
     )
 
-    # Track existing SiteHistory entries to identify those needing removal
-    existing_site_histories = SiteHistory.objects.values('id', 'stallholder_id', 'site_id', 'year')
-    existing_site_history_map = {
-        (entry['stallholder_id'], entry['site_id'], entry['year']): entry['id']
-        for entry in existing_site_histories
+    half_size_ids = set(InventoryItem.objects.filter(item_name=HALF_SIZE_SITE).values_list('id', flat=True))
+
+    # Only the current year is diffed, earlier years are never changed by the rollup
+    existing_site_histories = {
+        (history.stallholder_id, history.site_id): history
+        for history in SiteHistory.objects.filter(year=current_fair_year).only(
+            'id', 'stallholder_id', 'site_id', 'year', 'site_size_id', 'number_events', 'is_half_size'
+        )
     }
 
-    processed_entries = set()
+    upserts = []
+    inserted = updated = 0
+    changed_site_ids = set()
 
     for allocation in site_allocations:
-        stallholder_id = allocation['stallholder']
-        site_id = allocation['event_site__site']
-        site_size_id = allocation['stall_registration__site_size']
-        number_events = allocation['number_events']
-        year = current_fair_year
-
-
-        # Retrieve the `InventoryItem` object if `site_size_id` is not null
-        site_size = None
-        if site_size_id:
-            try:
-                site_size = InventoryItem.objects.get(id=site_size_id)
-            except InventoryItem.DoesNotExist:
-                db_logger.error(
-                    f'There was an error with the site history.  InventoryItem with ID {site_size_id} does not exist. Skipping.',
-                    extra={'custom_category': 'Site History'}
-                )
-
-        # Determine if the site size is half-size (or other conditions)
-        if site_size:
-            if site_size.item_name == 'Half Size 3x3 Fair Site':
-                is_half_size = True
-            else:
-                is_half_size = False
+        key = (allocation['stallholder_id'], allocation['event_site__site_id'])
+        site_history = SiteHistory(
+            stallholder_id=allocation['stallholder_id'],
+            site_id=allocation['event_site__site_id'],
+            year=current_fair_year,
+            site_size_id=allocation['site_size_id'],
+            number_events=allocation['number_events'],
+            is_half_size=allocation['site_size_id'] in half_size_ids,
+        )
+        existing = existing_site_histories.pop(key, None)
+        if existing is None:
+            inserted += 1
+        elif (
+            (existing.site_size_id, existing.number_events, existing.is_half_size)
+            != (site_history.site_size_id, site_history.number_events, site_history.is_half_size)
+        ):
+            updated += 1
         else:
-            is_half_size = False
-
-        # Mark this entry as processed
-        processed_entries.add((stallholder_id, site_id, year))
-
-        # Check if a SiteHistory entry exists for this stallholder and site
-        site_history, created = SiteHistory.objects.get_or_create(
-            stallholder_id=stallholder_id,
-            site_id=site_id,
-            year=year,
-            defaults={
-                'site_size_id': site_size_id,
-                'number_events': number_events,
-                'is_half_size': is_half_size,
-                # Add additional fields to update if necessary
-            }
+            continue
+        upserts.append(site_history)
+        changed_site_ids.add(site_history.site_id)
+
+    # Whatever is left of the current year no longer has a booked allocation
+    stale_ids = [history.id for history in existing_site_histories.values()]
+    changed_site_ids.update(history.site_id for history in existing_site_histories.values())
+
+    with transaction.atomic():
+        SiteHistory.objects.bulk_create(
+            upserts,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['stallholder', 'site', 'year'],
+            update_fields=['site_size', 'number_events', 'is_half_size'],
         )
+        _total, deleted_by_model = SiteHistory.objects.filter(id__in=stale_ids).delete()
+        deleted = deleted_by_model.get(SiteHistory._meta.label, 0)
 
-    # Remove outdated SiteHistory entries for the current year only
-    for (stallholder_id, site_id, year), site_history_id in existing_site_history_map.items():
-        if year == current_fair_year and (stallholder_id, site_id, year) not in processed_entries:
-            SiteHistory.objects.filter(id=site_history_id).delete()
-
+        # Bring the site tenure summary up to date for the sites whose history changed
+        SiteTenureService.refresh(changed_site_ids)
 
+    summary = {'inserted': inserted, 'updated': updated, 'deleted': deleted}
+    db_logger.info(
+        f'Site history for {current_fair_year} populated: {inserted} inserted, {updated} updated, {deleted} deleted',
+        extra={'custom_category': 'Site History'}
+    )
+    return summary
@@ -1,6 +1,11 @@
 # utils/stallholder_history_tools.py
 
 import logging
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Case, Q, Value, When
+
 from fairs.models import (
     SiteHistory,
     InventoryItem,
@@ -8,86 +13,92 @@ from fairs.models import (
 
 db_logger = logging.getLogger('db')
 
+HALF_SIZE_FAIR_SITE = 'Half Size Fair Site'
+FULL_SIZE_FAIR_SITE = 'Full Size Fair Site'
 
-def update_site_history_site_size():
+
+@dataclass(frozen=True)
+class SiteHistoryFixup:
+    """
+    A data repair of the SiteHistory that can be run by fix_site_history.
+
+    build is a function that returns the queryset of the SiteHistory rows that need changing and the
+    {field: expression} values to set on them. The rows are updated with a single UPDATE, so the expressions are
+    written as database expressions, a Case for a value that depends on the row.
+    """
+    description: str
+    build: callable
+
+
+def build_site_size_fixup():
+    """
+    Set site_size from the is_half_size flag, 'Half Size Fair Site' where the flag is set and 'Full Size Fair Site'
+    where it is not.
+    """
+    half_size_id = InventoryItem.objects.get(item_name=HALF_SIZE_FAIR_SITE).id
+    full_size_id = InventoryItem.objects.get(item_name=FULL_SIZE_FAIR_SITE).id
+    histories = SiteHistory.objects.filter(
+        Q(is_half_size=True) & ~Q(site_size_id=half_size_id) | Q(is_half_size=False) & ~Q(site_size_id=full_size_id)
+    )
+    return histories, {
+        'site_size_id': Case(When(is_half_size=True, then=Value(half_size_id)), default=Value(full_size_id)),
+    }
+
+
+def build_is_half_size_fixup():
     """
-    A temporary function to populate the new site_size field based on the data  in the is_half_size flag. Where the
-    is_half_size flag is true site_size will be set to 'Half Size Fair Site', if not set  site_size will be set
-    to 'Full Size Fair Site'.
-    Added to dashboard_site_history.html to initiate this function
-    <div class="card-body">
-        <p class="card-text">Update Site History Site Size</p>
-        <form method="post">
-            {% csrf_token %}
-            <button class= "bth btn-primary mb-1" type="submit" name="run_script">Run Update</button>
-        </form>
-    </div>
-    Added to Fairs view stallholder_history_dashboard_view
-    if request.method == 'POST' and 'run_script' in request.POST:
-        # call function
-        update_site_history_site_size()
-        # return user to required page
-        return HttpResponseRedirect(reverse('fair:history-dashboard'))
+    Set the is_half_size flag from site_size, True where site_size is 'Half Size Fair Site' and False otherwise.
     """
-    # Get the SiteHistory
-    site_histories = SiteHistory.objects.all()
-    half_inventory_item = InventoryItem.objects.get(item_name='Half Size Fair Site')
-    full_inventory_item = InventoryItem.objects.get(item_name='Full Size Fair Site')
-    for site_history in site_histories:
-        is_half_size = site_history.is_half_size
-        # Determine the required site size based on the is_half_size flag
-        inventory_item = half_inventory_item if is_half_size else full_inventory_item
-        try:
-            site_history.site_size = inventory_item
-            site_history.save()
-        except Exception as e:
-            db_logger.error(
-                'There was an error updating the SiteHistory instanceID {} ' + str(e) + ' .'.format(site_history.id),
-                extra={'custom_category': 'Site_history_Update'})
+    half_size_id = InventoryItem.objects.get(item_name=HALF_SIZE_FAIR_SITE).id
+    histories = SiteHistory.objects.filter(
+        Q(site_size_id=half_size_id, is_half_size=False) | ~Q(site_size_id=half_size_id) & Q(is_half_size=True)
+    )
+    return histories, {
+        'is_half_size': Case(When(site_size_id=half_size_id, then=Value(True)), default=Value(False)),
+    }
+
+
+SITE_HISTORY_FIXUPS = {
+    "site_size": SiteHistoryFixup(
+        "Set site_size from the is_half_size flag", build_site_size_fixup
+    ),
+    "is_half_size": SiteHistoryFixup(
+        "Set the is_half_size flag from site_size", build_is_half_size_fixup
+    ),
+}
+
+
+def run_site_history_fixup(name, dry_run=False):
+    """
+    Run the named SITE_HISTORY_FIXUPS repair over the full SiteHistory. Only the rows whose value would change are
+    updated, with one UPDATE statement, and one summary is logged. With dry_run the rows are counted and left
+    unchanged. Returns the number of rows updated, or that would be updated.
+    """
+    fixup = SITE_HISTORY_FIXUPS[name]
+    with transaction.atomic():
+        histories, values = fixup.build()
+        if dry_run:
+            count = histories.count()
         else:
-            db_logger.error('Site history ID {} has been updated to set site_size.id to {}'.format(site_history.id,
-                                                                                                inventory_item.id),
-                            extra={'custom_category': 'Site_history_Update'})
+            count = histories.update(**values)
+
+    db_logger.info(
+        f'SiteHistory fix-up {name} ({fixup.description}): {count} rows '
+        f'{"would be updated (dry run)" if dry_run else "updated"}',
+        extra={'custom_category': 'SiteHistory_Update'}
+    )
+    return count
+
+
+def update_site_history_site_size():
+    """
+    Populate the site_size field from the is_half_size flag, see build_site_size_fixup
+    """
+    return run_site_history_fixup('site_size')
 
 
 def update_site_history_is_half_size():
     """
-    A function to update the is_half_size flag based on the site_size field.
-    If site_size is 'Half Size Fair Site', is_half_size will be set to True.
-    Otherwise, it will be set to False.
-
-     Added to dashboard_site_history.html to initiate this function
-    <div class="card-body">
-        <p class="card-text">Update Site History is_half_size</p>
-        <form method="post">
-            {% csrf_token %}
-            <button class= "bth btn-primary mb-1" type="submit" name="run_script">Run Update</button>
-        </form>
-    </div>
-    Added to Fairs view stallholder_history_dashboard_view
-    if request.method == 'POST' and 'run_script' in request.POST:
-        # call function
-        update_site_history_is_half_size()
-        # return user to required page
-        return HttpResponseRedirect(reverse('fair:history-dashboard'))
+    Update the is_half_size flag from the site_size field, see build_is_half_size_fixup
     """
-    # Get the SiteHistory records
-    site_histories = SiteHistory.objects.all()
-    half_inventory_item = InventoryItem.objects.get(item_name='Half Size Fair Site')
-
-    for site_history in site_histories:
-        # Determine the correct value for is_half_size
-        is_half_size = site_history.site_size == half_inventory_item
-        try:
-            site_history.is_half_size = is_half_size
-            site_history.save()
-        except Exception as e:
-            db_logger.error(
-                'Error updating SiteHistory ID {}: {}'.format(site_history.id, str(e)),
-                extra={'custom_category': 'SiteHistory_Update'}
-            )
-        else:
-            db_logger.info(
-                'SiteHistory ID {} updated: is_half_size set to {}'.format(site_history.id, is_half_size),
-                extra={'custom_category': 'SiteHistory_Update'}
-            )
+    return run_site_history_fixup('is_half_size')